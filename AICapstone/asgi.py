@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+비동기 추천 뷰(run-recommendation/async/)의 동시 처리 이점을 살리려면 ASGI 서버로 실행합니다.
+    DJANGO_SETTINGS_MODULE=AICapstone.production \
+        gunicorn -k uvicorn.workers.UvicornWorker --workers 1 AICapstone.asgi:application
 """
 
 import os
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     "gptAPI",
     'youtube_api',
     'frontend',
+    'core',
 ]
 
 MIDDLEWARE = [
@@ -85,6 +86,12 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # 추천 파이프라인의 작업 스레드들이 동시에 캐시/사용량을 기록하므로,
+        # 쓰기 트랜잭션은 처음부터 잠금을 잡고(IMMEDIATE) 잠겨 있으면 잠시 기다립니다.
+        "OPTIONS": {
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
     }
 }
 
@@ -142,3 +149,94 @@ OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 YOUTUBE_API_KEYS = [key.strip() for key in os.environ.get('YOUTUBE_API_KEY', '').split(',') if key.strip()]
 
 
+
+# 추천 파이프라인 동시성 설정 (frontend/pipeline.py)
+# - 동시에 진행할 최대 YouTube / OpenAI 호출 수
+# - 단계별 제한 시간(초): 초과한 채널은 결과에서 제외
+RECOMMENDATION_YOUTUBE_MAX_IN_FLIGHT = int(os.environ.get('RECOMMENDATION_YOUTUBE_MAX_IN_FLIGHT', 5))
+RECOMMENDATION_OPENAI_MAX_IN_FLIGHT = int(os.environ.get('RECOMMENDATION_OPENAI_MAX_IN_FLIGHT', 4))
+RECOMMENDATION_FETCH_TIMEOUT = 60
+RECOMMENDATION_EVALUATE_TIMEOUT = 120
+# 관련도 평가를 한 번의 OpenAI 요청으로 묶을 최대 채널 수
+RECOMMENDATION_EVALUATE_BATCH_SIZE = 10
+# AI 분석 전에 BM25로 후보 채널을 미리 순위 매겨 분석할 최대 채널 수 (0이면 모든 후보 분석, frontend/prerank.py)
+RECOMMENDATION_PRERANK_TOP_K = 8
+# 잘라낸 채널도 분석해 보고 최종 순위에 들었을지 집계할 요청의 비율 (0~1, 비용/품질 조정용)
+RECOMMENDATION_PRERANK_AUDIT_RATE = 0.05
+# 화면에 보여줄 추천 채널 수. 상위 K에 들 수 없는 채널은 AI 평가를 생략 (frontend/ranking.py)
+# - 0(기본값)이면 평가한 채널을 모두 표시하고 생략하지 않음. 켜면 표시되는 채널이 K개로 줄어듦
+RECOMMENDATION_TOP_K = int(os.environ.get('RECOMMENDATION_TOP_K', 0))
+# 같은 검색어의 완료된 추천 결과(SearchHistory)를 다시 계산하지 않고 보여줄 기간(초)
+RECOMMENDATION_RESULT_TTL = 6 * 60 * 60
+# 검색을 백그라운드 작업으로 실행하고 페이지가 진행 상황을 조회하도록 할지 (frontend/jobs.py)
+# - 켜면 웹 요청 스레드는 작업 등록 후 바로 반환되므로, 긴 검색이 gunicorn 스레드를 붙잡지 않음
+RECOMMENDATION_BACKGROUND_JOBS = os.environ.get('RECOMMENDATION_BACKGROUND_JOBS', '') == '1'
+# 프로세스당 동시에 실행할 추천 작업 수, 이 시간(초) 동안 갱신되지 않은 작업은 중단된 것으로 처리
+RECOMMENDATION_JOB_WORKERS = 4
+RECOMMENDATION_JOB_TIMEOUT = 300
+
+# YouTube API 응답 캐시 (youtube_api/cache.py)
+# - 'memory': 프로세스 내부 LRU, 'django': CACHES[YOUTUBE_CACHE_ALIAS] 사용 (워커 간 공유), 'none': 사용 안 함
+# - 여러 gunicorn 워커가 캐시를 공유하려면 CACHES를 파일/DB/Redis 등 공유 백엔드로 설정하세요.
+YOUTUBE_CACHE_BACKEND = os.environ.get('YOUTUBE_CACHE_BACKEND', 'memory')
+YOUTUBE_CACHE_ALIAS = 'default'
+YOUTUBE_CACHE_MAX_ENTRIES = 2048
+# 엔드포인트(메서드 ID)별 캐시 유지 시간(초)
+YOUTUBE_CACHE_TTLS = {
+    'youtube.channels.list': 6 * 60 * 60,
+    'youtube.search.list': 60 * 60,
+    'youtube.videos.list': 60 * 60,
+    'youtube.commentThreads.list': 30 * 60,
+    'youtube.playlistItems.list': 10 * 60,
+}
+
+# 50개 단위로 나눠 보내는 조회(채널/영상 상세)에서 호출 하나가 동시에 보낼 최대 요청 수 (youtube_api/api_client.py)
+YOUTUBE_CHUNK_MAX_IN_FLIGHT = 4
+
+# 채널 카탈로그 (youtube_api/catalog.py)
+# - 검색에서 조회한 채널의 통계/최신 영상을 다시 조회하지 않고 사용할 기간(초)
+CHANNEL_CATALOG_TTL = 24 * 60 * 60
+
+# LLM 결과 캐시 (gptAPI/cache.py)
+# - 채널 분석 결과는 DB에 저장하여 재사용 (최신 영상 구성이 바뀌면 무효화)
+# - 관련도 평가 결과는 Django 캐시에 짧게 저장
+CHANNEL_SUMMARY_TTL = 7 * 24 * 60 * 60
+RELEVANCE_CACHE_TTL = 60 * 60
+# 키워드 추출 결과를 재사용할 기간(초)과 프로세스 내부 LRU 크기 (DB에도 저장하여 워커 간 공유)
+# - python manage.py seed_keyword_cache 로 과거 검색 기록(SearchHistory)에서 미리 채울 수 있음
+KEYWORD_CACHE_TTL = 30 * 24 * 60 * 60
+KEYWORD_CACHE_MAX_ENTRIES = 1024
+# 묶음 관련도 평가 요청 하나에 넣을 채널 요약의 추정 입력 토큰 예산 (넘으면 요청을 나눔)
+RELEVANCE_BATCH_TOKEN_BUDGET = 3000
+# 채널 분석 요청 하나에 넣을 채널 텍스트(채널/영상 제목·설명·태그)의 추정 토큰 예산 (gptAPI/text_assembly.py)
+CHANNEL_ANALYSIS_TOKEN_BUDGET = 1500
+
+# OpenAI 호출 (gptAPI/client.py)
+# - 요청 하나의 제한 시간(초)과, 429/5xx/연결 오류 시 재시도 횟수 및 백오프 대기 시간(초)
+# - 분당 토큰 한도(계정 등급의 TPM, 0이면 제한 없음)와 프로세스당 동시 요청 수
+OPENAI_REQUEST_TIMEOUT = 30
+OPENAI_MAX_RETRIES = 3
+OPENAI_RETRY_BASE_DELAY = 0.5
+OPENAI_RETRY_MAX_DELAY = 20
+OPENAI_TOKENS_PER_MINUTE = int(os.environ.get('OPENAI_TOKENS_PER_MINUTE', 0))
+OPENAI_MAX_CONCURRENCY = int(os.environ.get('OPENAI_MAX_CONCURRENCY', 8))
+
+# YouTube API 키 할당량 관리 (youtube_api/api_key_manager.py)
+# - 키당 일일 할당량(단위)과, 키별 사용량을 DB(ApiKeyUsage)에 반영하는 주기(초)
+YOUTUBE_DAILY_QUOTA = int(os.environ.get('YOUTUBE_DAILY_QUOTA', 10000))
+YOUTUBE_KEY_USAGE_SYNC_INTERVAL = 5
+# - 일시적인 빈도 제한(429, rateLimitExceeded)을 받았을 때 같은 키로 재시도할 횟수와 백오프 대기 시간(초)
+YOUTUBE_RATE_LIMIT_RETRIES = 3
+YOUTUBE_RATE_LIMIT_BASE_DELAY = 1.0
+# 채널 검색(search.list, 1회 100단위) 계획 (youtube_api/search_planner.py)
+# - 검색 한 번(사용자 요청 하나)에 쓸 search.list 할당량 예산(단위, 0이면 제한 없음)과 채울 후보 채널 수
+# - 단어가 이 비율(자카드 유사도) 이상 겹치는 검색어는 하나로 합쳐서 검색
+YOUTUBE_SEARCH_QUOTA_BUDGET = int(os.environ.get('YOUTUBE_SEARCH_QUOTA_BUDGET', 300))
+YOUTUBE_SEARCH_TARGET_CANDIDATES = 15
+YOUTUBE_SEARCH_MERGE_SIMILARITY = 0.6
+
+# 단계별 소요 시간 추적 및 지표 (core/tracing.py, /metrics/)
+# - PIPELINE_TRACE_LOG: 요청이 끝날 때 단계별 소요 시간을 JSON 한 줄로 출력
+# - METRICS_TOKEN: 설정하면 /metrics/ 요청에 'Authorization: Bearer <토큰>' 헤더가 필요
+PIPELINE_TRACE_LOG = os.environ.get('PIPELINE_TRACE_LOG', '') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
@@ -20,5 +20,7 @@ from django.urls import path, include
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("gptAPI.urls")),
+    path("youtube/", include("youtube_api.urls")),
+    path("", include("core.urls")),
     path("", include("frontend.urls"))
 ]
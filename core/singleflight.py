@@ -0,0 +1,216 @@
+# core/singleflight.py
+"""
+동일한 작업의 동시 실행 합치기(single-flight).
+
+같은 키로 이미 실행 중인 작업이 있으면 새로 실행하지 않고 그 결과를 기다렸다가 함께 받습니다.
+(인기 검색어가 몰릴 때 같은 키워드 추출/YouTube 호출/채널 분석이 중복 실행되는 것을 막음)
+
+    value, shared = channel_analysis_flight.do(key, lambda: call_llm(...))
+    events, shared = recommendation_flight.stream(key, lambda: iter_events(...))  # 제너레이터 버전
+
+- shared가 True이면 다른 요청이 계산한 결과이므로, 수정이 필요하면 사본을 만들어 쓰세요.
+- 먼저 실행한 쪽에서 예외가 발생하면 기다리던 쪽도 같은 예외를 받습니다.
+- 결과는 작업이 끝나는 즉시 버려집니다. (재사용은 캐시 계층의 역할)
+- 프로세스 안에서만 합쳐집니다. (워커 간 중복은 공유 캐시가 줄여줌)
+"""
+import asyncio
+import contextvars
+import threading
+
+from django.db import connections
+
+from .tracing import metrics, SINGLEFLIGHT_CALLS
+
+
+class _Call:
+    """실행 중인 작업 하나와 그 결과"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Stream:
+    """SingleFlight.stream으로 실행 중인 제너레이터 하나와 지금까지 내보낸 항목들"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.items = []
+        self.finished = False
+        self.error = None
+        self.followers = 0
+
+    def publish(self, item):
+        with self.cond:
+            self.items.append(item)
+            self.cond.notify_all()
+
+    def finish(self):
+        with self.cond:
+            self.finished = True
+            self.cond.notify_all()
+
+
+class SingleFlight:
+    """스레드 간 동일 작업 합치기"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.calls = {}  # key -> _Call
+        self.streams = {}  # key -> _Stream
+
+    def do(self, key, fn, timeout: float = None):
+        """
+        key에 해당하는 작업을 한 번만 실행하고 (결과, 다른 요청의 결과를 받았는지) 를 반환합니다.
+        timeout(초) 안에 먼저 실행한 쪽이 끝나지 않으면 기다리지 않고 직접 실행합니다.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self.calls[key] = call
+
+        if not leader:
+            if not call.done.wait(timeout):
+                metrics.inc(SINGLEFLIGHT_CALLS, {'flight': self.name, 'role': 'timeout'})
+                return fn(), False
+            metrics.inc(SINGLEFLIGHT_CALLS, {'flight': self.name, 'role': 'shared'})
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        metrics.inc(SINGLEFLIGHT_CALLS, {'flight': self.name, 'role': 'leader'})
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # 끝난 뒤에 들어온 요청은 새로 실행하도록 먼저 제거한 다음 기다리던 쪽을 깨웁니다.
+            with self.lock:
+                self.calls.pop(key, None)
+            call.done.set()
+
+    def stream(self, key, iter_fn):
+        """
+        do의 제너레이터 버전. key에 해당하는 iter_fn()을 한 번만 실행하고 (항목 이터레이터, 다른 요청의 결과를 받았는지)
+        를 반환합니다. 나중에 들어온 쪽은 먼저 실행한 쪽이 지금까지 내보낸 항목부터 차례로 함께 받습니다.
+        먼저 실행한 쪽은 반환된 이터레이터를 끝까지 소비해야 하며, 중간에 닫혀도(클라이언트 연결 종료 등)
+        기다리는 쪽이 있으면 나머지를 백그라운드 스레드에서 이어서 실행합니다. (기다리는 쪽이 모두 떠나면 중단)
+        """
+        with self.lock:
+            call = self.streams.get(key)
+            leader = call is None
+            if leader:
+                call = _Stream()
+                self.streams[key] = call
+            else:
+                call.followers += 1
+
+        metrics.inc(SINGLEFLIGHT_CALLS, {'flight': self.name, 'role': 'leader' if leader else 'shared'})
+        if leader:
+            return self._lead(key, call, iter_fn), False
+        return self._follow(call), True
+
+    def _lead(self, key, call, iter_fn):
+        items = None
+        handed_off = False
+        try:
+            items = iter(iter_fn())
+            for item in items:
+                call.publish(item)
+                yield item
+        except GeneratorExit:
+            with self.lock:
+                handed_off = call.followers > 0
+                if not handed_off:
+                    self.streams.pop(key, None)
+            if handed_off:
+                # 닫는 쪽(응답을 정리하는 서버 스레드)을 막지 않도록 나머지는 백그라운드 스레드에서 실행
+                context = contextvars.copy_context()
+                threading.Thread(target=context.run, args=(self._drain, key, call, items), daemon=True).start()
+            raise
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            if not handed_off:
+                self._finish(key, call, items)
+
+    def _drain(self, key, call, items):
+        """먼저 실행한 쪽이 중간에 닫힌 뒤, 기다리는 쪽이 남아 있는 동안만 나머지 항목을 실행"""
+        try:
+            for item in items:
+                call.publish(item)
+                with self.lock:
+                    if call.followers == 0:
+                        break
+        except Exception as e:
+            call.error = e
+        finally:
+            self._finish(key, call, items)
+            connections.close_all()
+
+    def _finish(self, key, call, items):
+        if items is not None and hasattr(items, 'close'):
+            items.close()
+        with self.lock:
+            if self.streams.get(key) is call:
+                self.streams.pop(key)
+        call.finish()
+
+    def _follow(self, call):
+        try:
+            index = 0
+            while True:
+                with call.cond:
+                    while index >= len(call.items) and not call.finished:
+                        call.cond.wait()
+                    pending = call.items[index:]
+                    finished = call.finished
+                yield from pending
+                index += len(pending)
+                if finished:
+                    break
+            if call.error is not None:
+                raise call.error
+        finally:
+            with self.lock:
+                call.followers -= 1
+
+    def in_flight(self) -> int:
+        with self.lock:
+            return len(self.calls) + len(self.streams)
+
+
+class AsyncSingleFlight:
+    """같은 이벤트 루프 안의 코루틴 간 동일 작업 합치기"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = {}  # (loop id, key) -> asyncio.Future
+
+    async def do(self, key, coroutine_fn):
+        """SingleFlight.do의 async 버전. coroutine_fn은 인자 없는 코루틴 함수입니다."""
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        future = self.calls.get(call_key)
+        if future is not None:
+            metrics.inc(SINGLEFLIGHT_CALLS, {'flight': self.name, 'role': 'shared'})
+            # 기다리던 쪽이 취소되어도 실행 중인 작업은 취소되지 않도록 shield
+            return await asyncio.shield(future), True
+
+        metrics.inc(SINGLEFLIGHT_CALLS, {'flight': self.name, 'role': 'leader'})
+        # 작업은 별도 task로 실행하고 먼저 실행한 쪽도 shield로 기다리므로,
+        # 먼저 실행한 요청이 취소되어도(클라이언트 연결 종료 등) 기다리던 쪽은 결과를 그대로 받습니다.
+        task = asyncio.ensure_future(coroutine_fn())
+        # 기다리는 쪽이 없을 때 "exception was never retrieved" 경고가 나지 않도록 결과를 소비하고,
+        # 끝난 뒤에 들어온 요청은 새로 실행하도록 제거
+        task.add_done_callback(lambda t: self.calls.pop(call_key, None) if self.calls.get(call_key) is t else None)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self.calls[call_key] = task
+        return await asyncio.shield(task), False
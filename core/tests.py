@@ -0,0 +1,209 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase, override_settings
+
+from frontend.pipeline import run_enrichment
+from .singleflight import SingleFlight, AsyncSingleFlight
+from .tracing import metrics, trace, span, record_cache_lookup
+
+
+class TracingTests(SimpleTestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_span_durations_are_aggregated_into_histograms(self):
+        """span의 소요 시간이 이름/레이블별 히스토그램에 집계되는지 테스트"""
+        for _ in range(3):
+            with span('youtube.request', endpoint='youtube.search.list') as request_span:
+                request_span.labels['cache'] = 'miss'
+
+        text = metrics.render()
+        self.assertIn('# TYPE aicapstone_span_duration_seconds histogram', text)
+        self.assertIn('aicapstone_span_duration_seconds_count{cache="miss",endpoint="youtube.search.list",'
+                      'span="youtube.request"} 3', text)
+        self.assertIn('span="youtube.request",le="+Inf"} 3', text)
+
+    def test_trace_collects_spans_from_worker_threads(self):
+        """파이프라인 작업 스레드에서 실행된 span도 요청의 trace에 모이는지 테스트"""
+        def fetch(key, payload):
+            with span('channel_fetch'):
+                return payload
+
+        with trace('recommendation') as current:
+            run_enrichment([('a', 1), ('b', 2)], fetch=fetch, evaluate=lambda key, value: value)
+
+        self.assertEqual([s['span'] for s in current.summary()['spans']].count('channel_fetch'), 2)
+
+    def test_failed_span_is_marked_with_error(self):
+        with trace('recommendation') as current:
+            with self.assertRaises(ValueError):
+                with span('keyword_extraction'):
+                    raise ValueError('boom')
+        self.assertEqual(current.summary()['spans'][0]['error'], 'ValueError')
+
+
+class MetricsViewTests(SimpleTestCase):
+    def test_metrics_endpoint_returns_prometheus_text(self):
+        """/metrics/ 가 Prometheus 텍스트 형식으로 카운터를 반환하는지 테스트"""
+        metrics.reset()
+        record_cache_lookup('relevance_rating', True)
+        response = self.client.get('/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('aicapstone_cache_lookups_total{cache="relevance_rating",result="hit"} 1', response.content.decode())
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint_requires_token_when_configured(self):
+        self.assertEqual(self.client.get('/metrics/').status_code, 401)
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_duplicates_share_one_call(self):
+        """같은 키로 동시에 들어온 요청은 한 번만 실행하고 결과를 함께 받는지 테스트"""
+        flight = SingleFlight('test')
+        calls = []
+        started = threading.Event()
+
+        def work():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return 'result'
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            leader = pool.submit(flight.do, 'query', work)
+            started.wait()
+            followers = [pool.submit(flight.do, 'query', work) for _ in range(3)]
+            results = [leader.result()] + [future.result() for future in followers]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [('result', False)] + [('result', True)] * 3)
+        self.assertEqual(flight.in_flight(), 0)
+        # 끝난 뒤의 요청은 새로 실행
+        flight.do('query', work)
+        self.assertEqual(len(calls), 2)
+
+    def test_leader_error_is_shared_with_waiters(self):
+        flight = SingleFlight('test')
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError('boom')
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, 'query', fail)
+            started.wait()
+            follower = pool.submit(flight.do, 'query', fail)
+            for future in (leader, follower):
+                with self.assertRaises(RuntimeError):
+                    future.result()
+
+    def test_stream_followers_replay_leader_items(self):
+        """나중에 들어온 스트림도 먼저 실행한 쪽이 내보낸 항목을 처음부터 모두 받는지 테스트"""
+        flight = SingleFlight('test')
+        calls = []
+
+        def work():
+            calls.append(1)
+            yield from ('a', 'b', 'c')
+
+        leader, leader_shared = flight.stream('query', work)
+        self.assertEqual(next(leader), 'a')
+        follower, follower_shared = flight.stream('query', work)
+        self.assertEqual(list(leader), ['b', 'c'])
+        self.assertEqual(list(follower), ['a', 'b', 'c'])
+        self.assertEqual((leader_shared, follower_shared, len(calls)), (False, True, 1))
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_stream_leader_close_finishes_for_followers(self):
+        """먼저 실행한 쪽이 중간에 닫혀도 기다리는 쪽은 나머지 항목과 오류까지 받는지 테스트"""
+        flight = SingleFlight('test')
+
+        def work():
+            yield from ('a', 'b')
+            raise RuntimeError('boom')
+
+        leader, _ = flight.stream('query', work)
+        next(leader)
+        follower, _ = flight.stream('query', work)
+        leader.close()
+        self.assertEqual(next(follower), 'a')
+        self.assertEqual(next(follower), 'b')
+        with self.assertRaises(RuntimeError):
+            next(follower)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_stream_leader_close_hands_off_and_stops_when_followers_leave(self):
+        """먼저 실행한 쪽을 닫아도 바로 반환되고, 기다리는 쪽이 모두 떠나면 나머지 실행을 멈추는지 테스트"""
+        flight = SingleFlight('test')
+        produced = []
+        follower_left = threading.Event()
+
+        def work():
+            for item in ('a', 'b', 'c', 'd'):
+                if item == 'c':
+                    follower_left.wait(1)
+                produced.append(item)
+                yield item
+
+        leader, _ = flight.stream('query', work)
+        next(leader)
+        follower, _ = flight.stream('query', work)
+        started = time.monotonic()
+        leader.close()
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual([next(follower), next(follower)], ['a', 'b'])
+        follower.close()
+        follower_left.set()
+        for _ in range(100):
+            if flight.in_flight() == 0:
+                break
+            time.sleep(0.01)
+        self.assertEqual(flight.in_flight(), 0)
+        self.assertNotIn('d', produced)
+
+    def test_async_duplicates_share_one_call(self):
+        """같은 이벤트 루프의 코루틴끼리도 한 번만 실행하는지 테스트"""
+        flight = AsyncSingleFlight('test')
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def main():
+            return await asyncio.gather(*[flight.do('query', work) for _ in range(3)])
+
+        results = asyncio.run(main())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True])
+
+    def test_async_leader_cancellation_does_not_cancel_waiters(self):
+        """먼저 실행한 코루틴이 취소되어도 기다리던 코루틴은 결과를 받는지 테스트"""
+        flight = AsyncSingleFlight('test')
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def main():
+            leader = asyncio.create_task(flight.do('query', work))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(flight.do('query', work))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await follower, flight.calls
+
+        (result, shared), calls = asyncio.run(main())
+        self.assertEqual((result, shared), ('result', True))
+        self.assertEqual(calls, {})
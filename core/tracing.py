@@ -0,0 +1,282 @@
+# core/tracing.py
+"""
+요청 단위 추적(trace)과 단계별(span) 소요 시간 측정.
+
+    with trace('recommendation', query=user_query):
+        with span('keyword_extraction'):
+            ...
+        with span('youtube.request', endpoint='youtube.search.list') as s:
+            ...
+            s.labels['cache'] = 'miss'       # 히스토그램 레이블 (값의 종류가 적은 것만)
+            s.set(key_index=1, units=100)    # 로그에만 남길 속성
+
+- 모든 span의 소요 시간은 span 이름과 레이블별 히스토그램으로 집계되어
+  /metrics 엔드포인트(core/views.py)에서 Prometheus 텍스트 형식으로 제공됩니다.
+- trace 안에서 실행된 span은 요청별로 모아 두었다가, PIPELINE_TRACE_LOG 설정이 켜져 있으면
+  trace가 끝날 때 JSON 한 줄로 출력합니다.
+- 현재 trace는 contextvars로 전달되므로, 작업 스레드에서 기록하려면
+  contextvars.copy_context().run으로 실행해야 합니다. (frontend/pipeline.py 참고)
+- 집계 값은 프로세스마다 따로 유지됩니다. (gunicorn 워커가 여러 개면 워커별 값)
+"""
+import bisect
+import contextvars
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# 소요 시간 히스토그램의 버킷 경계(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRIC_PREFIX = 'aicapstone_'
+
+SPAN_DURATION = 'span_duration_seconds'
+YOUTUBE_QUOTA_UNITS = 'youtube_quota_units_total'
+YOUTUBE_SEARCH_UNITS = 'youtube_search_units_total'
+YOUTUBE_SEARCH_KEYWORDS = 'youtube_search_keywords_total'
+OPENAI_TOKENS = 'openai_tokens_total'
+OPENAI_RETRIES = 'openai_retries_total'
+CACHE_LOOKUPS = 'cache_lookups_total'
+SINGLEFLIGHT_CALLS = 'singleflight_calls_total'
+PRERANK_CHANNELS = 'prerank_channels_total'
+PRERANK_AUDIT = 'prerank_audit_channels_total'
+TOPK_SKIPPED = 'topk_skipped_channels_total'
+TEXT_ASSEMBLY_TOKENS = 'text_assembly_tokens_total'
+ENRICHMENT_TIMEOUTS = 'enrichment_timeouts_total'
+
+
+class Histogram:
+    """레이블 조합별 누적 버킷 히스토그램"""
+
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.series = {}  # 레이블 튜플 -> [버킷별 개수..., +Inf 개수], 합계, 개수
+
+    def observe(self, labels: tuple, value: float):
+        counts, total, count = self.series.get(labels) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.series[labels] = (counts, total + value, count + 1)
+
+    def render(self) -> list:
+        lines = [f"# HELP {METRIC_PREFIX}{self.name} {self.help_text}", f"# TYPE {METRIC_PREFIX}{self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{METRIC_PREFIX}{self.name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{METRIC_PREFIX}{self.name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{METRIC_PREFIX}{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class Counter:
+    """레이블 조합별 누적 카운터"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.series = {}
+
+    def inc(self, labels: tuple, amount: float = 1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {METRIC_PREFIX}{self.name} {self.help_text}", f"# TYPE {METRIC_PREFIX}{self.name} counter"]
+        for labels, value in sorted(self.series.items()):
+            lines.append(f"{METRIC_PREFIX}{self.name}{_format_labels(labels)} {value}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _label_tuple(labels: dict) -> tuple:
+    return tuple(sorted((str(name), str(value)) for name, value in labels.items()))
+
+
+class MetricsRegistry:
+    """
+    프로세스 전체의 히스토그램/카운터를 보관하는 싱글톤 클래스.
+    (여러 스레드에서 동시에 기록해도 안전합니다)
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.lock = threading.Lock()
+            self.metrics = {}
+            self.reset()
+            self.initialized = True
+
+    def reset(self):
+        """모든 집계 값을 초기화합니다."""
+        with self.lock:
+            self.metrics = {
+                SPAN_DURATION: Histogram(SPAN_DURATION, "Duration of traced pipeline stages and external API calls."),
+                YOUTUBE_QUOTA_UNITS: Counter(YOUTUBE_QUOTA_UNITS, "Estimated YouTube Data API quota units spent."),
+                YOUTUBE_SEARCH_UNITS: Counter(YOUTUBE_SEARCH_UNITS, "search.list quota units per search plan, by kind (naive/planned/spent)."),
+                YOUTUBE_SEARCH_KEYWORDS: Counter(YOUTUBE_SEARCH_KEYWORDS, "Extracted keywords, by search plan decision (searches/cached/merged/skipped)."),
+                OPENAI_TOKENS: Counter(OPENAI_TOKENS, "OpenAI tokens used, by prompt and token type."),
+                OPENAI_RETRIES: Counter(OPENAI_RETRIES, "Retried OpenAI requests, by reason (HTTP status or error type)."),
+                CACHE_LOOKUPS: Counter(CACHE_LOOKUPS, "Cache lookups, by cache and result (hit/miss)."),
+                SINGLEFLIGHT_CALLS: Counter(SINGLEFLIGHT_CALLS, "Coalesced calls, by flight and role (leader/shared/timeout)."),
+                PRERANK_CHANNELS: Counter(PRERANK_CHANNELS, "Candidate channels kept for or pruned before LLM analysis."),
+                PRERANK_AUDIT: Counter(PRERANK_AUDIT, "Audited pruned channels, by whether they would have ranked in the top K."),
+                TOPK_SKIPPED: Counter(TOPK_SKIPPED, "Channels whose LLM evaluation was skipped because they could not reach the top K."),
+                TEXT_ASSEMBLY_TOKENS: Counter(TEXT_ASSEMBLY_TOKENS, "Estimated channel analysis input tokens before (original) and after (assembled) text assembly."),
+                ENRICHMENT_TIMEOUTS: Counter(ENRICHMENT_TIMEOUTS, "Enrichment tasks dropped on a stage timeout, cancelled before starting or abandoned while running."),
+            }
+
+    def observe(self, name: str, labels: dict, value: float):
+        with self.lock:
+            self.metrics[name].observe(_label_tuple(labels), value)
+
+    def inc(self, name: str, labels: dict, amount: float = 1):
+        with self.lock:
+            self.metrics[name].inc(_label_tuple(labels), amount)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식(0.0.4)으로 모든 집계 값을 반환합니다."""
+        with self.lock:
+            lines = []
+            for metric in self.metrics.values():
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Create a single, global instance of the registry for the application to use.
+metrics = MetricsRegistry()
+
+
+class Span:
+    """단계 하나의 측정 기록"""
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+        self.attributes = {}
+        self.started = time.perf_counter()
+        self.duration = None
+        self.error = None
+
+    def set(self, **attributes):
+        """로그에만 남길 속성(토큰 수, 키 순번 등)을 기록합니다."""
+        self.attributes.update(attributes)
+
+    def as_dict(self) -> dict:
+        data = {'span': self.name, 'ms': round((self.duration or 0) * 1000, 1), **self.labels, **self.attributes}
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class Trace:
+    """요청 하나에서 실행된 span 목록 (여러 스레드에서 추가될 수 있음)"""
+
+    def __init__(self, name: str, attributes: dict):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.attributes = attributes
+        self.started = time.perf_counter()
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def set(self, **attributes):
+        """요청 단위 속성(검색 계획 요약 등)을 기록합니다."""
+        with self.lock:
+            self.attributes.update(attributes)
+
+    def add(self, finished_span: Span):
+        with self.lock:
+            self.spans.append(finished_span)
+
+    def summary(self) -> dict:
+        with self.lock:
+            spans = [finished_span.as_dict() for finished_span in self.spans]
+        return {
+            'trace': self.name, 'trace_id': self.id,
+            'ms': round((time.perf_counter() - self.started) * 1000, 1),
+            **self.attributes, 'spans': spans,
+        }
+
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def trace(name: str, **attributes):
+    """요청 단위 추적을 시작합니다. (전체 소요 시간도 name 이름의 span으로 집계)"""
+    current = Trace(name, attributes)
+    token = _current_trace.set(current)
+    try:
+        with span(name):
+            yield current
+    finally:
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            # 스트리밍 응답의 제너레이터가 다른 컨텍스트에서 닫힌 경우
+            pass
+        if getattr(settings, 'PIPELINE_TRACE_LOG', False):
+            print(json.dumps(current.summary(), ensure_ascii=False))
+
+
+@contextmanager
+def span(name: str, **labels):
+    """
+    블록의 소요 시간을 측정하여 히스토그램에 기록하고, 현재 trace에 추가합니다.
+    labels는 히스토그램 레이블이 되므로 값의 종류가 적은 것(엔드포인트, 프롬프트, hit/miss)만 넣습니다.
+    """
+    current = Span(name, labels)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.started
+        metrics.observe(SPAN_DURATION, {'span': name, **current.labels}, current.duration)
+        active_trace = _current_trace.get()
+        if active_trace is not None:
+            active_trace.add(current)
+
+
+def record_cache_lookup(cache_name: str, hit: bool):
+    """캐시 적중/미스를 집계합니다."""
+    metrics.inc(CACHE_LOOKUPS, {'cache': cache_name, 'result': 'hit' if hit else 'miss'})
+
+
+def record_openai_usage(current_span: Span, prompt: str, response):
+    """OpenAI 응답의 토큰 사용량을 span 속성과 카운터에 기록합니다. (usage가 없으면 무시)"""
+    usage = getattr(response, 'usage', None)
+    prompt_tokens = getattr(usage, 'prompt_tokens', None)
+    completion_tokens = getattr(usage, 'completion_tokens', None)
+    if not isinstance(prompt_tokens, int) or not isinstance(completion_tokens, int):
+        return
+    current_span.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    metrics.inc(OPENAI_TOKENS, {'prompt': prompt, 'type': 'prompt'}, prompt_tokens)
+    metrics.inc(OPENAI_TOKENS, {'prompt': prompt, 'type': 'completion'}, completion_tokens)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    # ex: /metrics/
+    path('metrics/', views.metrics_view, name='metrics'),
+]
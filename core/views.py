@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+from .tracing import metrics
+
+
+def metrics_view(request):
+    """
+    단계별 소요 시간 히스토그램과 할당량/토큰/캐시 카운터를 Prometheus 텍스트 형식으로 반환하는 뷰입니다.
+    (METRICS_TOKEN 설정이 있으면 'Authorization: Bearer <토큰>' 헤더가 있어야 합니다)
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return JsonResponse({'error': 'Unauthorized.'}, status=401, json_dumps_params={'ensure_ascii': False})
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,57 @@
+# frontend/history.py
+"""
+완료된 추천 결과를 SearchHistory에 저장하고, 같은 검색어가 다시 들어오면 재사용합니다.
+- 검색어는 정규화(공백/대소문자 무시)한 뒤 해시하여 (query_hash, timestamp) 인덱스로 조회합니다.
+- RECOMMENDATION_RESULT_TTL(초)보다 오래된 결과는 재사용하지 않고 새로 계산합니다.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+from core.tracing import record_cache_lookup
+from gptAPI.cache import normalize_query, content_hash
+from .models import SearchHistory
+
+DEFAULT_RESULT_TTL = 6 * 60 * 60
+
+
+def query_hash(user_query: str) -> str:
+    return content_hash(normalize_query(user_query))
+
+
+def get_fresh_result(user_query: str):
+    """같은 검색어의 최근 추천 결과를 result_data 형태로 반환합니다. (없거나 오래되었으면 None)"""
+    ttl = getattr(settings, 'RECOMMENDATION_RESULT_TTL', DEFAULT_RESULT_TTL)
+    try:
+        history = (SearchHistory.objects
+                   .filter(query_hash=query_hash(user_query), timestamp__gte=timezone.now() - timedelta(seconds=ttl))
+                   .order_by('-timestamp')
+                   .first())
+    except DatabaseError as e:
+        print(f"Error reading search history: {e}")
+        return None
+    record_cache_lookup('recommendation_result', history is not None)
+    return history.as_result_data(user_query) if history else None
+
+
+def save_result(result_data: dict):
+    """완료된 추천 결과를 저장합니다. (추천된 채널이 없으면 일시적 오류일 수 있으므로 저장하지 않음)"""
+    if not result_data.get('recommendations'):
+        return None
+    try:
+        return SearchHistory.objects.create(
+            query=result_data['user_query'][:500],
+            query_hash=query_hash(result_data['user_query']),
+            keywords=result_data['keywords'],
+            recommendations=result_data['recommendations'],
+        )
+    except DatabaseError as e:
+        print(f"Error writing search history: {e}")
+        return None
+
+
+def recent_history(limit: int = 20):
+    """사이드바에 표시할 최근 검색 기록"""
+    return SearchHistory.objects.only('id', 'query', 'timestamp')[:limit]
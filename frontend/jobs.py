@@ -0,0 +1,122 @@
+# frontend/jobs.py
+"""
+추천 파이프라인을 웹 요청 스레드 밖에서 실행하는 백그라운드 작업.
+
+    job = enqueue_recommendation(user_query, lambda: _iter_recommendation_events(user_query))
+    ...  # 페이지는 job.id로 상태를 주기적으로 조회
+
+- 작업 상태와 중간 결과는 DB(RecommendationJob)에 기록하므로 어느 워커 프로세스에서든 조회할 수 있습니다.
+- 실행은 프로세스 내부의 작업 스레드 풀에서 합니다. (별도 브로커 없음, 동시 실행 수는 RECOMMENDATION_JOB_WORKERS)
+- 같은 검색어의 작업이 이미 진행 중이면 새로 등록하지 않고 그 작업을 반환합니다.
+- 프로세스 재시작 등으로 RECOMMENDATION_JOB_TIMEOUT(초) 동안 갱신되지 않은 작업은 조회 시 오류로 처리합니다.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, DatabaseError
+from django.utils import timezone
+
+from .history import query_hash
+from .models import RecommendationJob
+
+DEFAULT_JOB_WORKERS = 4
+DEFAULT_JOB_TIMEOUT = 300
+
+
+class RecommendationJobRunner:
+    """
+    추천 작업을 실행하는 스레드 풀을 관리하는 싱글톤 클래스.
+    (스레드 풀은 첫 작업이 등록될 때 만들어집니다)
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.executor = None
+            self.executor_lock = threading.Lock()
+            self.initialized = True
+
+    def submit(self, job_id, iter_events):
+        """iter_events()가 내보내는 (이벤트, 데이터)를 작업 기록에 반영하며 백그라운드에서 실행합니다."""
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'RECOMMENDATION_JOB_WORKERS', DEFAULT_JOB_WORKERS),
+                    thread_name_prefix='recommendation-job',
+                )
+        return self.executor.submit(self.run, job_id, iter_events)
+
+    def run(self, job_id, iter_events):
+        jobs = RecommendationJob.objects.filter(pk=job_id)
+        try:
+            jobs.update(status=RecommendationJob.RUNNING, updated_at=timezone.now())
+            channels = []
+            for event, data in iter_events():
+                if event == 'keywords':
+                    jobs.update(keywords=data, updated_at=timezone.now())
+                elif event == 'channel':
+                    channels.append(data)
+                    jobs.update(channels=channels, updated_at=timezone.now())
+                elif event == 'done':
+                    jobs.update(status=RecommendationJob.DONE, result=data, updated_at=timezone.now())
+                    return
+                elif event == 'error':
+                    jobs.update(status=RecommendationJob.ERROR, error_message=data, updated_at=timezone.now())
+                    return
+            jobs.update(status=RecommendationJob.ERROR, error_message='추천 결과를 만들지 못했습니다.',
+                        updated_at=timezone.now())
+        except Exception as e:
+            print(f"Recommendation Job Error ({job_id}): {e}")
+            try:
+                jobs.update(status=RecommendationJob.ERROR, error_message=f'추천 중 오류가 발생했습니다: {e}',
+                            updated_at=timezone.now())
+            except DatabaseError:
+                pass
+        finally:
+            # 작업 스레드가 DB 연결을 남기지 않도록 닫아줍니다.
+            connections.close_all()
+
+
+# Create a single, global instance of the runner for the application to use.
+recommendation_jobs = RecommendationJobRunner()
+
+
+def _job_timeout() -> int:
+    return getattr(settings, 'RECOMMENDATION_JOB_TIMEOUT', DEFAULT_JOB_TIMEOUT)
+
+
+def enqueue_recommendation(user_query: str, iter_events) -> RecommendationJob:
+    """추천 작업을 등록하고 바로 반환합니다. (같은 검색어의 작업이 진행 중이면 그 작업을 반환)"""
+    query_key = query_hash(user_query)
+    active_job = (RecommendationJob.objects
+                  .filter(query_hash=query_key, status__in=RecommendationJob.ACTIVE_STATUSES,
+                          updated_at__gte=timezone.now() - timedelta(seconds=_job_timeout()))
+                  .first())
+    if active_job is not None:
+        return active_job
+
+    job = RecommendationJob.objects.create(query=user_query[:500], query_hash=query_key)
+    recommendation_jobs.submit(job.pk, iter_events)
+    return job
+
+
+def get_job(job_id):
+    """작업을 조회합니다. 오래 갱신되지 않은 진행 중 작업은 중단된 것으로 보고 오류로 바꿉니다."""
+    job = RecommendationJob.objects.filter(pk=job_id).first()
+    if job is None or job.finished:
+        return job
+    if job.updated_at < timezone.now() - timedelta(seconds=_job_timeout()):
+        job.status = RecommendationJob.ERROR
+        job.error_message = '추천 작업이 중단되었습니다. 다시 검색해주세요.'
+        job.save(update_fields=['status', 'error_message', 'updated_at'])
+    return job
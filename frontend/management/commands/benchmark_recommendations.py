@@ -0,0 +1,168 @@
+# frontend/management/commands/benchmark_recommendations.py
+"""
+실제 API 할당량을 쓰지 않고 추천 파이프라인의 성능을 측정하는 벤치마크.
+
+YouTube/OpenAI를 가짜 서버(youtube_api/fakes.py, gptAPI/fakes.py)로 대체한 뒤
+recommendation_result_view를 동시성 단계별로 호출하여 다음을 보고합니다.
+  - 검색 1회당 지연 시간 p50 / p95
+  - 검색 1회당 YouTube / OpenAI 호출 수, YouTube 할당량 단위
+
+    python manage.py benchmark_recommendations --searches 20 --concurrency 1,4,8 \
+        --youtube-latency 80 --openai-latency 600
+"""
+import json
+import math
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from gptAPI.fakes import FakeOpenAIServer
+from gptAPI.models import ChannelSummary
+from youtube_api.api_key_manager import api_key_manager, key_fingerprint
+from youtube_api.cache import response_cache
+from youtube_api.fakes import FakeYouTubeServer, FAKE_CHANNEL_PREFIX
+from youtube_api.models import ApiKeyUsage, CatalogChannel
+from youtube_api.service_factory import youtube_service_factory
+from frontend.models import SearchHistory
+from frontend.views import recommendation_result_view
+
+DEFAULT_QUERIES = ['파이썬 기초 강의', '집에서 하는 요리', '혼자 떠나는 여행', '주식 투자 입문', '영어 회화 공부']
+
+
+def percentile(values: list, percent: float) -> float:
+    """nearest-rank 방식의 백분위수"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = "가짜 YouTube/OpenAI 서버로 추천 파이프라인의 지연 시간과 검색당 호출 수/할당량을 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--searches', type=int, default=20, help="동시성 단계마다 실행할 검색 수")
+        parser.add_argument('--concurrency', default='1,4,8', help="동시에 실행할 검색 수 (쉼표로 여러 단계)")
+        parser.add_argument('--youtube-latency', type=float, default=80, help="YouTube 응답 지연 (ms)")
+        parser.add_argument('--openai-latency', type=float, default=600, help="OpenAI 응답 지연 (ms)")
+        parser.add_argument('--jitter', type=float, default=0.5, help="지연에 더할 무작위 편차 (지연 대비 비율)")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="가짜 서버의 500 오류 비율 (0~1)")
+        parser.add_argument('--keys', type=int, default=3, help="사용할 가짜 YouTube API 키 수")
+        parser.add_argument('--quota-per-key', type=int, default=None,
+                            help="가짜 키 하나의 할당량 (넘으면 403 quotaExceeded)")
+        parser.add_argument('--warm', action='store_true',
+                            help="모든 검색에 같은 쿼리를 사용 (캐시가 채워진 상태 측정)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help="결과를 JSON 한 줄씩 출력")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+        except ValueError:
+            raise CommandError("--concurrency는 쉼표로 구분한 정수여야 합니다. (예: 1,4,8)")
+        if not levels or min(levels) < 1 or options['searches'] < 1:
+            raise CommandError("--searches와 --concurrency는 1 이상이어야 합니다.")
+
+        youtube = FakeYouTubeServer(
+            latency=options['youtube_latency'] / 1000, jitter=options['youtube_latency'] / 1000 * options['jitter'],
+            error_rate=options['error_rate'], quota_per_key=options['quota_per_key'], seed=options['seed'],
+        )
+        openai_server = FakeOpenAIServer(
+            latency=options['openai_latency'] / 1000, jitter=options['openai_latency'] / 1000 * options['jitter'],
+            error_rate=options['error_rate'], seed=options['seed'],
+        )
+        keys = [f"fake-youtube-key-{index + 1}" for index in range(options['keys'])]
+        self.queries = set()
+        started_at = timezone.now()
+
+        original_keys = api_key_manager.api_keys
+        youtube_service_factory.configure(http_factory=youtube.http)
+        openai_server.install()
+        try:
+            with override_settings(YOUTUBE_API_KEYS=keys, OPENAI_API_KEY='fake-openai-key'):
+                api_key_manager.api_keys = keys
+                api_key_manager.reset_usage()
+                response_cache.configure()
+                for level in levels:
+                    result = self._run_level(level, options, youtube, openai_server)
+                    self._report(result, options)
+        finally:
+            openai_server.uninstall()
+            youtube_service_factory.configure()
+            api_key_manager.api_keys = original_keys
+            api_key_manager.reset_usage()
+            response_cache.configure()
+            # 벤치마크가 DB에 남긴 가짜 키 사용량/가짜 채널 분석 결과·카탈로그/검색 기록 정리
+            ApiKeyUsage.objects.filter(key_fingerprint__in=[key_fingerprint(key) for key in keys]).delete()
+            ChannelSummary.objects.filter(channel_id__startswith=FAKE_CHANNEL_PREFIX).delete()
+            CatalogChannel.objects.filter(channel_id__startswith=FAKE_CHANNEL_PREFIX).delete()
+            SearchHistory.objects.filter(query__in=self.queries, timestamp__gte=started_at).delete()
+
+    def _run_level(self, concurrency: int, options: dict, youtube, openai_server) -> dict:
+        run_id = uuid.uuid4().hex[:8]
+        if options['warm']:
+            queries = [DEFAULT_QUERIES[0]] * options['searches']
+        else:
+            # 검색마다 다른 쿼리를 사용하여 캐시가 비어 있는 상태를 측정
+            queries = [f"{DEFAULT_QUERIES[i % len(DEFAULT_QUERIES)]} {run_id}-{i}" for i in range(options['searches'])]
+        self.queries.update(queries)
+
+        youtube.reset_stats()
+        openai_server.reset_stats()
+        factory = RequestFactory()
+
+        def search(query):
+            request = factory.post('/run-recommendation/', {'query': query})
+            started = time.perf_counter()
+            response = recommendation_result_view(request)
+            elapsed = time.perf_counter() - started
+            failed = response.status_code != 200 or '오류가 발생했습니다' in response.content.decode()
+            return elapsed, failed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(search, queries))
+        wall_time = time.perf_counter() - started
+
+        latencies = [elapsed for elapsed, _ in outcomes]
+        searches = len(queries)
+        youtube_stats = youtube.stats()
+        openai_stats = openai_server.stats()
+        return {
+            'concurrency': concurrency,
+            'searches': searches,
+            'failed_searches': sum(1 for _, failed in outcomes if failed),
+            'p50_ms': round(statistics.median(latencies) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'throughput_per_s': round(searches / wall_time, 2),
+            'youtube_calls_per_search': round(youtube_stats['total_calls'] / searches, 2),
+            'openai_calls_per_search': round(openai_stats['total_calls'] / searches, 2),
+            'quota_units_per_search': round(youtube_stats['quota_units'] / searches, 2),
+            'openai_tokens_per_search': round(
+                (openai_stats['prompt_tokens'] + openai_stats['completion_tokens']) / searches, 1),
+            'youtube': youtube_stats,
+            'openai': openai_stats,
+        }
+
+    def _report(self, result: dict, options: dict):
+        if options['json']:
+            self.stdout.write(json.dumps(result, ensure_ascii=False))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"동시성 {result['concurrency']} / 검색 {result['searches']}회"))
+        self.stdout.write(
+            f"  지연 시간    p50 {result['p50_ms']}ms, p95 {result['p95_ms']}ms "
+            f"(처리량 {result['throughput_per_s']}회/s, 실패 {result['failed_searches']}회)"
+        )
+        self.stdout.write(
+            f"  검색당 호출  YouTube {result['youtube_calls_per_search']}회 "
+            f"(할당량 {result['quota_units_per_search']}단위), OpenAI {result['openai_calls_per_search']}회 "
+            f"({result['openai_tokens_per_search']}토큰)"
+        )
+        if options['verbosity'] >= 2:
+            self.stdout.write(f"  YouTube 엔드포인트별 호출: {result['youtube']['calls']} 오류: {result['youtube']['errors']}")
+            self.stdout.write(f"  OpenAI 프롬프트별 호출: {result['openai']['calls']} 오류: {result['openai']['errors']}")
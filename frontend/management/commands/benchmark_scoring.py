@@ -0,0 +1,114 @@
+# frontend/management/commands/benchmark_scoring.py
+"""
+채널 점수 계산 방식별 속도 비교 벤치마크 (frontend/scoring.py).
+무작위로 만든 채널 N개의 활동성·신뢰도 점수를
+  - 채널 하나씩 계산 (calculate_activity_score / calculate_reliability_score)
+  - 열 배열로 한 번에 계산 (parse_timestamps + activity_scores / reliability_scores)
+두 방식으로 계산하여 소요 시간과 결과 차이를 보고합니다.
+
+    python manage.py benchmark_scoring --channels 10000,100000
+"""
+import json
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from frontend.scoring import (
+    calculate_activity_score, calculate_reliability_score,
+    parse_timestamps, activity_scores, reliability_scores,
+)
+
+
+def make_channels(count: int, now: float, seed: int = 0) -> dict:
+    """점수 계산에 쓰는 열 배열 형태의 무작위 채널 데이터"""
+    rng = np.random.default_rng(seed)
+    subscribers = rng.integers(0, 5_000_000, count)
+    upload_times = now - rng.integers(0, 400 * 86400, count)
+    return {
+        'video_counts': rng.integers(0, 2000, count),
+        # 5%는 업로드 기록 없음
+        'last_upload_dates': [
+            datetime.fromtimestamp(int(t), timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ') if keep else None
+            for t, keep in zip(upload_times, rng.random(count) > 0.05)
+        ],
+        'subscriber_counts': subscribers,
+        'view_counts': subscribers * rng.integers(0, 2000, count),
+        'like_counts': rng.integers(0, 50_000, count),
+        'dislike_counts': rng.integers(0, 2_000, count),
+        'video_duration_avg_seconds': rng.integers(0, 3600, count).astype(float),
+    }
+
+
+class Command(BaseCommand):
+    help = "채널 점수를 하나씩 계산할 때와 NumPy 배열로 한 번에 계산할 때의 속도를 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--channels', default='10000', help="채널 수 (쉼표로 여러 단계)")
+        parser.add_argument('--repeat', type=int, default=3, help="각 방식의 반복 횟수 (가장 빠른 값 사용)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help="결과를 JSON 한 줄씩 출력")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['channels'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError("--channels는 쉼표로 구분한 정수여야 합니다. (예: 10000,100000)")
+        if not sizes or min(sizes) < 1 or options['repeat'] < 1:
+            raise CommandError("--channels와 --repeat는 1 이상이어야 합니다.")
+
+        now = datetime.now(timezone.utc).timestamp()
+        for size in sizes:
+            result = self._run(size, now, options)
+            if options['json']:
+                self.stdout.write(json.dumps(result))
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(f"채널 {result['channels']}개"))
+            self.stdout.write(
+                f"  하나씩 {result['per_channel_ms']}ms, 배열 {result['vectorized_ms']}ms "
+                f"({result['speedup']}배), 최대 점수 차이 {result['max_abs_diff']}"
+            )
+
+    def _run(self, size: int, now: float, options: dict) -> dict:
+        channels = make_channels(size, now, options['seed'])
+
+        def per_channel():
+            activity, reliability = [], []
+            for i in range(size):
+                activity.append(calculate_activity_score(
+                    int(channels['video_counts'][i]), channels['last_upload_dates'][i], now=now))
+                reliability.append(calculate_reliability_score(
+                    int(channels['subscriber_counts'][i]), int(channels['view_counts'][i]),
+                    int(channels['like_counts'][i]), int(channels['dislike_counts'][i]),
+                    channels['video_duration_avg_seconds'][i]))
+            return np.array(activity), np.array(reliability)
+
+        def vectorized():
+            upload_times = parse_timestamps(channels['last_upload_dates'])
+            return (
+                activity_scores(channels['video_counts'], upload_times, now=now),
+                reliability_scores(channels['subscriber_counts'], channels['view_counts'], channels['like_counts'],
+                                   channels['dislike_counts'], channels['video_duration_avg_seconds']),
+            )
+
+        per_channel_seconds, expected = self._best_of(per_channel, options['repeat'])
+        vectorized_seconds, actual = self._best_of(vectorized, options['repeat'])
+        max_abs_diff = max(float(np.max(np.abs(e - a), initial=0)) for e, a in zip(expected, actual))
+        return {
+            'channels': size,
+            'per_channel_ms': round(per_channel_seconds * 1000, 2),
+            'vectorized_ms': round(vectorized_seconds * 1000, 2),
+            'speedup': round(per_channel_seconds / vectorized_seconds, 1) if vectorized_seconds else None,
+            'max_abs_diff': max_abs_diff,
+        }
+
+    @staticmethod
+    def _best_of(fn, repeat: int):
+        best, result = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
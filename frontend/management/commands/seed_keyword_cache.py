@@ -0,0 +1,47 @@
+# frontend/management/commands/seed_keyword_cache.py
+"""
+과거 검색 기록(SearchHistory)의 추출 검색어로 키워드 추출 캐시(gptAPI/cache.py)를 미리 채웁니다.
+같은 검색어(정규화 기준)는 가장 최근 기록만 사용하고, 이미 캐시에 있는 검색어는 건너뜁니다.
+기록 시각을 추출 시각으로 저장하므로 KEYWORD_CACHE_TTL보다 오래된 기록은 사용하지 않습니다.
+
+    python manage.py seed_keyword_cache --limit 5000
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from gptAPI.cache import normalize_keyword_query, store_keywords, DEFAULT_KEYWORD_CACHE_TTL
+from gptAPI.models import KeywordExtraction
+from frontend.models import SearchHistory
+
+
+class Command(BaseCommand):
+    help = "과거 검색 기록의 추출 검색어로 키워드 추출 캐시를 미리 채웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=5000, help="읽을 최근 검색 기록 수")
+
+    def handle(self, *args, **options):
+        if options['limit'] < 1:
+            raise CommandError("--limit는 1 이상이어야 합니다.")
+
+        ttl = getattr(settings, 'KEYWORD_CACHE_TTL', DEFAULT_KEYWORD_CACHE_TTL)
+        cutoff = timezone.now() - timedelta(seconds=ttl)
+        histories = (SearchHistory.objects
+                     .filter(timestamp__gte=cutoff)
+                     .exclude(keywords=[])
+                     .only('query', 'keywords', 'timestamp')
+                     .order_by('-timestamp')[:options['limit']])
+        seen = set(KeywordExtraction.objects.filter(extracted_at__gte=cutoff).values_list('query_key', flat=True))
+
+        seeded = 0
+        for history in histories:
+            query_key = normalize_keyword_query(history.query)
+            if query_key in seen:
+                continue
+            seen.add(query_key)
+            store_keywords(history.query, history.keywords, extracted_at=history.timestamp)
+            seeded += 1
+        self.stdout.write(self.style.SUCCESS(f"키워드 캐시에 검색어 {seeded}개를 추가했습니다."))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(help_text='사용자가 입력한 원본 검색어', max_length=500)),
+                ('query_hash', models.CharField(help_text='정규화한 검색어의 SHA-256 해시', max_length=64)),
+                ('keywords', models.JSONField(default=list, help_text='AI가 추출한 검색어 목록')),
+                ('recommendations', models.JSONField(default=list, help_text='최종 점수순으로 정렬된 채널 목록 (점수/이유 포함)')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='검색 시간')),
+            ],
+            options={
+                'verbose_name': '검색 기록',
+                'verbose_name_plural': '검색 기록',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['query_hash', '-timestamp'], name='search_history_query_recent')],
+            },
+        ),
+    ]
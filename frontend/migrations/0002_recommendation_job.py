@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:08
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('frontend', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('query', models.CharField(help_text='사용자가 입력한 원본 검색어', max_length=500)),
+                ('query_hash', models.CharField(help_text='정규화한 검색어의 SHA-256 해시', max_length=64)),
+                ('status', models.CharField(choices=[('queued', '대기'), ('running', '실행 중'), ('done', '완료'), ('error', '오류')], default='queued', max_length=10)),
+                ('keywords', models.JSONField(default=list, help_text='AI가 추출한 검색어 목록')),
+                ('channels', models.JSONField(default=list, help_text='평가가 끝난 채널 (완료 순서대로)')),
+                ('result', models.JSONField(blank=True, help_text='최종 result_data', null=True)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='등록 시간')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='갱신 시간')),
+            ],
+            options={
+                'verbose_name': '추천 작업',
+                'verbose_name_plural': '추천 작업',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['query_hash', 'status'], name='recommendation_job_active')],
+            },
+        ),
+    ]
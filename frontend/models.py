@@ -3,6 +3,8 @@ from django.db import models
 # Create your models here.
 # wjxoqkdl-bit/ai_capstone_test_code-edited-/AI_CAPSTONE_TEST_CODE-edited--b4f109e81c2e0339c6a3b49cd506a85a3bd5130c/frontend/models.py
 
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User  # (선택사항) 나중에 사용자별로 연동할 경우
 
@@ -15,12 +17,79 @@ class SearchHistory(models.Model):
     # user = models.ForeignKey(User, on_delete=models.CASCADE)
 
     query = models.CharField(max_length=500, help_text="사용자가 입력한 원본 검색어")
+    # 정규화한 검색어(공백/대소문자 무시)의 SHA-256. 같은 검색어의 최근 결과를 인덱스로 바로 찾기 위함
+    query_hash = models.CharField(max_length=64, help_text="정규화한 검색어의 SHA-256 해시")
+    keywords = models.JSONField(default=list, help_text="AI가 추출한 검색어 목록")
+    recommendations = models.JSONField(default=list, help_text="최종 점수순으로 정렬된 채널 목록 (점수/이유 포함)")
     timestamp = models.DateTimeField(auto_now_add=True, verbose_name="검색 시간")
 
     class Meta:
         ordering = ['-timestamp']  # 최신순으로 정렬
         verbose_name = "검색 기록"
         verbose_name_plural = "검색 기록"
+        indexes = [
+            models.Index(fields=['query_hash', '-timestamp'], name='search_history_query_recent'),
+        ]
+
+    def as_result_data(self, user_query: str = None) -> dict:
+        """_search_results.html에 넘길 result_data 형태로 변환"""
+        return {
+            'user_query': user_query or self.query,
+            'keywords': self.keywords,
+            'recommendations': self.recommendations,
+        }
+
+    def __str__(self):
+        return f"[{self.timestamp.strftime('%Y-%m-%d %H:%M')}] {self.query}"
+
+
+class RecommendationJob(models.Model):
+    """
+    백그라운드에서 실행하는 추천 작업 (frontend/jobs.py)
+    웹 요청은 작업을 등록하고 바로 반환하며, 페이지는 작업 상태를 주기적으로 조회하여
+    단계별 중간 결과(검색어, 평가가 끝난 채널)와 최종 결과를 표시합니다.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    ERROR = 'error'
+    STATUS_CHOICES = [(QUEUED, '대기'), (RUNNING, '실행 중'), (DONE, '완료'), (ERROR, '오류')]
+    ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    query = models.CharField(max_length=500, help_text="사용자가 입력한 원본 검색어")
+    query_hash = models.CharField(max_length=64, help_text="정규화한 검색어의 SHA-256 해시")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    keywords = models.JSONField(default=list, help_text="AI가 추출한 검색어 목록")
+    channels = models.JSONField(default=list, help_text="평가가 끝난 채널 (완료 순서대로)")
+    result = models.JSONField(null=True, blank=True, help_text="최종 result_data")
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="등록 시간")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="갱신 시간")
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['query_hash', 'status'], name='recommendation_job_active'),
+        ]
+        verbose_name = "추천 작업"
+        verbose_name_plural = "추천 작업"
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.DONE, self.ERROR)
+
+    def as_status_dict(self) -> dict:
+        """상태 조회 API(JSON) 응답"""
+        return {
+            'id': str(self.id),
+            'status': self.status,
+            'query': self.query,
+            'keywords': self.keywords,
+            'channels': self.channels,
+            'result': self.result,
+            'error': self.error_message or None,
+        }
 
     def __str__(self):
-        return f"[{self.timestamp.strftime('%Y-%m-%d %H:%M')}] {self.query}"
\ No newline at end of file
+        return f"[{self.status}] {self.query}"
@@ -0,0 +1,503 @@
+# frontend/pipeline.py
+"""
+채널 단위 보강(enrichment) 작업을 제한된 동시성으로 처리하는 엔진.
+
+각 채널은 두 단계를 거칩니다.
+  1) fetch    : YouTube API 호출 (채널 통계, 최신 영상 등)
+  2) evaluate : OpenAI 호출 (채널 분석 -> 관련도 평가)
+
+두 단계는 서로 다른 스레드 풀에서 실행되므로, 동시에 진행되는
+YouTube 호출 수와 OpenAI 호출 수를 각각 제한할 수 있습니다.
+fetch가 끝난 채널은 다른 채널을 기다리지 않고 곧바로 evaluate 단계로 넘어갑니다.
+
+evaluate_batch를 지정하면 evaluate 결과를 evaluate_batch_size개씩 모아
+한 번에 처리하는 세 번째 단계가 추가됩니다. (예: 관련도 평가를 한 번의 OpenAI 요청으로)
+
+select를 지정하면 모든 fetch가 끝날 때까지 기다렸다가(barrier) select가 고른 항목만
+evaluate 단계로 넘깁니다. (예: 후보를 로컬에서 미리 순위 매겨 OpenAI 호출 수를 줄이기)
+이때 evaluate_window를 지정하면 고른 순서대로 그 수만큼씩만 진행하고, admit이 거절한 항목은
+evaluate하지 않고 건너뜁니다. (예: 상위 K에 들 수 없는 채널의 OpenAI 호출 생략)
+
+items는 생성기여도 됩니다. 항목이 만들어지는 대로 fetch를 제출하므로, CandidateSearch처럼
+검색 결과를 하나씩 내보내는 생성기를 넘기면 나머지 검색이 끝나기 전에 먼저 찾은 채널의 fetch가 시작됩니다.
+
+동기 뷰와 비동기(async) 뷰는 같은 단계를 씁니다. 후보 검색(CandidateSearch / AsyncCandidateSearch),
+평가 순서·건너뛰기·최종 정렬(EvaluationPlan)은 여기에 한 번만 구현되어 있고, YouTube/DB 호출이 섞인 단계는
+호출을 (이름, 인자...) 요청으로 내보내는 생성기로 작성하여 drive(동기 함수) / adrive(코루틴 함수)로 실행합니다.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generator, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from core.tracing import metrics, ENRICHMENT_TIMEOUTS
+from gptAPI.cache import normalize_query
+from youtube_api.search_planner import MAX_RESULTS_STEPS
+from .prerank import CandidatePruner
+from .ranking import TopKTracker
+
+
+@dataclass(frozen=True)
+class PipelineConfig:
+    """보강 파이프라인의 동시성/타임아웃 설정"""
+    youtube_max_in_flight: int = 5
+    openai_max_in_flight: int = 4
+    fetch_timeout: float = 60.0
+    evaluate_timeout: float = 120.0
+    evaluate_batch_size: int = 10
+    evaluate_window: int = 0  # select 이후 동시에 진행할 evaluate 항목 수 (0이면 제한 없음)
+
+    @classmethod
+    def from_settings(cls) -> "PipelineConfig":
+        """Django settings 값을 읽어 설정 객체를 만듭니다. (없으면 기본값 사용)"""
+        return cls(
+            youtube_max_in_flight=getattr(settings, 'RECOMMENDATION_YOUTUBE_MAX_IN_FLIGHT', cls.youtube_max_in_flight),
+            openai_max_in_flight=getattr(settings, 'RECOMMENDATION_OPENAI_MAX_IN_FLIGHT', cls.openai_max_in_flight),
+            fetch_timeout=getattr(settings, 'RECOMMENDATION_FETCH_TIMEOUT', cls.fetch_timeout),
+            evaluate_timeout=getattr(settings, 'RECOMMENDATION_EVALUATE_TIMEOUT', cls.evaluate_timeout),
+            evaluate_batch_size=getattr(settings, 'RECOMMENDATION_EVALUATE_BATCH_SIZE', cls.evaluate_batch_size),
+        )
+
+
+def _submit(pool: ThreadPoolExecutor, fn, *args):
+    """호출한 쪽의 contextvars(현재 trace 등)를 그대로 가진 채 작업 스레드에서 실행합니다."""
+    return pool.submit(contextvars.copy_context().run, _run_task, fn, *args)
+
+
+def _run_task(fn, *args):
+    """
+    작업 스레드에서 fn을 실행합니다.
+    (작업 중 캐시 등으로 DB를 사용했다면, 스레드가 연결을 남기지 않도록 닫아줍니다)
+    """
+    try:
+        return fn(*args)
+    finally:
+        connections.close_all()
+
+
+class CandidateSearch:
+    """
+    후보 채널 검색 단계. 검색어가 정해지는 대로 검색을 시작하고, 결과는 검색어를 넣은 순서대로 내보냅니다.
+
+        planner = SearchPlanner.from_settings()
+        candidates = CandidateSearch(
+            lambda query, max_results: collector.search_channels(keyword=query, max_results=max_results),
+            planner=planner)
+        search_queries = extract_keywords(user_query, on_keyword=candidates.submit)  # 추출되는 대로 검색 시작
+        candidates.submit_all(search_queries)
+        for query, channels in candidates.iter_results():
+            ...
+
+    - 검색은 max_in_flight개까지 작업 스레드에서 동시에 실행합니다. (정규화했을 때 같은 검색어는 한 번만)
+    - planner(youtube_api/search_planner.py)를 넘기면 검색할지와 받을 채널 수를 계획에 따르고,
+      모든 결과를 내보낸 뒤 계획/실제 사용 할당량을 report에 남깁니다. (없으면 모든 검색어를 기본 개수로 검색)
+    - iter_results는 앞선 검색어의 결과가 나온 뒤에 다음 검색어의 결과를 내보내므로 후보 순서가 항상 같고,
+      이전 검색어에서 이미 나온 채널은 제외합니다.
+    - 실패한 검색은 errors에 기록하고 건너뜁니다.
+    """
+
+    def __init__(self, search: Callable[[str, int], List[dict]], max_in_flight: int = 5, planner=None):
+        self.search = search
+        self.planner = planner
+        self.pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='candidate-search')
+        self.lock = threading.Lock()
+        self.futures = []  # (검색어, future) 넣은 순서대로
+        self.queries = set()
+        self.errors = []
+        self.found = 0
+        self.report = None
+
+    def submit(self, query: str):
+        """검색을 시작합니다. (이미 넣은 검색어나 계획에서 빠진 검색어는 무시, 여러 스레드에서 호출해도 안전)"""
+        key = normalize_query(query)
+        with self.lock:
+            if not key or key in self.queries:
+                return
+            self.queries.add(key)
+            max_results = _planned_max_results(self.planner, query)
+            if max_results is None:
+                return
+            self.futures.append((query, _submit(self.pool, self.search, query, max_results)))
+
+    def submit_all(self, queries: Iterable[str]):
+        for query in queries:
+            self.submit(query)
+
+    def iter_results(self) -> Iterator[Tuple[str, Dict[str, dict]]]:
+        """(검색어, 새로 나온 {channel_id: channel})를 검색어 순서대로 내보냅니다."""
+        seen = set()
+        index = 0
+        while True:
+            with self.lock:
+                if index >= len(self.futures):
+                    break
+                query, future = self.futures[index]
+            index += 1
+            try:
+                found_channels = future.result()
+            except Exception as e:
+                print(f"Candidate Search Error ({query}): {e}")
+                self.errors.append(e)
+                continue
+            channels = _new_channels(found_channels, seen)
+            self.found += len(channels)
+            yield query, channels
+        if self.planner is not None:
+            self.report = self.planner.report()
+
+    def close(self):
+        """끝나지 않은 검색은 기다리지 않고 버립니다."""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncCandidateSearch:
+    """
+    [async] CandidateSearch의 비동기 버전. search는 (검색어, 받을 채널 수)를 받는 코루틴 함수이고,
+    검색은 이벤트 루프의 작업으로 max_in_flight개까지 동시에 실행합니다. (계획/중복 제거/결과 순서는 같음)
+    submit은 동기 함수이므로 키워드 추출의 on_keyword로 그대로 넘길 수 있습니다.
+    """
+
+    def __init__(self, search: Callable[[str, int], Any], max_in_flight: int = 5, planner=None):
+        self.search = search
+        self.planner = planner
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.tasks = []  # (검색어, task) 넣은 순서대로
+        self.queries = set()
+        self.errors = []
+        self.found = 0
+        self.report = None
+
+    def submit(self, query: str):
+        """검색을 시작합니다. (이미 넣은 검색어는 무시, 계획에서 빠진 검색어의 작업은 빈 결과를 반환)"""
+        key = normalize_query(query)
+        if not key or key in self.queries:
+            return
+        self.queries.add(key)
+        self.tasks.append((query, asyncio.ensure_future(self._search(query))))
+
+    def submit_all(self, queries: Iterable[str]):
+        for query in queries:
+            self.submit(query)
+
+    async def _search(self, query: str) -> list:
+        # 검색 계획은 응답 캐시를 확인하므로 이벤트 루프 밖에서 실행
+        max_results = await sync_to_async(_planned_max_results)(self.planner, query)
+        if max_results is None:
+            return []
+        async with self.slots:
+            return await self.search(query, max_results)
+
+    async def iter_results(self):
+        """(검색어, 새로 나온 {channel_id: channel})를 검색어 순서대로 내보냅니다."""
+        seen = set()
+        index = 0
+        while index < len(self.tasks):
+            query, task = self.tasks[index]
+            index += 1
+            try:
+                found_channels = await task
+            except Exception as e:
+                print(f"Candidate Search Error ({query}): {e}")
+                self.errors.append(e)
+                continue
+            channels = _new_channels(found_channels, seen)
+            self.found += len(channels)
+            yield query, channels
+        if self.planner is not None:
+            self.report = await sync_to_async(self.planner.report)()
+
+    def close(self):
+        """끝나지 않은 검색은 취소합니다."""
+        for _, task in self.tasks:
+            task.cancel()
+
+
+def _planned_max_results(planner, query: str) -> Optional[int]:
+    """검색 계획에 따라 받을 채널 수 (계획에서 빠진 검색어는 None, 계획이 없으면 기본 개수)"""
+    if planner is None:
+        return MAX_RESULTS_STEPS[0]
+    planned = planner.add(query)
+    return planned.max_results if planned is not None else None
+
+
+def _new_channels(found_channels: list, seen: set) -> Dict[str, dict]:
+    """검색 결과 중 앞선 검색어에서 나오지 않은 채널만 {channel_id: channel}로 (seen을 갱신)"""
+    channels = {}
+    for channel in found_channels:
+        channel_id = channel['id']['channelId']
+        if channel_id not in seen:
+            seen.add(channel_id)
+            channels[channel_id] = channel
+    return channels
+
+
+class EvaluationPlan:
+    """
+    fetch가 끝난 후보 채널 중 무엇을 어떤 순서로 AI 평가할지와 최종 결과 정리 (동기/비동기 뷰 공용)
+
+    - 쿼리와 어휘가 많이 겹치는 채널만 골라 AI 분석 (frontend/prerank.py)
+    - 상위 K개만 보여줄 때는 점수 상한이 높은 채널부터 K개씩 평가하고, 상위 K에 들 수 없는 채널은 건너뜀
+      (frontend/ranking.py)
+
+    동기 경로는 select/admit/window를 iter_enrichment에 넘기고, 비동기 경로는 waves()로 같은 순서를 따릅니다.
+    평가가 끝난 채널은 add()로 알려야 다음 채널을 건너뛸지 판단할 수 있습니다.
+    """
+
+    def __init__(self, user_query: str, search_queries: list, top_k: int = None):
+        self.pruner = CandidatePruner(user_query, search_queries)
+        self.top_k = TopKTracker(getattr(settings, 'RECOMMENDATION_TOP_K', 0) if top_k is None else top_k)
+
+    @property
+    def window(self) -> int:
+        """동시에 평가할 채널 수 (iter_enrichment의 evaluate_window, 0이면 제한 없음)"""
+        return self.top_k.k
+
+    def select(self, fetched: list) -> list:
+        """
+        사전 순위로 고른 채널을 AI 점수 상한이 높은 순서로 정렬
+        (점검용으로 함께 분석하는 잘라낸 채널은 맨 뒤)
+        """
+        channel_ids = self.pruner.select(fetched)
+        kept = [channel_id for channel_id in channel_ids if not self.pruner.is_pruned(channel_id)]
+        audited = [channel_id for channel_id in channel_ids if self.pruner.is_pruned(channel_id)]
+        return self.top_k.order(kept, dict(fetched)) + audited
+
+    def admit(self, channel_id: str, channel_metrics: dict) -> bool:
+        """평가 직전에 호출하여, 상위 K에 들 수 없는 채널이면 False (점검용 채널은 항상 평가)"""
+        return self.pruner.is_pruned(channel_id) or self.top_k.can_enter(channel_metrics)
+
+    def waves(self, fetched: list) -> Iterator[list]:
+        """select 순서대로 window개씩 admit을 통과한 채널 ID 목록을 내보냄 (다음 묶음은 이전 묶음을 add한 뒤에 판단)"""
+        metrics_by_id = dict(fetched)
+        queue = deque(self.select(fetched))
+        window = self.window or len(queue)
+        while queue:
+            wave = []
+            while queue and len(wave) < window:
+                channel_id = queue.popleft()
+                if self.admit(channel_id, metrics_by_id[channel_id]):
+                    wave.append(channel_id)
+            if wave:
+                yield wave
+
+    def add(self, rated_channel: dict) -> bool:
+        """평가가 끝난 채널을 반영하고, 화면에 보일 채널(점검용이 아님)이면 True"""
+        if self.pruner.is_pruned(rated_channel['channel_id']):
+            return False
+        self.top_k.add(rated_channel['final_score'])
+        return True
+
+    def visible(self, rated_channels: list) -> list:
+        """
+        점수 내림차순, 동점이면 검색 결과 순서대로 정렬 (결과 순서를 항상 동일하게 유지)
+        점검용으로 분석한 잘라낸 채널은 집계 후 제외하고, 상위 K개만 남김
+        """
+        sorted_channels = sorted(rated_channels, key=lambda channel: (-channel['final_score'], channel['order']))
+        self.pruner.record_audit(sorted_channels)
+        visible = [channel for channel in sorted_channels if not self.pruner.is_pruned(channel['channel_id'])]
+        return visible[:self.top_k.k] if self.top_k.enabled else visible
+
+
+def drive(steps: Generator, handlers: Dict[str, Callable]):
+    """
+    I/O 요청을 내보내는 단계 생성기를 동기 함수로 실행하고 그 반환값을 돌려줍니다.
+    steps는 (이름, 인자...)를 yield하고 handlers[이름](*인자)의 결과를 돌려받습니다. (예외는 생성기 안으로 전달)
+    """
+    result, error = None, None
+    while True:
+        try:
+            request = steps.throw(error) if error is not None else steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+        name, *args = request
+        try:
+            result, error = handlers[name](*args), None
+        except Exception as e:
+            result, error = None, e
+
+
+async def adrive(steps: Generator, handlers: Dict[str, Callable]):
+    """[async] drive의 비동기 버전 (handlers는 코루틴 함수)"""
+    result, error = None, None
+    while True:
+        try:
+            request = steps.throw(error) if error is not None else steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+        name, *args = request
+        try:
+            result, error = await handlers[name](*args), None
+        except Exception as e:
+            result, error = None, e
+
+
+async def within_timeout(stage: str, key, coroutine, timeout: float):
+    """
+    [async] iter_enrichment의 단계 제한 시간/오류 처리와 같게 coroutine을 실행합니다.
+    (제한 시간을 넘기면 작업을 취소하고 None, 예외가 나도 None)
+    """
+    try:
+        return await asyncio.wait_for(coroutine, timeout)
+    except asyncio.TimeoutError:
+        metrics.inc(ENRICHMENT_TIMEOUTS, {'stage': stage, 'outcome': 'cancelled'})
+        print(f"Enrichment Timeout ({stage}, {key}): 단계 제한 시간을 초과하여 제외합니다. (cancelled)")
+    except Exception as e:
+        print(f"Enrichment Error ({stage}, {key}): {e}")
+    return None
+
+
+def iter_enrichment(
+    items: Iterable[Tuple[Hashable, Any]],
+    fetch: Callable[[Hashable, Any], Any],
+    evaluate: Callable[[Hashable, Any], Any],
+    config: Optional[PipelineConfig] = None,
+    evaluate_batch: Optional[Callable[[List[Tuple[Hashable, Any]]], Dict[Hashable, Any]]] = None,
+    select: Optional[Callable[[List[Tuple[Hashable, Any]]], Iterable[Hashable]]] = None,
+    admit: Optional[Callable[[Hashable, Any], bool]] = None,
+) -> Iterator[Tuple[Hashable, Any]]:
+    """
+    (key, payload) 목록을 fetch -> evaluate 순서로 병렬 처리하고,
+    evaluate가 끝나는 순서대로 (key, result)를 내보냅니다.
+
+    - fetch/evaluate가 None을 반환하거나 예외를 던진 항목은 결과에서 제외됩니다.
+    - fetch 단계는 각 항목이 제출된 시점부터 fetch_timeout 안에 끝나야 합니다.
+      (items 생성기가 다음 항목을 만드는 시간(검색 등)은 포함되지 않음)
+    - evaluate 단계는 각 항목이 제출된 시점부터 evaluate_timeout 안에 끝나야 합니다.
+    - 시간 초과된 항목은 결과에서 제외됩니다. 아직 시작하지 않은 작업은 취소되지만, 이미 실행 중인 작업은
+      스레드를 중단할 수 없으므로 취소되지 않고 결과만 버려집니다. (실행 중인 YouTube/OpenAI 호출은 각 클라이언트의
+      요청 제한 시간(googleapiclient 기본 60초, OPENAI_REQUEST_TIMEOUT)까지 계속되며 할당량을 사용할 수 있음)
+      어느 쪽인지는 enrichment_timeouts_total 지표(outcome=cancelled/abandoned)로 집계됩니다.
+    - evaluate_batch가 있으면 evaluate 결과를 evaluate_batch_size개씩 (또는 더 기다릴 항목이
+      없을 때 남은 만큼) 모아 [(key, evaluated), ...] 로 넘기고, 반환된 {key: result}를 내보냅니다.
+      묶음도 제출 시점부터 evaluate_timeout 안에 끝나야 합니다.
+    - select가 있으면 fetch 결과를 모두 모아 입력 순서대로 [(key, fetched), ...] 로 넘기고, 반환된 key들만
+      반환된 순서대로 evaluate 단계에 제출합니다. (select가 실패하면 모든 항목을 제출)
+    - evaluate_window가 있으면 select가 고른 항목 중 evaluate/evaluate_batch가 끝나지 않은 항목이
+      evaluate_window개 미만일 때만 다음 항목을 제출하고, 제출 직전에 admit(key, fetched)가
+      False를 반환하면 그 항목은 건너뜁니다. admit은 그때까지 내보낸 결과를 호출한 쪽이
+      모두 처리한 뒤에 호출되므로, 호출한 쪽은 받은 결과를 바탕으로 건너뛸지 판단할 수 있습니다.
+    """
+    config = config or PipelineConfig.from_settings()
+    fetch_pool = ThreadPoolExecutor(max_workers=config.youtube_max_in_flight, thread_name_prefix='enrich-fetch')
+    evaluate_pool = ThreadPoolExecutor(max_workers=config.openai_max_in_flight, thread_name_prefix='enrich-evaluate')
+
+    # future -> (stage, key, deadline)  (batch 단계의 key는 묶음에 포함된 key 튜플)
+    pending = {}
+    batch = []
+    # select를 기다리는 fetch 결과 (select가 없거나 이미 실행했으면 None)
+    fetched = [] if select is not None else None
+    # select가 고른 뒤 evaluate 제출을 기다리는 (key, fetched) 목록
+    queued = deque()
+
+    def submit_batch():
+        chunk = batch[:config.evaluate_batch_size]
+        del batch[:config.evaluate_batch_size]
+        future = _submit(evaluate_pool, evaluate_batch, chunk)
+        pending[future] = ('batch', tuple(key for key, _ in chunk), time.monotonic() + config.evaluate_timeout)
+
+    def submit_evaluate(key, result):
+        future = _submit(evaluate_pool, evaluate, key, result)
+        pending[future] = ('evaluate', key, time.monotonic() + config.evaluate_timeout)
+
+    def queue_selected(fetched_items):
+        # fetch가 끝난 순서가 아니라 입력 순서대로 넘김
+        fetched_items = sorted(fetched_items, key=lambda item: input_order[item[0]])
+        results = dict(fetched_items)
+        try:
+            selected_keys = list(select(fetched_items))
+        except Exception as e:
+            print(f"Enrichment Error (select): {e}")
+            selected_keys = list(results)
+        for key in selected_keys:
+            if key in results:
+                queued.append((key, results.pop(key)))
+
+    def evaluating_count():
+        count = len(batch)
+        for stage, key, _ in pending.values():
+            if stage == 'evaluate':
+                count += 1
+            elif stage == 'batch':
+                count += len(key)
+        return count
+
+    def submit_queued():
+        while queued and (not config.evaluate_window or evaluating_count() < config.evaluate_window):
+            key, result = queued.popleft()
+            if admit is not None and not admit(key, result):
+                continue
+            submit_evaluate(key, result)
+
+    try:
+        input_order = {}
+        for key, payload in items:
+            input_order[key] = len(input_order)
+            future = _submit(fetch_pool, fetch, key, payload)
+            pending[future] = ('fetch', key, time.monotonic() + config.fetch_timeout)
+
+        while pending or batch or queued or fetched is not None:
+            if fetched is not None and all(stage != 'fetch' for stage, _, _ in pending.values()):
+                queue_selected(fetched)
+                fetched = None
+            submit_queued()
+            if not pending and not batch:
+                continue
+
+            if batch and (len(batch) >= config.evaluate_batch_size
+                          or all(stage == 'batch' for stage, _, _ in pending.values())):
+                submit_batch()
+                continue
+
+            next_deadline = min(deadline for _, _, deadline in pending.values())
+            done, _ = wait(list(pending), timeout=max(0.0, next_deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+
+            for future in done:
+                stage, key, _ = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Enrichment Error ({stage}, {key}): {e}")
+                    continue
+                if result is None:
+                    continue
+
+                if stage == 'fetch' and fetched is not None:
+                    fetched.append((key, result))
+                elif stage == 'fetch':
+                    submit_evaluate(key, result)
+                elif stage == 'evaluate' and evaluate_batch is not None:
+                    batch.append((key, result))
+                elif stage == 'batch':
+                    for batch_key, batch_result in result.items():
+                        if batch_result is not None:
+                            yield batch_key, batch_result
+                else:
+                    yield key, result
+
+            now = time.monotonic()
+            for future, (stage, key, deadline) in list(pending.items()):
+                if deadline <= now and not future.done():
+                    # 실행 중인 작업은 cancel()이 실패하므로 결과만 버림
+                    outcome = 'cancelled' if future.cancel() else 'abandoned'
+                    del pending[future]
+                    metrics.inc(ENRICHMENT_TIMEOUTS, {'stage': stage, 'outcome': outcome})
+                    print(f"Enrichment Timeout ({stage}, {key}): 단계 제한 시간을 초과하여 제외합니다. ({outcome})")
+    finally:
+        # 시간 초과로 남은 작업은 기다리지 않고 버립니다. (시작하지 않은 작업만 취소되고, 실행 중인 작업은 끝까지 실행됨)
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        evaluate_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_enrichment(items, fetch, evaluate, config: Optional[PipelineConfig] = None, evaluate_batch=None,
+                   select=None, admit=None) -> dict:
+    """iter_enrichment의 모든 결과를 {key: result} 딕셔너리로 모아 반환합니다."""
+    return dict(iter_enrichment(items, fetch, evaluate, config, evaluate_batch, select, admit))
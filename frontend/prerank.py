@@ -0,0 +1,114 @@
+# frontend/prerank.py
+"""
+LLM 단계 전에 후보 채널을 로컬에서 미리 순위 매겨 일부만 분석하도록 줄이는 사전 순위(pre-ranking).
+
+채널 분석/관련도 평가(OpenAI)는 채널마다 비용이 들기 때문에, 검색으로 모은 후보 중
+사용자 쿼리·추출 키워드와 어휘가 가장 많이 겹치는 RECOMMENDATION_PRERANK_TOP_K개만 분석합니다.
+점수는 채널 이름/설명과 최신 영상 제목·설명·태그(_compute_channel_metrics의 channel_text)에 대한 BM25입니다.
+(네트워크 호출 없음, 후보가 수십 개 수준이므로 NumPy 밀집 행렬로 계산)
+
+잘라낸 채널이 실제로는 최종 순위에 들었을지 확인하기 위해, RECOMMENDATION_PRERANK_AUDIT_RATE 비율의
+요청은 잘라낸 채널도 분석만 해 보고(화면에는 표시하지 않음) 결과를 prerank_audit_channels_total에 집계합니다.
+"""
+import random
+import re
+
+import numpy as np
+from django.conf import settings
+
+from core.tracing import metrics, span, PRERANK_CHANNELS, PRERANK_AUDIT
+
+DEFAULT_TOP_K = 8
+DEFAULT_AUDIT_RATE = 0.05
+
+_TOKEN_PATTERN = re.compile(r'[0-9a-z가-힣]+')
+_HANGUL_PATTERN = re.compile(r'[가-힣]')
+
+
+def tokenize(text: str) -> list:
+    """
+    소문자 단어 단위로 나누고, 한글이 포함된 단어는 글자 2-gram으로 나눕니다.
+    (조사가 붙은 '파이썬을'과 '파이썬'이 '파이', '이썬'으로 겹치도록)
+    """
+    tokens = []
+    for word in _TOKEN_PATTERN.findall((text or '').lower()):
+        if len(word) > 1 and _HANGUL_PATTERN.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def bm25_scores(query: str, documents: list, k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """query에 대한 documents 각각의 BM25 점수 (쿼리에 나온 단어만 어휘로 사용)"""
+    query_tokens = tokenize(query)
+    terms = list(dict.fromkeys(query_tokens))
+    if not documents or not terms:
+        return np.zeros(len(documents))
+
+    column = {term: index for index, term in enumerate(terms)}
+    term_frequency = np.zeros((len(documents), len(terms)))
+    lengths = np.zeros(len(documents))
+    for row, document in enumerate(documents):
+        tokens = tokenize(document)
+        lengths[row] = len(tokens)
+        for token in tokens:
+            index = column.get(token)
+            if index is not None:
+                term_frequency[row, index] += 1
+
+    document_frequency = (term_frequency > 0).sum(axis=0)
+    idf = np.log1p((len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+    query_weight = np.array([query_tokens.count(term) for term in terms])
+    normalized_length = lengths[:, None] / (lengths.mean() or 1.0)
+    saturated = term_frequency * (k1 + 1) / (term_frequency + k1 * (1 - b + b * normalized_length))
+    return (saturated * idf * query_weight).sum(axis=1)
+
+
+class CandidatePruner:
+    """
+    요청 하나의 후보 채널 사전 순위 결정과 점검(audit) 결과를 보관합니다.
+
+        pruner = CandidatePruner(user_query, search_queries)
+        keys = pruner.select([(channel_id, metrics), ...])   # 분석할 채널 ID 목록
+        ...
+        pruner.record_audit(sorted_channels)                 # 점검 요청이면 집계
+        visible = [c for c in sorted_channels if not pruner.is_pruned(c['channel_id'])]
+    """
+
+    def __init__(self, user_query: str, keywords: list, top_k: int = None, audit_rate: float = None):
+        self.query = ' '.join([user_query, *keywords])
+        self.top_k = top_k if top_k is not None else getattr(settings, 'RECOMMENDATION_PRERANK_TOP_K', DEFAULT_TOP_K)
+        if audit_rate is None:
+            audit_rate = getattr(settings, 'RECOMMENDATION_PRERANK_AUDIT_RATE', DEFAULT_AUDIT_RATE)
+        self.audit = random.random() < audit_rate
+        self.pruned = set()
+
+    def select(self, fetched: list) -> list:
+        """(채널 ID, 지표) 목록에서 분석할 채널 ID를 고릅니다. (점검 요청이면 잘라낸 채널도 뒤에 포함)"""
+        channel_ids = [channel_id for channel_id, _ in fetched]
+        if not self.top_k or len(channel_ids) <= self.top_k:
+            return channel_ids
+
+        with span('prerank') as prerank_span:
+            scores = bm25_scores(self.query, [channel_metrics['channel_text'] for _, channel_metrics in fetched])
+            # 점수가 같으면 검색 결과 순서 유지
+            ranked = [channel_ids[index] for index in np.argsort(-scores, kind='stable')]
+            kept, pruned = ranked[:self.top_k], ranked[self.top_k:]
+            self.pruned = set(pruned)
+            prerank_span.set(candidates=len(channel_ids), kept=len(kept), audit=self.audit)
+        metrics.inc(PRERANK_CHANNELS, {'result': 'kept'}, len(kept))
+        metrics.inc(PRERANK_CHANNELS, {'result': 'pruned'}, len(pruned))
+        return kept + pruned if self.audit else kept
+
+    def is_pruned(self, channel_id) -> bool:
+        return channel_id in self.pruned
+
+    def record_audit(self, sorted_channels: list):
+        """점검 요청이면, 잘라낸 채널 중 전체 순위 상위 top_k에 들었을 채널 수를 집계합니다."""
+        if not self.audit or not self.pruned:
+            return
+        top_ids = {channel['channel_id'] for channel in sorted_channels[:self.top_k]}
+        would_rank = len(self.pruned & top_ids)
+        metrics.inc(PRERANK_AUDIT, {'result': 'would_rank'}, would_rank)
+        metrics.inc(PRERANK_AUDIT, {'result': 'correctly_pruned'}, len(self.pruned) - would_rank)
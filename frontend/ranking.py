@@ -0,0 +1,77 @@
+# frontend/ranking.py
+"""
+최종 점수 계산과 상위 K개(top-K) 조기 종료.
+
+    final_score = ai * 0.6 + activity * 0.2 + reliability * 0.2
+
+AI 점수는 0~100이므로, AI 분석 전에 이미 알고 있는 활동성·신뢰도 점수만으로
+채널이 받을 수 있는 최고 점수(상한)가 정해집니다.
+TopKTracker는 상한이 높은 채널부터 AI 평가를 진행하고, 지금까지 평가한 채널들의
+K번째 점수보다 상한이 낮은 채널은 상위 K에 들 수 없으므로 AI를 호출하지 않고 건너뜁니다.
+(건너뛴 채널이 있어도 상위 K개의 결과는 모든 채널을 평가했을 때와 같음)
+"""
+import heapq
+import threading
+
+from core.tracing import metrics, TOPK_SKIPPED
+
+AI_WEIGHT = 0.6
+ACTIVITY_WEIGHT = 0.2
+RELIABILITY_WEIGHT = 0.2
+MAX_AI_SCORE = 100
+
+
+def final_score(ai_score: float, activity_score: float, reliability_score: float) -> float:
+    return round(ai_score * AI_WEIGHT + activity_score * ACTIVITY_WEIGHT + reliability_score * RELIABILITY_WEIGHT, 2)
+
+
+def score_upper_bound(channel_metrics: dict) -> float:
+    """AI 점수가 만점일 때의 최종 점수 (AI 평가 전에 계산 가능한 상한)"""
+    return final_score(MAX_AI_SCORE, channel_metrics['activity_score'], channel_metrics['reliability_score'])
+
+
+class TopKTracker:
+    """
+    요청 하나에서 평가가 끝난 채널 점수 중 상위 K개를 유지하며, 남은 채널을 평가할 필요가 있는지 판단합니다.
+    (k가 0이면 조기 종료하지 않음)
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.top_scores = []  # 상위 K개 점수의 최소 힙
+        self.skipped = 0
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.k > 0
+
+    def order(self, channel_ids: list, metrics_by_id: dict) -> list:
+        """상한이 높은 채널부터 평가하도록 정렬 (상한이 같으면 원래 순서 유지)"""
+        if not self.enabled:
+            return list(channel_ids)
+        return sorted(channel_ids, key=lambda channel_id: -score_upper_bound(metrics_by_id[channel_id]))
+
+    def add(self, score: float):
+        """평가가 끝난 채널의 최종 점수를 반영합니다."""
+        if not self.enabled:
+            return
+        with self.lock:
+            if len(self.top_scores) < self.k:
+                heapq.heappush(self.top_scores, score)
+            elif score > self.top_scores[0]:
+                heapq.heapreplace(self.top_scores, score)
+
+    def can_enter(self, channel_metrics: dict) -> bool:
+        """
+        채널이 상위 K에 들 가능성이 있으면 True.
+        (상한이 K번째 점수와 같으면 검색 순서에 따라 들 수 있으므로 평가)
+        """
+        if not self.enabled:
+            return True
+        with self.lock:
+            if len(self.top_scores) < self.k or score_upper_bound(channel_metrics) >= self.top_scores[0]:
+                return True
+            self.skipped += 1
+        metrics.inc(TOPK_SKIPPED, {})
+        return False
@@ -0,0 +1,143 @@
+# frontend/scoring.py
+"""
+채널 활동성·신뢰도 점수 계산.
+
+- calculate_activity_score / calculate_reliability_score : 채널 하나의 점수 (추천 요청 처리 중 사용)
+- activity_scores / reliability_scores : 채널 여러 개의 열(column) 배열을 받아 NumPy로 한 번에 계산
+  (전체 채널 재채점 같은 오프라인 작업용. 결과는 채널 하나씩 계산한 값과 같음)
+- parse_duration_to_seconds : ISO 8601 영상 길이(PT1H2M3S, P1DT2H 등)를 초로 변환
+
+점수 기준(구간과 가중치)은 두 방식이 같은 상수를 사용합니다.
+(python manage.py benchmark_scoring 으로 두 방식의 속도를 비교할 수 있음)
+"""
+import math
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+
+# 마지막 업로드 후 경과 일수 상한 -> 활동성 점수
+RECENCY_POINTS = ((7, 50), (30, 40), (90, 20), (180, 10))
+# 평균 영상 길이(초) 하한 -> 신뢰도 점수 (0초 초과 ~ 180초 미만은 5점)
+DURATION_POINTS = ((600, 20), (300, 15), (180, 10), (0, 5))
+
+_DURATION_PATTERN = re.compile(
+    r'^P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?'
+    r'(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$'
+)
+_DURATION_UNITS = (('weeks', 604800), ('days', 86400), ('hours', 3600), ('minutes', 60), ('seconds', 1))
+
+
+def parse_duration_to_seconds(duration_str: str) -> int:
+    """ISO 8601 형식의 비디오 길이를 초 단위로 파싱 (형식이 잘못되었으면 0)"""
+    match = _DURATION_PATTERN.match(duration_str or '')
+    if not match:
+        return 0
+    return int(sum(float(match.group(unit)) * seconds for unit, seconds in _DURATION_UNITS if match.group(unit)))
+
+
+def parse_timestamp(value: str) -> float:
+    """ISO 8601 시각을 epoch 초로 변환 (없거나 형식이 잘못되었으면 NaN)"""
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return math.nan
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_timestamps(values) -> np.ndarray:
+    """
+    ISO 8601 시각 목록을 epoch 초 배열로 변환 (없거나 형식이 잘못된 값은 NaN)
+    YouTube 형식(...Z)이면 NumPy가 한 번에 파싱하고, 다른 형식이 섞여 있으면 하나씩 파싱합니다.
+    """
+    values = list(values)
+    if all(not value or (isinstance(value, str) and value.endswith('Z')) for value in values):
+        try:
+            parsed = np.array([value[:-1] if value else 'NaT' for value in values], dtype='datetime64[s]')
+            seconds = parsed.astype('int64').astype(float)
+            seconds[np.isnat(parsed)] = np.nan
+            return seconds
+        except ValueError:
+            pass
+    return np.array([parse_timestamp(value) for value in values], dtype=float)
+
+
+def calculate_activity_score(video_count: int, last_upload_date: str, now: float = None) -> float:
+    """영상 수와 마지막 업로드 시점으로 활동성 점수(0~100) 계산"""
+    score = 0
+    if video_count > 0:
+        score += min(50, math.log(video_count + 1) * 10)
+    upload_time = parse_timestamp(last_upload_date)
+    if not math.isnan(upload_time):
+        days_since_upload = (now if now is not None else datetime.now(timezone.utc).timestamp()) - upload_time
+        days_since_upload = math.floor(days_since_upload / 86400)
+        for max_days, points in RECENCY_POINTS:
+            if days_since_upload <= max_days:
+                score += points
+                break
+    return min(100, max(0, score))
+
+
+def calculate_reliability_score(subscriber_count: int, view_count: int, like_count: int, dislike_count: int,
+                                video_duration_avg_seconds: float) -> float:
+    """구독자 수, 좋아요 비율, 평균 영상 길이, 구독자당 조회수로 신뢰도 점수(0~100) 계산"""
+    score = 0
+    if subscriber_count > 0:
+        score += min(30, math.log(subscriber_count + 1) * 3)
+    total_reactions = like_count + dislike_count
+    if total_reactions > 0:
+        like_ratio = like_count / total_reactions
+        score += like_ratio * 30
+    if video_duration_avg_seconds > 0:
+        for min_seconds, points in DURATION_POINTS:
+            if video_duration_avg_seconds >= min_seconds:
+                score += points
+                break
+    if subscriber_count > 0 and view_count > 0:
+        views_per_sub = view_count / subscriber_count
+        if views_per_sub < 10:
+            score += 10
+        elif views_per_sub < 100:
+            score += 20
+        elif views_per_sub > 1000:
+            score += 5
+    return min(100, max(0, score))
+
+
+def activity_scores(video_counts, last_upload_times, now: float = None) -> np.ndarray:
+    """
+    calculate_activity_score의 배열 버전.
+    last_upload_times는 epoch 초 배열(parse_timestamps 결과, 업로드 기록이 없으면 NaN)입니다.
+    """
+    video_counts = np.asarray(video_counts, dtype=float)
+    last_upload_times = np.asarray(last_upload_times, dtype=float)
+    now = now if now is not None else datetime.now(timezone.utc).timestamp()
+
+    scores = np.where(video_counts > 0, np.minimum(50, np.log(np.maximum(video_counts, 0) + 1) * 10), 0.0)
+    days_since_upload = np.floor((now - last_upload_times) / 86400)
+    # 가장 짧은 구간부터 적용하므로 조건이 겹치면 앞의 구간 점수가 선택됨 (NaN은 모든 비교가 False)
+    scores += np.select([days_since_upload <= max_days for max_days, _ in RECENCY_POINTS],
+                        [points for _, points in RECENCY_POINTS], default=0)
+    return np.clip(scores, 0, 100)
+
+
+def reliability_scores(subscriber_counts, view_counts, like_counts, dislike_counts,
+                       video_duration_avg_seconds) -> np.ndarray:
+    """calculate_reliability_score의 배열 버전"""
+    subscribers = np.asarray(subscriber_counts, dtype=float)
+    views = np.asarray(view_counts, dtype=float)
+    likes = np.asarray(like_counts, dtype=float)
+    dislikes = np.asarray(dislike_counts, dtype=float)
+    durations = np.asarray(video_duration_avg_seconds, dtype=float)
+
+    scores = np.where(subscribers > 0, np.minimum(30, np.log(np.maximum(subscribers, 0) + 1) * 3), 0.0)
+    reactions = likes + dislikes
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores += np.where(reactions > 0, likes / reactions * 30, 0.0)
+        views_per_sub = np.where((subscribers > 0) & (views > 0), views / subscribers, np.nan)
+    scores += np.select([(durations > 0) & (durations >= min_seconds) for min_seconds, _ in DURATION_POINTS],
+                        [points for _, points in DURATION_POINTS], default=0)
+    scores += np.select([views_per_sub < 10, views_per_sub < 100, views_per_sub > 1000], [10, 20, 5], default=0)
+    return np.clip(scores, 0, 100)
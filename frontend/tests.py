@@ -1,3 +1,526 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest.mock import AsyncMock, patch
 
-# Create your tests here.
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core.tracing import metrics
+from gptAPI.cache import get_cached_keywords, keyword_memory_cache
+from gptAPI.models import KeywordExtraction
+from youtube_api.catalog import store_channel
+from .history import get_fresh_result, save_result
+from .models import SearchHistory, RecommendationJob
+from .pipeline import PipelineConfig, CandidateSearch, iter_enrichment, run_enrichment
+from .prerank import CandidatePruner, bm25_scores
+from .ranking import TopKTracker
+from .scoring import (
+    parse_duration_to_seconds, parse_timestamps, calculate_activity_score, calculate_reliability_score,
+    activity_scores, reliability_scores,
+)
+
+class EnrichmentPipelineTests(SimpleTestCase):
+    def test_runs_fetch_then_evaluate_for_every_item(self):
+        """모든 항목이 fetch -> evaluate 순서로 처리되는지 테스트"""
+        items = [(f'ch{i}', i) for i in range(10)]
+        results = run_enrichment(
+            items,
+            fetch=lambda key, payload: payload * 10,
+            evaluate=lambda key, value: value + 1,
+            config=PipelineConfig(youtube_max_in_flight=3, openai_max_in_flight=2),
+        )
+        self.assertEqual(results, {f'ch{i}': i * 10 + 1 for i in range(10)})
+
+    def test_failed_and_empty_items_are_skipped(self):
+        """예외가 발생하거나 None을 반환한 항목은 결과에서 제외되는지 테스트"""
+        def fetch(key, payload):
+            if key == 'broken':
+                raise RuntimeError('boom')
+            return payload
+
+        results = run_enrichment(
+            [('ok', 1), ('broken', 2), ('empty', None)],
+            fetch=fetch,
+            evaluate=lambda key, value: value,
+        )
+        self.assertEqual(results, {'ok': 1})
+
+    def test_stage_timeout_drops_slow_items(self):
+        """단계 제한 시간을 넘긴 항목은 기다리지 않고 제외되는지 테스트"""
+        def evaluate(key, value):
+            if key == 'slow':
+                time.sleep(1)
+            return value
+
+        started = time.monotonic()
+        results = list(iter_enrichment(
+            [('fast', 1), ('slow', 2)],
+            fetch=lambda key, payload: payload,
+            evaluate=evaluate,
+            config=PipelineConfig(evaluate_timeout=0.2),
+        ))
+        self.assertEqual(results, [('fast', 1)])
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_fetch_deadline_starts_when_item_is_submitted(self):
+        """items 생성기가 늦게 만든 항목도 제출 시점부터 fetch_timeout을 적용받고, 시간 초과는 지표로 집계되는지 테스트"""
+        def items():
+            yield 'first', 1
+            time.sleep(0.3)  # 다음 검색 결과를 기다리는 시간
+            yield 'late', 2
+
+        def fetch(key, payload):
+            if key == 'stuck':
+                time.sleep(0.5)
+            return payload
+
+        results = run_enrichment(items(), fetch=fetch, evaluate=lambda key, value: value,
+                                 config=PipelineConfig(fetch_timeout=0.2))
+        self.assertEqual(results, {'first': 1, 'late': 2})
+
+        metrics.reset()
+        results = run_enrichment([('ok', 1), ('stuck', 2)], fetch=fetch, evaluate=lambda key, value: value,
+                                 config=PipelineConfig(fetch_timeout=0.2))
+        self.assertEqual(results, {'ok': 1})
+        self.assertIn('aicapstone_enrichment_timeouts_total{outcome="abandoned",stage="fetch"} 1', metrics.render())
+
+    def test_evaluate_batch_groups_evaluated_items(self):
+        """evaluate 결과가 evaluate_batch_size개씩 묶여 처리되는지 테스트"""
+        batches = []
+
+        def evaluate_batch(batch):
+            batches.append(sorted(key for key, _ in batch))
+            return {key: value * 2 for key, value in batch}
+
+        results = run_enrichment(
+            [(f'ch{i}', i) for i in range(5)],
+            fetch=lambda key, payload: payload,
+            evaluate=lambda key, value: value + 1,
+            config=PipelineConfig(evaluate_batch_size=2),
+            evaluate_batch=evaluate_batch,
+        )
+        self.assertEqual(results, {f'ch{i}': (i + 1) * 2 for i in range(5)})
+        self.assertEqual(sorted(len(batch) for batch in batches), [1, 2, 2])
+
+
+    def test_select_filters_items_after_all_fetches(self):
+        """select는 모든 fetch가 끝난 뒤 한 번 호출되고, 고른 항목만 evaluate되는지 테스트"""
+        selections = []
+
+        def select(fetched):
+            selections.append(sorted(key for key, _ in fetched))
+            return ['ch3', 'ch1']
+
+        results = run_enrichment(
+            [(f'ch{i}', i) for i in range(4)],
+            fetch=lambda key, payload: payload,
+            evaluate=lambda key, value: value * 10,
+            select=select,
+        )
+        self.assertEqual(selections, [['ch0', 'ch1', 'ch2', 'ch3']])
+        self.assertEqual(results, {'ch1': 10, 'ch3': 30})
+
+
+    def test_evaluate_window_admits_items_as_results_arrive(self):
+        """evaluate_window만큼씩 진행하고, admit이 거절한 항목은 evaluate하지 않는지 테스트"""
+        evaluated, seen = [], []
+
+        def evaluate(key, value):
+            evaluated.append(key)
+            return value
+
+        for key, value in iter_enrichment(
+            [(f'ch{i}', i) for i in range(4)],
+            fetch=lambda key, payload: payload,
+            evaluate=evaluate,
+            config=PipelineConfig(evaluate_window=2),
+            select=lambda fetched: [key for key, _ in fetched],
+            admit=lambda key, value: not seen,
+        ):
+            seen.append(key)
+        self.assertEqual(len(evaluated), 2)
+        self.assertEqual(sorted(seen), ['ch0', 'ch1'])
+
+    def test_candidate_search_yields_results_in_submit_order(self):
+        """늦게 끝난 검색도 넣은 순서대로 나오고, 중복 검색어/채널과 실패한 검색은 제외되는지 테스트"""
+        def search(query, max_results):
+            if query == 'broken':
+                raise RuntimeError('quota')
+            if query == 'slow':
+                time.sleep(0.05)
+            return [{'id': {'channelId': channel_id}} for channel_id in {'slow': ['a', 'b'], 'fast': ['b', 'c']}[query]]
+
+        candidates = CandidateSearch(search, max_in_flight=3)
+        self.addCleanup(candidates.close)
+        candidates.submit_all(['slow', 'broken', 'fast', ' Slow '])
+        results = [(query, list(channels)) for query, channels in candidates.iter_results()]
+        self.assertEqual(results, [('slow', ['a', 'b']), ('fast', ['c'])])
+        self.assertEqual(len(candidates.errors), 1)
+        self.assertEqual(candidates.found, 3)
+
+
+class TopKTrackerTests(SimpleTestCase):
+    def test_skips_channels_whose_upper_bound_cannot_reach_top_k(self):
+        """AI 만점을 받아도 K번째 점수보다 낮은 채널만 건너뛰는지 테스트"""
+        tracker = TopKTracker(2)
+        weak = {'activity_score': 10, 'reliability_score': 10}      # 상한 64
+        strong = {'activity_score': 100, 'reliability_score': 100}  # 상한 100
+        self.assertEqual(tracker.order(['weak', 'strong'], {'weak': weak, 'strong': strong}), ['strong', 'weak'])
+
+        tracker.add(70)
+        self.assertTrue(tracker.can_enter(weak))  # 아직 K개가 채워지지 않음
+        tracker.add(64)
+        self.assertTrue(tracker.can_enter(weak))  # 상한이 K번째 점수와 같으면 평가
+        tracker.add(80)
+        self.assertFalse(tracker.can_enter(weak))
+        self.assertTrue(tracker.can_enter(strong))
+        self.assertEqual(tracker.skipped, 1)
+
+    def test_disabled_tracker_evaluates_everything(self):
+        """K가 0이면 조기 종료 없이 모든 채널을 평가하는지 테스트"""
+        tracker = TopKTracker(0)
+        tracker.add(100)
+        self.assertTrue(tracker.can_enter({'activity_score': 0, 'reliability_score': 0}))
+
+
+class ScoringTests(SimpleTestCase):
+    def test_parse_duration_handles_days_and_malformed_input(self):
+        """일 단위/소수 초를 포함한 길이를 파싱하고, 잘못된 형식은 0으로 처리하는지 테스트"""
+        self.assertEqual(parse_duration_to_seconds('PT1H2M3S'), 3723)
+        self.assertEqual(parse_duration_to_seconds('P1DT2H'), 93600)
+        self.assertEqual(parse_duration_to_seconds('PT4.5S'), 4)
+        for malformed in ('', None, 'P', '1H', 'PT-1S', 'PT1X'):
+            self.assertEqual(parse_duration_to_seconds(malformed), 0)
+
+    def test_vectorized_scores_match_per_channel_scores(self):
+        """배열로 한 번에 계산한 점수가 채널 하나씩 계산한 점수와 같은지 테스트"""
+        now = datetime(2024, 6, 1, tzinfo=dt_timezone.utc).timestamp()
+        channels = [
+            # (영상 수, 마지막 업로드, 구독자, 조회수, 좋아요, 싫어요, 평균 길이)
+            (0, None, 0, 0, 0, 0, 0),
+            (10, '2024-05-30T00:00:00Z', 1000, 5000, 90, 10, 120),
+            (300, '2024-04-15T12:00:00Z', 50000, 3000000, 0, 0, 400),
+            (5, '2023-01-01T00:00:00Z', 10, 50000, 7, 0, 900),
+            (1, 'not-a-date', 100, 0, 1, 1, 200),
+        ]
+        columns = list(zip(*channels))
+        expected_activity = [calculate_activity_score(c[0], c[1], now=now) for c in channels]
+        expected_reliability = [calculate_reliability_score(*c[2:]) for c in channels]
+
+        np.testing.assert_allclose(activity_scores(columns[0], parse_timestamps(columns[1]), now=now),
+                                   expected_activity)
+        np.testing.assert_allclose(reliability_scores(*columns[2:]), expected_reliability)
+
+    def test_benchmark_reports_identical_scores(self):
+        """점수 벤치마크가 두 방식의 소요 시간을 보고하고 결과가 같은지 테스트"""
+        out = StringIO()
+        call_command('benchmark_scoring', channels='200', repeat=1, json=True, stdout=out)
+        result = json.loads(out.getvalue())
+        self.assertEqual(result['channels'], 200)
+        self.assertEqual(result['max_abs_diff'], 0)
+
+
+class PrerankTests(SimpleTestCase):
+    def test_bm25_prefers_documents_sharing_query_terms(self):
+        """쿼리와 겹치는 단어(조사가 붙은 한글 포함)가 많은 문서가 높은 점수를 받는지 테스트"""
+        scores = bm25_scores('파이썬 기초 강의', [
+            '오늘의 요리 레시피',
+            '파이썬을 처음 배우는 분들을 위한 기초 강의',
+            '파이썬 뉴스',
+        ])
+        self.assertEqual(list(np.argsort(-scores)), [1, 2, 0])
+        self.assertEqual(scores[0], 0)
+
+    def _fetched(self):
+        texts = ['요리 채널', '파이썬 기초 강의', '여행 브이로그', '파이썬 강의 모음']
+        return [(f'UC{i}', {'channel_text': text}) for i, text in enumerate(texts)]
+
+    def test_pruner_keeps_top_k_candidates(self):
+        """상위 K개 채널만 분석 대상으로 고르고 나머지는 잘라내는지 테스트"""
+        pruner = CandidatePruner('파이썬 강의', ['파이썬 기초'], top_k=2, audit_rate=0)
+        self.assertEqual(pruner.select(self._fetched()), ['UC1', 'UC3'])
+        self.assertTrue(pruner.is_pruned('UC0'))
+        self.assertEqual(pruner.select(self._fetched()[:2]), ['UC0', 'UC1'])
+
+    def test_audit_counts_pruned_channels_that_would_have_ranked(self):
+        """점검 요청은 잘라낸 채널도 분석하고, 상위 K에 들었을 채널 수를 집계하는지 테스트"""
+        metrics.reset()
+        pruner = CandidatePruner('파이썬 강의', [], top_k=2, audit_rate=1)
+        self.assertEqual(pruner.select(self._fetched()), ['UC1', 'UC3', 'UC0', 'UC2'])
+
+        pruner.record_audit([{'channel_id': 'UC0'}, {'channel_id': 'UC1'}, {'channel_id': 'UC3'}, {'channel_id': 'UC2'}])
+        rendered = metrics.render()
+        self.assertIn('aicapstone_prerank_audit_channels_total{result="would_rank"} 1', rendered)
+        self.assertIn('aicapstone_prerank_audit_channels_total{result="correctly_pruned"} 1', rendered)
+
+
+@override_settings(YOUTUBE_API_KEYS=['test-key'])
+class RecommendationStreamTests(TestCase):
+    def _mock_collector(self, mock_yt_collector):
+        collector = mock_yt_collector.return_value
+        collector.search_channels.return_value = [
+            {
+                'id': {'channelId': channel_id},
+                'snippet': {
+                    'title': f'Channel {channel_id}',
+                    'description': 'Description',
+                    'thumbnails': {'medium': {'url': 'http://example.com/thumb.jpg'}}
+                }
+            }
+            for channel_id in ('UC1', 'UC2')
+        ]
+        collector.get_channels_details.return_value = {}
+        collector.get_latest_videos.return_value = []
+        collector.get_video_details.return_value = []
+
+    def test_stream_view_renders_sse_shell(self):
+        """스트리밍 요청 시 SSE 연결 영역이 렌더링되는지 테스트"""
+        response = self.client.post('/run-recommendation/stream/', {'query': '파이썬 강의'})
+        self.assertTemplateUsed(response, 'frontend/partials/_search_stream.html')
+        self.assertContains(response, 'sse-connect="/run-recommendation/events/?query=')
+
+    @patch('frontend.views.rate_channels_relevance',
+           side_effect=lambda query, summaries: {channel_id: {'score': 90, 'reason': '적합'} for channel_id in summaries})
+    @patch('frontend.views.analyze_channel_texts', return_value='요약')
+    @patch('frontend.views.YouTubeDataCollector')
+    @patch('frontend.views.extract_keywords', return_value=['파이썬 기초'])
+    def test_events_stream_keywords_then_channels_then_done(self, mock_extract, mock_yt_collector, *_):
+        """검색어 -> 채널 카드 -> 최종 결과 순서로 이벤트가 전송되는지 테스트"""
+        self._mock_collector(mock_yt_collector)
+        response = self.client.get('/run-recommendation/events/', {'query': '파이썬 강의'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        body = b''.join(response.streaming_content).decode()
+        events = [line.split(': ', 1)[1] for line in body.splitlines() if line.startswith('event: ')]
+        self.assertEqual(events, ['keywords', 'channel', 'channel', 'done'])
+        self.assertIn('Channel UC1', body)
+
+    @patch('frontend.views.rate_channels_relevance', return_value={})
+    @patch('frontend.views.analyze_channel_texts', return_value='요약')
+    @patch('frontend.views.YouTubeDataCollector')
+    @patch('frontend.views.extract_keywords', return_value=['파이썬 기초'])
+    def test_fresh_catalog_channels_skip_youtube_fetch(self, mock_extract, mock_yt_collector, *_):
+        """카탈로그에 만료되지 않은 채널은 상세/최신 영상을 다시 조회하지 않는지 테스트"""
+        self._mock_collector(mock_yt_collector)
+        for channel_id in ('UC1', 'UC2'):
+            store_channel(channel_id, {'snippet': {'title': channel_id}}, {},
+                          [{'snippet': {'resourceId': {'videoId': f'{channel_id}-v'}}}], [])
+
+        list(self.client.get('/run-recommendation/events/', {'query': '파이썬 강의'}).streaming_content)
+
+        collector = mock_yt_collector.return_value
+        collector.get_channels_details.assert_called_once_with([])
+        collector.get_latest_videos.assert_not_called()
+        collector.get_video_details.assert_not_called()
+
+    @patch('frontend.views.rate_channels_relevance',
+           side_effect=lambda query, summaries: {channel_id: {'score': 90, 'reason': '적합'} for channel_id in summaries})
+    @patch('frontend.views.analyze_channel_texts', return_value='요약')
+    @patch('frontend.views.YouTubeDataCollector')
+    @patch('frontend.views.extract_keywords', return_value=['파이썬 기초'])
+    def test_concurrent_event_streams_share_one_pipeline(self, mock_extract, mock_yt_collector, *_):
+        """같은 검색어의 SSE 요청이 진행 중에 또 들어오면 파이프라인을 한 번만 실행하고 이벤트를 함께 받는지 테스트"""
+        self._mock_collector(mock_yt_collector)
+        leader = iter(self.client.get('/run-recommendation/events/', {'query': '파이썬 강의'}).streaming_content)
+        first = next(leader)
+        follower = iter(self.client.get('/run-recommendation/events/', {'query': '파이썬  강의 '}).streaming_content)
+        follower_first = next(follower)
+
+        leader_body = (first + b''.join(leader)).decode()
+        follower_body = (follower_first + b''.join(follower)).decode()
+        mock_extract.assert_called_once()
+        self.assertEqual(mock_yt_collector.return_value.search_channels.call_count, 1)
+        for body in (leader_body, follower_body):
+            events = [line.split(': ', 1)[1] for line in body.splitlines() if line.startswith('event: ')]
+            self.assertEqual(events, ['keywords', 'channel', 'channel', 'done'])
+
+    @patch('frontend.views.extract_keywords', return_value=[])
+    def test_events_stream_reports_errors_as_done(self, mock_extract):
+        """오류가 발생하면 오류 메시지로 결과 영역을 교체하는지 테스트"""
+        response = self.client.get('/run-recommendation/events/', {'query': '파이썬 강의'})
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('event: done'))
+        self.assertIn('키워드를 추출하지 못했습니다.', body)
+
+
+@override_settings(YOUTUBE_API_KEYS=['test-key'])
+class AsyncRecommendationViewTests(TestCase):
+    @patch('frontend.views.arate_channels_relevance', new_callable=AsyncMock)
+    @patch('frontend.views.aanalyze_channel_texts', new_callable=AsyncMock)
+    @patch('frontend.views.AsyncYouTubeDataCollector')
+    @patch('frontend.views.aextract_keywords', new_callable=AsyncMock)
+    def test_async_view_ranks_channels(self, mock_extract, mock_yt_collector, mock_analyze, mock_rate):
+        """비동기 추천 뷰가 채널을 평가하여 점수순으로 렌더링하는지 테스트"""
+        mock_extract.return_value = ['파이썬 기초', '코딩 입문']
+        collector = mock_yt_collector.return_value
+        collector.search_channels = AsyncMock(side_effect=lambda keyword, max_results: [
+            {
+                'id': {'channelId': f'UC-{keyword}'},
+                'snippet': {'title': keyword, 'description': '', 'thumbnails': {'medium': {'url': 'http://x/t.jpg'}}}
+            }
+        ])
+        collector.get_channels_details = AsyncMock(return_value={})
+        collector.get_latest_videos = AsyncMock(return_value=[])
+        collector.get_video_details = AsyncMock(return_value=[])
+        mock_analyze.side_effect = lambda text, channel_id, video_ids: f'{channel_id} 요약'
+        mock_rate.side_effect = lambda query, summaries: {
+            channel_id: {'score': 90 if '코딩' in summary else 10, 'reason': ''} for channel_id, summary in summaries.items()
+        }
+
+        response = self.client.post('/run-recommendation/async/', {'query': '파이썬 알려줘'})
+
+        self.assertTemplateUsed(response, 'frontend/partials/_search_results.html')
+        titles = [channel['title'] for channel in response.context['result_data']['recommendations']]
+        self.assertEqual(titles, ['코딩 입문', '파이썬 기초'])
+
+    @patch('frontend.views.arate_channels_relevance', new_callable=AsyncMock, return_value={})
+    @patch('frontend.views.aanalyze_channel_texts', new_callable=AsyncMock, return_value='요약')
+    @patch('frontend.views.AsyncYouTubeDataCollector')
+    @patch('frontend.views.aextract_keywords', new_callable=AsyncMock, return_value=['파이썬 기초'])
+    def test_async_fresh_catalog_uses_shared_fetch_steps(self, mock_extract, mock_yt_collector, *_):
+        """비동기 뷰도 동기 경로와 같은 단계로 카탈로그 채널을 처리하고 channel_fetch 구간을 기록하는지 테스트"""
+        collector = mock_yt_collector.return_value
+        collector.search_channels = AsyncMock(return_value=[
+            {'id': {'channelId': 'UC1'},
+             'snippet': {'title': 'UC1', 'description': '', 'thumbnails': {'medium': {'url': 'http://x/t.jpg'}}}}
+        ])
+        collector.get_channels_details = AsyncMock(return_value={})
+        collector.get_latest_videos = AsyncMock(return_value=[])
+        collector.get_video_details = AsyncMock(return_value=[])
+        store_channel('UC1', {'snippet': {'title': 'UC1'}}, {},
+                      [{'snippet': {'resourceId': {'videoId': 'UC1-v'}}}], [])
+        metrics.reset()
+
+        self.client.post('/run-recommendation/async/', {'query': '파이썬 강의'})
+
+        collector.get_channels_details.assert_awaited_once_with([])
+        collector.get_latest_videos.assert_not_awaited()
+        self.assertIn('aicapstone_span_duration_seconds_count{catalog="hit",span="channel_fetch"} 1',
+                      metrics.render())
+
+
+@override_settings(YOUTUBE_API_KEYS=['test-key'])
+class SearchHistoryResultTests(TestCase):
+    def _save(self, query='파이썬 강의'):
+        return save_result({
+            'user_query': query,
+            'keywords': ['파이썬 기초'],
+            'recommendations': [{'channel_id': 'UC1', 'title': '저장된 채널', 'final_score': 80}],
+        })
+
+    @patch('frontend.views.extract_keywords')
+    def test_repeat_query_is_served_from_history(self, mock_extract):
+        """정규화한 검색어가 같은 최근 결과가 있으면 파이프라인을 실행하지 않는지 테스트"""
+        self._save()
+        response = self.client.post('/run-recommendation/', {'query': '  파이썬   강의 '})
+
+        mock_extract.assert_not_called()
+        self.assertTemplateUsed(response, 'frontend/partials/_search_results.html')
+        self.assertEqual(response.context['result_data']['recommendations'][0]['title'], '저장된 채널')
+
+    @override_settings(RECOMMENDATION_RESULT_TTL=60)
+    def test_stale_history_is_not_reused(self):
+        """RECOMMENDATION_RESULT_TTL보다 오래된 결과는 재사용하지 않는지 테스트"""
+        history = self._save()
+        SearchHistory.objects.filter(pk=history.pk).update(timestamp=timezone.now() - timedelta(minutes=5))
+        self.assertIsNone(get_fresh_result('파이썬 강의'))
+
+    def test_load_chat_renders_stored_result(self):
+        """사이드바의 과거 검색 기록을 누르면 저장된 결과가 그대로 렌더링되는지 테스트"""
+        history = self._save()
+        response = self.client.get(f'/load-chat/{history.pk}/')
+        self.assertTemplateUsed(response, 'frontend/partials/_search_results.html')
+        self.assertContains(response, '저장된 채널')
+        self.assertEqual(self.client.get('/load-chat/999999/').status_code, 404)
+
+    def test_seed_keyword_cache_from_history(self):
+        """검색 기록의 추출 검색어로 키워드 캐시를 채우고, 같은 검색어는 최신 기록만 사용하는지 테스트"""
+        keyword_memory_cache.clear()
+        old = self._save('파이썬 강의를 알려줘')
+        SearchHistory.objects.filter(pk=old.pk).update(timestamp=timezone.now() - timedelta(days=1))
+        SearchHistory.objects.filter(pk=self._save('파이썬 강의').pk).update(keywords=['파이썬 최신'])
+        out = StringIO()
+        call_command('seed_keyword_cache', stdout=out)
+
+        self.assertIn('1개', out.getvalue())
+        self.assertEqual(KeywordExtraction.objects.count(), 1)
+        keyword_memory_cache.clear()
+        self.assertEqual(get_cached_keywords('파이썬 강의 알려주세요'), ['파이썬 최신'])
+
+
+class RecommendationJobTests(TransactionTestCase):
+    def _wait_for(self, job_id, status):
+        for _ in range(100):
+            job = RecommendationJob.objects.get(pk=job_id)
+            if job.status == status:
+                return job
+            time.sleep(0.02)
+        self.fail(f'작업이 {status} 상태가 되지 않았습니다: {job.status}')
+
+    @patch('frontend.views._iter_recommendation_events')
+    def test_job_returns_immediately_and_reports_progress(self, mock_events):
+        """작업 등록은 바로 반환되고, 상태 조회가 중간 결과와 최종 결과를 보여주는지 테스트"""
+        release = threading.Event()
+        channel = {'channel_id': 'UC1', 'title': '채널 1', 'thumbnail': 'http://x/t.jpg', 'final_score': 80}
+
+        def events(user_query):
+            yield 'keywords', ['파이썬 기초']
+            yield 'channel', channel
+            release.wait(5)
+            yield 'done', {'user_query': user_query, 'keywords': ['파이썬 기초'], 'recommendations': [channel]}
+        mock_events.side_effect = events
+
+        response = self.client.post('/run-recommendation/job/', {'query': '파이썬 강의'})
+        self.assertTemplateUsed(response, 'frontend/partials/_job_progress.html')
+        job = RecommendationJob.objects.get()
+        status_url = f'/recommendation-jobs/{job.pk}/'
+        self.assertContains(response, f'hx-get="{status_url}"')
+
+        for _ in range(100):
+            status = self.client.get(status_url, {'format': 'json'}).json()
+            if status['channels']:
+                break
+            time.sleep(0.02)
+        self.assertEqual((status['status'], status['keywords']), ('running', ['파이썬 기초']))
+
+        release.set()
+        self._wait_for(job.pk, RecommendationJob.DONE)
+        response = self.client.get(status_url)
+        self.assertTemplateUsed(response, 'frontend/partials/_search_results.html')
+        self.assertContains(response, '채널 1')
+
+    @patch('frontend.views._iter_recommendation_events', side_effect=lambda q: iter([('error', '키워드 없음')]))
+    def test_failed_job_renders_error(self, mock_events):
+        """파이프라인이 오류를 내면 상태 조회가 오류 메시지를 보여주는지 테스트"""
+        self.client.post('/run-recommendation/job/', {'query': '파이썬 강의'})
+        job = self._wait_for(RecommendationJob.objects.get().pk, RecommendationJob.ERROR)
+        self.assertContains(self.client.get(f'/recommendation-jobs/{job.pk}/'), '키워드 없음')
+
+    @override_settings(RECOMMENDATION_JOB_TIMEOUT=60)
+    def test_stale_running_job_is_marked_as_error(self):
+        """오래 갱신되지 않은 진행 중 작업은 중단된 것으로 처리하는지 테스트"""
+        job = RecommendationJob.objects.create(query='q', query_hash='h', status=RecommendationJob.RUNNING)
+        RecommendationJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(self.client.get(f'/recommendation-jobs/{job.pk}/', {'format': 'json'}).json()['status'],
+                         'error')
+
+
+class BenchmarkCommandTests(TransactionTestCase):
+    def test_benchmark_reports_latency_and_calls_per_search(self):
+        """가짜 서버로 추천 뷰를 실행하고 검색당 지연 시간/호출 수/할당량을 보고하는지 테스트"""
+        out = StringIO()
+        call_command('benchmark_recommendations', searches=2, concurrency='1,2', youtube_latency=0,
+                     openai_latency=0, json=True, stdout=out)
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+
+        self.assertEqual([result['concurrency'] for result in results], [1, 2])
+        for result in results:
+            self.assertEqual(result['failed_searches'], 0)
+            self.assertGreater(result['quota_units_per_search'], 0)
+            self.assertGreater(result['openai_calls_per_search'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
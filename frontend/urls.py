@@ -6,5 +6,10 @@ urlpatterns = [
     path('', views.login_view, name='login'),
     path('search/', views.search_page_view, name='search_page'),
     path('run-recommendation/', views.recommendation_result_view, name='run_recommendation'),
+    path('run-recommendation/async/', views.recommendation_result_async_view, name='run_recommendation_async'),
+    path('run-recommendation/stream/', views.recommendation_stream_view, name='run_recommendation_stream'),
+    path('run-recommendation/events/', views.recommendation_events_view, name='recommendation_events'),
+    path('run-recommendation/job/', views.recommendation_job_view, name='run_recommendation_job'),
+    path('recommendation-jobs/<uuid:job_id>/', views.recommendation_job_status_view, name='recommendation_job_status'),
     path('load-chat/<int:chat_id>/', views.load_chat_view, name='load_chat'),
 ]
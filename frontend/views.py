@@ -1,82 +1,36 @@
 # wjxoqkdl-bit/ai_capstone_test_code-edited-/.../frontend/views.py
 
-from django.shortcuts import render
+from django.shortcuts import render, get_object_or_404
 from django.conf import settings
-import math
-from datetime import datetime, timedelta
+from django.http import StreamingHttpResponse, JsonResponse, Http404
+from django.template.loader import render_to_string
+from django.urls import reverse
+from urllib.parse import urlencode
+import asyncio
+from dataclasses import replace
+from asgiref.sync import sync_to_async
 
-from gptAPI.services import extract_keywords, summarize_comments, analyze_channel_texts, rate_channel_relevance
+from gptAPI.services import extract_keywords, summarize_comments, analyze_channel_texts, rate_channels_relevance
+from gptAPI.async_services import aextract_keywords, aanalyze_channel_texts, arate_channels_relevance
+from gptAPI.cache import normalize_query
+from gptAPI.text_assembly import assemble_channel_text
 from youtube_api.api_client import YouTubeDataCollector
+from youtube_api.async_client import AsyncYouTubeDataCollector
+from youtube_api.catalog import load_catalog, store_channel, is_fresh as is_catalog_fresh
+from youtube_api.search_planner import SearchPlanner
+from core.singleflight import SingleFlight, AsyncSingleFlight
+from core.tracing import trace, span
+from .pipeline import (PipelineConfig, CandidateSearch, AsyncCandidateSearch, EvaluationPlan, iter_enrichment,
+                       drive, adrive, within_timeout)
+from .ranking import final_score
+from .scoring import parse_duration_to_seconds, calculate_activity_score, calculate_reliability_score
+from .history import get_fresh_result, save_result, recent_history
+from .jobs import enqueue_recommendation, get_job
+from .models import SearchHistory, RecommendationJob
 
-
-# [유지] parse_duration_to_seconds 함수 (상단 위치)
-def parse_duration_to_seconds(duration_str: str) -> int:
-    """ISO 8601 형식의 비디오 길이를 초 단위로 파싱"""
-    total_seconds = 0
-    if 'H' in duration_str:
-        hours = int(duration_str.split('H')[0].replace('PT', ''))
-        total_seconds += hours * 3600
-        duration_str = duration_str.split('H')[1]
-    if 'M' in duration_str:
-        minutes = int(duration_str.split('M')[0].replace('PT', ''))
-        total_seconds += minutes * 60
-        duration_str = duration_str.split('M')[1]
-    if 'S' in duration_str:
-        seconds = int(duration_str.split('S')[0].replace('PT', ''))
-        total_seconds += seconds
-    return total_seconds
-
-
-def calculate_activity_score(video_count: int, last_upload_date: str) -> float:
-    # ... (기존과 동일) ...
-    score = 0
-    if video_count > 0:
-        score += min(50, math.log(video_count + 1) * 10)
-    try:
-        upload_dt = datetime.fromisoformat(last_upload_date.replace('Z', '+00:00'))
-        now = datetime.now(upload_dt.tzinfo)
-        days_since_upload = (now - upload_dt).days
-        if days_since_upload <= 7:
-            score += 50
-        elif days_since_upload <= 30:
-            score += 40
-        elif days_since_upload <= 90:
-            score += 20
-        elif days_since_upload <= 180:
-            score += 10
-    except ValueError:
-        pass
-    return min(100, max(0, score))
-
-
-def calculate_reliability_score(subscriber_count: int, view_count: int, like_count: int, dislike_count: int,
-                                video_duration_avg_seconds: int) -> float:
-    # ... (기존과 동일) ...
-    score = 0
-    if subscriber_count > 0:
-        score += min(30, math.log(subscriber_count + 1) * 3)
-    total_reactions = like_count + dislike_count
-    if total_reactions > 0:
-        like_ratio = like_count / total_reactions
-        score += like_ratio * 30
-    if video_duration_avg_seconds > 0:
-        if video_duration_avg_seconds >= 600:
-            score += 20
-        elif video_duration_avg_seconds >= 300:
-            score += 15
-        elif video_duration_avg_seconds >= 180:
-            score += 10
-        else:
-            score += 5
-    if subscriber_count > 0 and view_count > 0:
-        views_per_sub = view_count / subscriber_count
-        if views_per_sub < 10:
-            score += 10
-        elif views_per_sub < 100:
-            score += 20
-        elif views_per_sub > 1000:
-            score += 5
-    return min(100, max(0, score))
+# 정규화한 검색어가 같은 추천 요청이 동시에 들어오면 파이프라인을 한 번만 실행하고 결과를 함께 사용
+recommendation_flight = SingleFlight('recommendation')
+async_recommendation_flight = AsyncSingleFlight('recommendation_async')
 
 
 def login_view(request):
@@ -85,131 +39,589 @@ def login_view(request):
 
 
 def search_page_view(request):
-    """메인 검색 페이지 렌더링 (더미 데이터 포함)"""
-    # [유지] 사이드바는 (DB 연동 전까지) 더미 데이터로 유지
-    dummy_chat_list = [
-        {'id': 1, 'title': '20대 타겟 IT 채널 추천'},
-        {'id': 2, 'title': '힐링되는 요리 브이로그'},
-        {'id': 3, 'title': '어린이용 과학 콘텐츠'},
-    ]
-    dummy_quick_history = [
-        '10대 타겟 뷰티 채널', '요리 브이로그, 차분한 분위기', '30대 여성을 위한 재테크 정보'
-    ]
-    context = {'chat_list': dummy_chat_list, 'quick_history': dummy_quick_history}
+    """메인 검색 페이지 렌더링 (사이드바에 최근 검색 기록 표시)"""
+    chat_list = list(recent_history())
+    # 드롭다운에는 중복 없이 최근 검색어 5개만 표시
+    quick_history = list(dict.fromkeys(chat.query for chat in chat_list))[:5]
+    # 백그라운드 작업 모드이면 검색 요청을 작업으로 등록하고, 아니면 SSE 스트리밍으로 처리
+    search_url = reverse('run_recommendation_job' if getattr(settings, 'RECOMMENDATION_BACKGROUND_JOBS', False)
+                         else 'run_recommendation_stream')
+    context = {'chat_list': chat_list, 'quick_history': quick_history, 'search_url': search_url}
     return render(request, 'frontend/search.html', context)
 
 
+def _fetch_channel_metrics(collector, channel_id: str, order: int, channel: dict, channel_details: dict,
+                           catalog_entry=None) -> dict:
+    """[YouTube 단계] _channel_fetch_steps를 동기 collector로 실행"""
+    return drive(_channel_fetch_steps(channel_id, order, channel, channel_details, catalog_entry),
+                 _youtube_handlers(collector))
+
+
+def _channel_fetch_steps(channel_id: str, order: int, channel: dict, channel_details: dict, catalog_entry=None):
+    """
+    [YouTube 단계] 최신 영상을 조회하여 활동성·신뢰도 점수와 분석용 텍스트를 계산
+    (channel_details는 get_channels_details로 미리 일괄 조회한 값,
+     catalog_entry는 채널 카탈로그에 저장된 값으로 만료 전이면 YouTube를 호출하지 않음)
+    YouTube/DB 호출은 요청으로 내보내므로 동기(drive)/비동기(adrive) 경로가 같은 단계를 사용합니다.
+    """
+    with span('channel_fetch') as fetch_span:
+        if catalog_entry is not None and is_catalog_fresh(catalog_entry):
+            fetch_span.labels['catalog'] = 'hit'
+            return _compute_channel_metrics(order, channel, catalog_entry.channel_details,
+                                            catalog_entry.latest_videos, catalog_entry.video_details)
+        fetch_span.labels['catalog'] = 'stale' if catalog_entry is not None else 'miss'
+        if not channel_details and catalog_entry is not None:
+            channel_details = catalog_entry.channel_details
+
+        # 업로드 재생목록은 최신순이므로 한 번의 조회로 최근 영상과 마지막 업로드 일자를 함께 얻습니다.
+        latest_videos = yield ('latest_videos', channel_id, 3,
+                               YouTubeDataCollector.get_uploads_playlist_id(channel_details))
+        # [수정] 👈 1단계에서 ",status"를 추가했기 때문에 video_details가 'status' 정보를 포함하게 됩니다.
+        # 카탈로그에 이미 있는 영상은 다시 조회하지 않고 새로 올라온 영상만 조회
+        video_ids = _latest_video_ids(latest_videos)
+        new_video_ids = _new_video_ids(video_ids, catalog_entry)
+        fetched_details = (yield 'video_details', new_video_ids) if new_video_ids else []
+        video_details = _merge_video_details(video_ids, catalog_entry, fetched_details)
+        if latest_videos:
+            yield 'store_channel', channel_id, channel, channel_details, latest_videos, video_details
+        return _compute_channel_metrics(order, channel, channel_details, latest_videos, video_details)
+
+
+def _candidate_details_steps(channels: dict):
+    """
+    검색 결과 하나의 새 후보 채널들의 카탈로그 항목과, 카탈로그에 없거나 만료된 채널의
+    통계/업로드 재생목록 ID를 한 번에 조회하여 (catalog, channel_details_map) 반환
+    """
+    with span('channel_details'):
+        catalog = yield 'load_catalog', channels
+        channel_details_map = yield 'channels_details', _channels_to_refresh(channels, catalog)
+    return catalog, channel_details_map
+
+
+def _youtube_handlers(collector) -> dict:
+    """단계 생성기가 내보내는 YouTube/DB 요청을 처리할 동기 함수들"""
+    return {
+        'load_catalog': load_catalog,
+        'channels_details': collector.get_channels_details,
+        'latest_videos': collector.get_latest_videos,
+        'video_details': collector.get_video_details,
+        'store_channel': store_channel,
+    }
+
+
+def _async_youtube_handlers(collector, youtube_slots) -> dict:
+    """[async] _youtube_handlers의 비동기 버전 (채널별 YouTube 호출은 youtube_slots로 동시 실행 수를 제한)"""
+    def limited(call):
+        async def run(*args):
+            async with youtube_slots:
+                return await call(*args)
+        return run
+
+    return {
+        'load_catalog': sync_to_async(load_catalog),
+        'channels_details': collector.get_channels_details,
+        'latest_videos': limited(collector.get_latest_videos),
+        'video_details': limited(collector.get_video_details),
+        'store_channel': sync_to_async(store_channel),
+    }
+
+
+def _new_video_ids(video_ids: list, catalog_entry) -> list:
+    """카탈로그에 상세 정보가 없는 영상 ID 목록"""
+    known = catalog_entry.video_details_by_id() if catalog_entry is not None else {}
+    return [video_id for video_id in video_ids if video_id not in known]
+
+
+def _merge_video_details(video_ids: list, catalog_entry, fetched_details: list) -> list:
+    """카탈로그의 영상 상세와 새로 조회한 상세를 최신 영상 순서대로 합침"""
+    details = catalog_entry.video_details_by_id() if catalog_entry is not None else {}
+    details.update({detail['id']: detail for detail in fetched_details if detail.get('id')})
+    return [details[video_id] for video_id in video_ids if video_id in details]
+
+
+def _channels_to_refresh(channel_ids, catalog: dict) -> list:
+    """카탈로그에 없거나 만료되어 YouTube에서 다시 조회해야 하는 채널 ID 목록"""
+    return [channel_id for channel_id in channel_ids
+            if channel_id not in catalog or not is_catalog_fresh(catalog[channel_id])]
+
+
+def _latest_video_ids(latest_videos: list) -> list:
+    """업로드 재생목록 아이템에서 비디오 ID 목록을 추출"""
+    return [video['snippet']['resourceId']['videoId'] for video in latest_videos if
+            video.get('snippet', {}).get('resourceId', {}).get('videoId')]
+
+
+def _compute_channel_metrics(order: int, channel: dict, channel_details: dict,
+                             latest_videos: list, video_details: list) -> dict:
+    """조회한 채널/영상 데이터로 활동성·신뢰도 점수와 분석용 텍스트를 계산 (API 호출 없음)"""
+    channel_title = channel['snippet']['title']
+    channel_description = channel['snippet']['description']
+    subscriber_count = int(
+        channel_details.get('statistics', {}).get('subscriberCount', 0)) if channel_details else 0
+    video_count = int(channel_details.get('statistics', {}).get('videoCount', 0)) if channel_details else 0
+    view_count = int(channel_details.get('statistics', {}).get('viewCount', 0)) if channel_details else 0
+    last_upload_date = latest_videos[0]['snippet']['publishedAt'] if latest_videos else None
+    activity_score = 0
+    if last_upload_date:
+        activity_score = calculate_activity_score(video_count, last_upload_date)
+    video_ids = _latest_video_ids(latest_videos)
+
+    # [수정] 👈 153 오류의 근본 원인 해결!
+    # '90초(Shorts) 거르기' 로직 대신, '퍼가기 가능(embeddable)' 여부를 직접 확인합니다.
+    latest_video_id = None  # 일단 None으로 초기화
+    for detail in video_details:
+        # [수정] 'status' 객체에서 'embeddable' 값이 True인지 직접 확인
+        if detail.get('status', {}).get('embeddable') is True:
+            latest_video_id = detail['id']
+            break  # '퍼가기 가능한' 영상을 찾았으면 루프 종료
+
+    # (예외처리 로직: 'embeddable'한 영상이 하나도 없으면 latest_video_id는 None으로 유지됨)
+
+    total_likes = 0
+    total_dislikes = 0
+    total_duration_seconds = 0
+    video_count_for_avg = 0
+    for detail in video_details:
+        stats = detail.get('statistics', {})
+        content_details = detail.get('contentDetails', {})
+        total_likes += int(stats.get('likeCount', 0))
+        total_dislikes += int(stats.get('dislikeCount', 0))
+        duration_str = content_details.get('duration', 'PT0S')
+        duration_seconds = parse_duration_to_seconds(duration_str)
+        total_duration_seconds += duration_seconds
+        video_count_for_avg += 1
+    video_duration_avg_seconds = total_duration_seconds / video_count_for_avg if video_count_for_avg > 0 else 0
+    reliability_score = calculate_reliability_score(subscriber_count, view_count, total_likes, total_dislikes,
+                                                    video_duration_avg_seconds)
+    # 반복되는 링크/해시태그/안내 문구를 정리하고 토큰 예산 안으로 줄인 분석용 텍스트 (gptAPI/text_assembly.py)
+    channel_text = assemble_channel_text(channel_title, channel_description, [
+        detail.get('snippet', {}) for detail in video_details
+    ])
+
+    return {
+        'order': order,
+        'title': channel_title,
+        'thumbnail': channel['snippet']['thumbnails']['medium']['url'],
+        'activity_score': activity_score,
+        'reliability_score': reliability_score,
+        'latest_video_id': latest_video_id,
+        'video_ids': video_ids,
+        'channel_text': channel_text.text,
+    }
+
+
+def _analyze_channel(channel_id: str, metrics: dict):
+    """[OpenAI 단계] 채널 텍스트를 분석하여 (지표, 요약) 반환 (분석 실패 시 None)"""
+    with span('channel_analysis'):
+        channel_summary = analyze_channel_texts(metrics['channel_text'], channel_id=channel_id,
+                                                video_ids=metrics['video_ids'])
+    if not channel_summary:
+        return None
+    return metrics, channel_summary
+
+
+def _rate_channels(user_query: str, analyzed_channels: list) -> dict:
+    """[OpenAI 단계] 분석이 끝난 채널들의 관련도를 한 번에 평가하여 최종 점수를 계산"""
+    with span('relevance_rating') as rating_span:
+        rating_span.set(channels=len(analyzed_channels))
+        ratings = rate_channels_relevance(
+            user_query, {channel_id: channel_summary for channel_id, (_, channel_summary) in analyzed_channels})
+    return _rated_channels(analyzed_channels, ratings)
+
+
+def _rated_channels(analyzed_channels: list, ratings: dict) -> dict:
+    """분석된 채널 [(channel_id, (지표, 요약)), ...]과 관련도 평가 결과로 {channel_id: 채널 결과} 생성"""
+    return {
+        channel_id: _build_rated_channel(channel_id, metrics, channel_summary, ratings.get(channel_id))
+        for channel_id, (metrics, channel_summary) in analyzed_channels
+    }
+
+
+def _build_rated_channel(channel_id: str, metrics: dict, channel_summary: str, ai_relevance_rating: dict) -> dict:
+    """채널 분석/평가 결과와 활동성·신뢰도 점수를 합쳐 최종 점수를 계산"""
+    ai_score = ai_relevance_rating.get('score', 0) if ai_relevance_rating else 0
+
+    # [유지] 템플릿에 하이퍼링크(channel_id)와 iframe(latest_video_id) 데이터를 전달
+    return {
+        'channel_id': channel_id,
+        'order': metrics['order'],
+        'title': metrics['title'],
+        'thumbnail': metrics['thumbnail'],
+        'summary': channel_summary,
+        'ai_score': ai_score,
+        'activity_score': metrics['activity_score'],
+        'reliability_score': metrics['reliability_score'],
+        'final_score': final_score(ai_score, metrics['activity_score'], metrics['reliability_score']),
+        'reason': ai_relevance_rating.get('reason', 'N/A') if ai_relevance_rating else 'N/A',
+        'latest_video_id': metrics['latest_video_id']  # [수정]에서 찾은 'embeddable'한 ID를 전달
+    }
+
+
+def _iter_recommendation_events(user_query: str):
+    """
+    추천 파이프라인을 실행하며 진행 상황을 (이벤트, 데이터) 형태로 순서대로 내보냅니다.
+    - ('keywords', 검색어 목록)  : 키워드 추출 완료
+    - ('channel', 채널 결과)     : 채널 하나의 평가 완료 (완료되는 순서대로)
+    - ('done', result_data)     : 최종 점수순으로 정렬된 전체 결과
+    - ('error', 메시지)          : 오류로 중단 (이후 이벤트 없음)
+    (요청 전체와 단계별 소요 시간은 core.tracing으로 기록됩니다)
+    """
+    with trace('recommendation', query=user_query):
+        yield from _iter_recommendation_stages(user_query)
+
+
+def _iter_recommendation_stages(user_query: str):
+    """_iter_recommendation_events의 실제 단계들 (최근에 같은 검색어로 완료된 결과가 있으면 그대로 사용)"""
+    with span('result_cache'):
+        stored_result = get_fresh_result(user_query)
+    if stored_result is not None:
+        yield 'keywords', stored_result['keywords']
+        yield 'done', stored_result
+        return
+
+    # 키워드 추출 응답을 스트리밍으로 받으며, 검색어가 하나씩 완성되는 대로 채널 검색을 시작
+    collector = YouTubeDataCollector() if settings.YOUTUBE_API_KEYS else None
+    config = PipelineConfig.from_settings()
+    # 검색어마다 search.list(100단위)를 호출하지 않도록 합치기/캐시/예산을 고려해 검색 계획 (youtube_api/search_planner.py)
+    candidates = CandidateSearch(lambda query, max_results: _search_channels(collector, query, max_results),
+                                 config.youtube_max_in_flight, planner=SearchPlanner.from_settings())
+    try:
+        with span('keyword_extraction'):
+            search_queries = extract_keywords(user_query, on_keyword=candidates.submit if collector else None)
+        if not search_queries:
+            yield 'error', '키워드를 추출하지 못했습니다.'
+            return
+
+        if collector is None:
+            yield 'error', 'YOUTUBE_API_KEY가 설정되지 않았습니다.'
+            return
+
+        yield 'keywords', search_queries
+        candidates.submit_all(search_queries)
+        yield from _iter_rated_channels(user_query, search_queries, collector, candidates, config)
+    finally:
+        candidates.close()
+
+
+def _search_channels(collector, query: str, max_results: int) -> list:
+    with span('youtube_search'):
+        return collector.search_channels(keyword=query, max_results=max_results)
+
+
+def _iter_candidate_items(collector, candidates):
+    """
+    검색이 끝나는 대로(검색어 순서) 새 후보 채널을 파이프라인 입력 (channel_id, payload)로 내보냄
+    카탈로그에 없거나 만료된 채널의 통계/업로드 재생목록 ID만 검색 결과 단위로 한 번에 조회
+    """
+    handlers = _youtube_handlers(collector)
+    order = 0
+    for _, channels in candidates.iter_results():
+        catalog, channel_details_map = drive(_candidate_details_steps(channels), handlers)
+        for channel_id, channel in channels.items():
+            yield channel_id, (order, channel, channel_details_map.get(channel_id), catalog.get(channel_id))
+            order += 1
+
+
+def _iter_rated_channels(user_query: str, search_queries: list, collector, candidates, config):
+    """후보 채널의 YouTube 조회 -> AI 분석 -> 관련도 평가 후 ('channel', ...), ('done', ...) 이벤트를 내보냄"""
+    # 채널별 YouTube 조회(fetch)와 AI 분석(evaluate)을 제한된 동시성으로 병렬 처리하고,
+    # 분석이 끝난 채널은 묶어서 한 번의 요청으로 관련도를 평가
+    # (검색 결과가 나오는 대로 조회를 시작하므로, 나머지 검색과 먼저 찾은 채널의 조회가 겹쳐 진행됨)
+    items = _iter_candidate_items(collector, candidates)
+    # 평가할 채널과 순서, 건너뛰기, 최종 정렬은 비동기 뷰와 같은 EvaluationPlan을 따름 (frontend/pipeline.py)
+    plan = EvaluationPlan(user_query, search_queries)
+    config = replace(config, evaluate_window=plan.window)
+    rated_channels = []
+    for _, rated_channel in iter_enrichment(
+        items,
+        fetch=lambda channel_id, payload: _fetch_channel_metrics(collector, channel_id, *payload),
+        evaluate=_analyze_channel,
+        config=config,
+        evaluate_batch=lambda analyzed_channels: _rate_channels(user_query, analyzed_channels),
+        select=plan.select,
+        admit=plan.admit,
+    ):
+        rated_channels.append(rated_channel)
+        if plan.add(rated_channel):
+            yield 'channel', rated_channel
+
+    if candidates.errors and not candidates.found:
+        yield 'error', _search_error_message(candidates)
+        return
+
+    result_data = _result_data(user_query, search_queries, plan.visible(rated_channels))
+    save_result(result_data)
+    yield 'done', result_data
+
+
+def _search_error_message(candidates) -> str:
+    return f'YouTube API 호출 중 오류가 발생했습니다: {candidates.errors[0]}'
+
+
+def _result_data(user_query: str, search_queries: list, recommendations: list) -> dict:
+    return {
+        'user_query': user_query,
+        'keywords': search_queries,
+        'recommendations': recommendations
+    }
+
+
 def recommendation_result_view(request):
     """사용자 쿼리를 기반으로 AI 분석 및 평가를 거쳐 채널을 추천"""
     user_query = request.POST.get('query', '')
     if not user_query:
         return render(request, 'frontend/partials/_error.html', {'message': '검색어를 입력해주세요.'})
 
-    search_queries = extract_keywords(user_query)
-    if not search_queries:
-        return render(request, 'frontend/partials/_error.html', {'message': '키워드를 추출하지 못했습니다.'})
+    (event, data), shared = recommendation_flight.do(
+        normalize_query(user_query), lambda: _run_recommendation(user_query))
+    if event == 'error':
+        return render(request, 'frontend/partials/_error.html', {'message': data})
+    if shared:
+        # 다른 요청이 계산한 결과이므로 화면에는 이 사용자가 입력한 검색어를 표시
+        data = {**data, 'user_query': user_query}
+    context = {'result_data': data}
+    return render(request, 'frontend/partials/_search_results.html', context)
+
+
+def _run_recommendation(user_query: str):
+    """추천 파이프라인을 끝까지 실행하여 ('done', result_data) 또는 ('error', 메시지)를 반환"""
+    for event, data in _iter_recommendation_events(user_query):
+        if event in ('done', 'error'):
+            return event, data
+    return 'error', '추천 결과를 만들지 못했습니다.'
+
+
+async def recommendation_result_async_view(request):
+    """
+    [async] recommendation_result_view의 비동기 버전.
+    ASGI 서버에서는 대기 중인 YouTube/OpenAI 호출을 스레드 대신 이벤트 루프가 처리하므로,
+    한 프로세스가 훨씬 많은 검색 요청을 동시에 처리할 수 있습니다.
+    """
+    user_query = request.POST.get('query', '')
+    if not user_query:
+        return render(request, 'frontend/partials/_error.html', {'message': '검색어를 입력해주세요.'})
+
+    (template, context), shared = await async_recommendation_flight.do(
+        normalize_query(user_query), lambda: _recommendation_result_async(user_query))
+    if shared and 'result_data' in context:
+        # 다른 요청이 계산한 결과이므로 화면에는 이 사용자가 입력한 검색어를 표시
+        context = {'result_data': {**context['result_data'], 'user_query': user_query}}
+    return render(request, template, context)
+
+
+async def _recommendation_result_async(user_query: str):
+    """recommendation_result_async_view의 실제 단계들 (렌더링할 템플릿과 컨텍스트를 반환)"""
+    with trace('recommendation_async', query=user_query):
+        return await _recommendation_stages_async(user_query)
 
-    if not settings.YOUTUBE_API_KEYS:
-        return render(request, 'frontend/partials/_error.html', {'message': 'YOUTUBE_API_KEY가 설정되지 않았습니다.'})
 
-    collector = YouTubeDataCollector()
+async def _recommendation_stages_async(user_query: str):
+    """
+    _iter_recommendation_stages와 같은 단계를 비동기 I/O로 실행합니다.
+    (검색 계획, 카탈로그, 채널 조회 단계, 평가 순서/건너뛰기, 정렬은 동기 경로와 같은 코드를 사용)
+    """
+    with span('result_cache'):
+        stored_result = await sync_to_async(get_fresh_result)(user_query)
+    if stored_result is not None:
+        return 'frontend/partials/_search_results.html', {'result_data': stored_result}
 
+    collector = AsyncYouTubeDataCollector() if settings.YOUTUBE_API_KEYS else None
+    config = PipelineConfig.from_settings()
+    # 동시에 진행할 YouTube/OpenAI 작업 수 제한 (동기 버전의 스레드 풀 크기와 같은 설정 사용)
+    youtube_slots = asyncio.Semaphore(config.youtube_max_in_flight)
+    openai_slots = asyncio.Semaphore(config.openai_max_in_flight)
+    candidates = AsyncCandidateSearch(lambda query, max_results: _asearch_channels(collector, query, max_results),
+                                      config.youtube_max_in_flight, planner=SearchPlanner.from_settings())
     try:
-        candidate_channels = {}
-        for query in search_queries:
-            found_channels = collector.search_channels(keyword=query, max_results=5)
-            for channel in found_channels:
-                channel_id = channel['id']['channelId']
-                if channel_id not in candidate_channels:
-                    candidate_channels[channel_id] = channel
-    except Exception as e:
-        return render(request, 'frontend/partials/_error.html', {'message': f'YouTube API 호출 중 오류가 발생했습니다: {e}'})
+        # 키워드 추출 응답을 스트리밍으로 받으며, 검색어가 하나씩 완성되는 대로 채널 검색을 시작
+        with span('keyword_extraction'):
+            search_queries = await aextract_keywords(user_query, on_keyword=candidates.submit if collector else None)
+        if not search_queries:
+            return 'frontend/partials/_error.html', {'message': '키워드를 추출하지 못했습니다.'}
+
+        if collector is None:
+            return 'frontend/partials/_error.html', {'message': 'YOUTUBE_API_KEY가 설정되지 않았습니다.'}
+
+        candidates.submit_all(search_queries)
+        fetched = await _afetch_candidates(collector, candidates, youtube_slots, config)
+    finally:
+        candidates.close()
+    if candidates.errors and not candidates.found:
+        return 'frontend/partials/_error.html', {'message': _search_error_message(candidates)}
+
+    plan = EvaluationPlan(user_query, search_queries)
+    rated_channels = await _arate_candidates(user_query, plan, fetched, openai_slots, config)
+    result_data = _result_data(user_query, search_queries, plan.visible(rated_channels))
+    await sync_to_async(save_result)(result_data)
+    return 'frontend/partials/_search_results.html', {'result_data': result_data}
+
 
+async def _asearch_channels(collector, query: str, max_results: int) -> list:
+    with span('youtube_search'):
+        return await collector.search_channels(keyword=query, max_results=max_results)
+
+
+async def _afetch_candidates(collector, candidates, youtube_slots, config) -> list:
+    """
+    [async] 검색이 끝나는 대로(검색어 순서) 새 후보 채널의 상세 조회와 fetch를 시작하고,
+    조회에 성공한 채널을 검색 결과 순서대로 [(channel_id, 지표), ...]로 반환
+    (나머지 검색과 먼저 찾은 채널의 조회가 겹쳐 진행됨)
+    """
+    handlers = _async_youtube_handlers(collector, youtube_slots)
+    fetch_tasks = []
+    async for _, channels in candidates.iter_results():
+        catalog, channel_details_map = await adrive(_candidate_details_steps(channels), handlers)
+        for channel_id, channel in channels.items():
+            steps = _channel_fetch_steps(channel_id, len(fetch_tasks), channel, channel_details_map.get(channel_id),
+                                         catalog.get(channel_id))
+            fetch_tasks.append((channel_id, asyncio.ensure_future(
+                within_timeout('fetch', channel_id, adrive(steps, handlers), config.fetch_timeout))))
+    fetch_results = await asyncio.gather(*[task for _, task in fetch_tasks])
+    return [(channel_id, metrics) for (channel_id, _), metrics in zip(fetch_tasks, fetch_results) if metrics]
+
+
+async def _arate_candidates(user_query: str, plan, fetched: list, openai_slots, config) -> list:
+    """
+    [async] plan이 고른 순서대로 묶음(wave)마다 채널을 동시에 분석하고, 분석이 끝난 채널은
+    evaluate_batch_size개씩 묶어 관련도를 평가 (제한 시간을 넘긴 채널/묶음은 동기 경로처럼 결과에서 제외)
+    """
+    fetched_metrics = dict(fetched)
     rated_channels = []
-    for channel_id, channel in candidate_channels.items():
-        channel_title = channel['snippet']['title']
-        channel_description = channel['snippet']['description']
-        channel_details = collector.get_channel_details(channel_id)
-        subscriber_count = int(
-            channel_details.get('statistics', {}).get('subscriberCount', 0)) if channel_details else 0
-        video_count = int(channel_details.get('statistics', {}).get('videoCount', 0)) if channel_details else 0
-        view_count = int(channel_details.get('statistics', {}).get('viewCount', 0)) if channel_details else 0
-        latest_videos = collector.get_latest_videos(channel_id, max_results=3)
-        latest_videos_snippet = collector.get_latest_videos(channel_id, max_results=1)
-        last_upload_date = latest_videos_snippet[0]['snippet']['publishedAt'] if latest_videos_snippet else None
-        activity_score = 0
-        if last_upload_date:
-            activity_score = calculate_activity_score(video_count, last_upload_date)
-        video_ids = [video['snippet']['resourceId']['videoId'] for video in latest_videos if
-                     video.get('snippet', {}).get('resourceId', {}).get('videoId')]
+    for wave in plan.waves(fetched):
+        results = await asyncio.gather(*[
+            within_timeout('evaluate', channel_id,
+                           _aanalyze_channel(channel_id, fetched_metrics[channel_id], openai_slots),
+                           config.evaluate_timeout)
+            for channel_id in wave
+        ])
+        analyzed_channels = [(channel_id, result) for channel_id, result in zip(wave, results) if result]
+        chunks = [analyzed_channels[i:i + config.evaluate_batch_size]
+                  for i in range(0, len(analyzed_channels), config.evaluate_batch_size)]
+        rated_batches = await asyncio.gather(*[
+            within_timeout('batch', tuple(channel_id for channel_id, _ in chunk),
+                           _arate_channels(user_query, chunk), config.evaluate_timeout)
+            for chunk in chunks
+        ])
+        for rated in rated_batches:
+            for rated_channel in (rated or {}).values():
+                rated_channels.append(rated_channel)
+                plan.add(rated_channel)
+    return rated_channels
 
-        # [수정] 👈 1단계에서 ",status"를 추가했기 때문에 video_details가 'status' 정보를 포함하게 됩니다.
-        video_details = collector.get_video_details(video_ids)
-
-        # [수정] 👈 153 오류의 근본 원인 해결!
-        # '90초(Shorts) 거르기' 로직 대신, '퍼가기 가능(embeddable)' 여부를 직접 확인합니다.
-        latest_video_id = None  # 일단 None으로 초기화
-        for detail in video_details:
-            # [수정] 'status' 객체에서 'embeddable' 값이 True인지 직접 확인
-            if detail.get('status', {}).get('embeddable') is True:
-                latest_video_id = detail['id']
-                break  # '퍼가기 가능한' 영상을 찾았으면 루프 종료
-
-        # (예외처리 로직: 'embeddable'한 영상이 하나도 없으면 latest_video_id는 None으로 유지됨)
-
-        total_likes = 0
-        total_dislikes = 0
-        total_duration_seconds = 0
-        video_count_for_avg = 0
-        for detail in video_details:
-            stats = detail.get('statistics', {})
-            content_details = detail.get('contentDetails', {})
-            total_likes += int(stats.get('likeCount', 0))
-            total_dislikes += int(stats.get('dislikeCount', 0))
-            duration_str = content_details.get('duration', 'PT0S')
-            duration_seconds = parse_duration_to_seconds(duration_str)
-            total_duration_seconds += duration_seconds
-            video_count_for_avg += 1
-        video_duration_avg_seconds = total_duration_seconds / video_count_for_avg if video_count_for_avg > 0 else 0
-        reliability_score = calculate_reliability_score(subscriber_count, view_count, total_likes, total_dislikes,
-                                                        video_duration_avg_seconds)
-        all_texts = [channel_title, channel_description]
-        for detail in video_details:
-            snippet = detail.get('snippet', {})
-            all_texts.append(snippet.get('title', ''))
-            all_texts.append(snippet.get('description', ''))
-            all_texts.extend(snippet.get('tags', []))
-        channel_summary = analyze_channel_texts("\n".join(all_texts))
-        if not channel_summary:
-            continue
-        ai_relevance_rating = rate_channel_relevance(user_query, channel_summary)
-        ai_score = ai_relevance_rating.get('score', 0) if ai_relevance_rating else 0
-        final_score = (ai_score * 0.6) + (activity_score * 0.2) + (reliability_score * 0.2)
-
-        # [유지] 템플릿에 하이퍼링크(channel_id)와 iframe(latest_video_id) 데이터를 전달
-        rated_channels.append({
-            'channel_id': channel_id,
-            'title': channel_title,
-            'thumbnail': channel['snippet']['thumbnails']['medium']['url'],
-            'summary': channel_summary,
-            'ai_score': ai_score,
-            'activity_score': activity_score,
-            'reliability_score': reliability_score,
-            'final_score': round(final_score, 2),
-            'reason': ai_relevance_rating.get('reason', 'N/A'),
-            'latest_video_id': latest_video_id  # [수정]에서 찾은 'embeddable'한 ID를 전달
-        })
-
-    sorted_channels = sorted(rated_channels, key=lambda x: x['final_score'], reverse=True)
-    result_data = {
-        'user_query': user_query,
-        'keywords': search_queries,
-        'recommendations': sorted_channels
-    }
-    context = {'result_data': result_data}
-    return render(request, 'frontend/partials/_search_results.html', context)
+
+async def _aanalyze_channel(channel_id: str, metrics: dict, openai_slots):
+    """[async] _analyze_channel의 비동기 버전"""
+    async with openai_slots:
+        with span('channel_analysis'):
+            channel_summary = await aanalyze_channel_texts(metrics['channel_text'], channel_id=channel_id,
+                                                           video_ids=metrics['video_ids'])
+    if not channel_summary:
+        return None
+    return metrics, channel_summary
+
+
+async def _arate_channels(user_query: str, analyzed_channels: list) -> dict:
+    """[async] _rate_channels의 비동기 버전"""
+    with span('relevance_rating') as rating_span:
+        rating_span.set(channels=len(analyzed_channels))
+        ratings = await arate_channels_relevance(
+            user_query, {channel_id: channel_summary for channel_id, (_, channel_summary) in analyzed_channels})
+    return _rated_channels(analyzed_channels, ratings)
+
+
+def _sse_event(event: str, html: str) -> str:
+    """HTML 조각을 서버 전송 이벤트(SSE) 형식으로 변환 (여러 줄은 data: 줄로 나눔)"""
+    lines = html.splitlines() or ['']
+    return f"event: {event}\n" + "".join(f"data: {line}\n" for line in lines) + "\n"
+
+
+def _recommendation_event_stream(user_query: str):
+    """추천 진행 이벤트를 HTMX SSE 확장이 교체할 HTML 조각으로 렌더링하여 내보냄"""
+    # 같은 검색어로 이미 진행 중인 스트림이 있으면 파이프라인을 다시 실행하지 않고 그 이벤트를 처음부터 함께 받음
+    events, shared = recommendation_flight.stream(
+        normalize_query(user_query), lambda: _iter_recommendation_events(user_query))
+    for event, data in events:
+        if shared and event == 'done':
+            # 다른 요청이 계산한 결과이므로 화면에는 이 사용자가 입력한 검색어를 표시
+            data = {**data, 'user_query': user_query}
+        if event == 'keywords':
+            yield _sse_event('keywords', render_to_string('frontend/partials/_keyword_pills.html', {'keywords': data}))
+        elif event == 'channel':
+            yield _sse_event('channel', render_to_string('frontend/partials/_channel_card.html', {'channel': data}))
+        elif event == 'done':
+            yield _sse_event('done', render_to_string('frontend/partials/_search_results.html', {'result_data': data}))
+        elif event == 'error':
+            yield _sse_event('done', render_to_string('frontend/partials/_error.html', {'message': data}))
+
+
+def recommendation_stream_view(request):
+    """
+    [스트리밍 버전] 추천 결과 영역을 먼저 렌더링하고,
+    브라우저가 SSE로 recommendation_events_view에 연결하여 결과를 단계별로 받도록 함
+    """
+    user_query = request.POST.get('query', '')
+    if not user_query:
+        return render(request, 'frontend/partials/_error.html', {'message': '검색어를 입력해주세요.'})
+
+    events_url = f"{reverse('recommendation_events')}?{urlencode({'query': user_query})}"
+    return render(request, 'frontend/partials/_search_stream.html', {'user_query': user_query, 'events_url': events_url})
+
+
+def recommendation_events_view(request):
+    """
+    [스트리밍 버전] 검색어 -> 채널 카드(평가 완료 순) -> 최종 정렬 결과 순서로 SSE 이벤트를 전송
+    """
+    user_query = request.GET.get('query', '')
+    if not user_query:
+        stream = iter([_sse_event('done', render_to_string('frontend/partials/_error.html',
+                                                            {'message': '검색어를 입력해주세요.'}))])
+    else:
+        stream = _recommendation_event_stream(user_query)
+
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # 프록시(nginx 등)가 응답을 모아두지 않도록
+    return response
+
+
+def recommendation_job_view(request):
+    """
+    [백그라운드 작업 버전] 추천 작업을 등록하고 진행 상황 영역을 바로 렌더링
+    (페이지는 recommendation_job_status_view를 주기적으로 조회하여 결과를 받음)
+    """
+    user_query = request.POST.get('query', '')
+    if not user_query:
+        return render(request, 'frontend/partials/_error.html', {'message': '검색어를 입력해주세요.'})
+
+    job = enqueue_recommendation(user_query, lambda: _iter_recommendation_events(user_query))
+    return _render_job(request, job)
+
+
+def recommendation_job_status_view(request, job_id):
+    """
+    [백그라운드 작업 버전] 작업 상태 조회
+    진행 중이면 중간 결과와 함께 다시 조회하는 영역을, 끝났으면 최종 결과(또는 오류)를 렌더링
+    (?format=json 이면 상태를 JSON으로 반환)
+    """
+    job = get_job(job_id)
+    if job is None:
+        raise Http404("추천 작업을 찾을 수 없습니다.")
+    if request.GET.get('format') == 'json':
+        return JsonResponse(job.as_status_dict(), json_dumps_params={'ensure_ascii': False})
+    return _render_job(request, job)
+
+
+def _render_job(request, job):
+    if job.status == RecommendationJob.DONE:
+        return render(request, 'frontend/partials/_search_results.html', {'result_data': job.result})
+    if job.status == RecommendationJob.ERROR:
+        return render(request, 'frontend/partials/_error.html', {'message': job.error_message})
+    status_url = reverse('recommendation_job_status', args=[job.pk])
+    return render(request, 'frontend/partials/_job_progress.html', {'job': job, 'status_url': status_url})
 
 
 def load_chat_view(request, chat_id):
-    """과거 채팅 기록 렌더링 (더미 데이터)"""
-    return render(request, 'frontend/search.html', {'chat_id': chat_id, 'message': '과거 채팅 기록 로드 예정'})
\ No newline at end of file
+    """과거 채팅 기록 렌더링 (저장된 추천 결과를 다시 계산하지 않고 그대로 표시)"""
+    history = get_object_or_404(SearchHistory, pk=chat_id)
+    context = {'result_data': history.as_result_data()}
+    return render(request, 'frontend/partials/_search_results.html', context)
\ No newline at end of file
@@ -0,0 +1,269 @@
+# gptAPI/async_services.py
+"""
+gptAPI/services.py 함수들의 비동기(async) 버전.
+AsyncOpenAI 클라이언트를 이벤트 루프마다 하나씩 만들어 재사용하므로 (gptAPI/client.py, 재시도/한도는 동기 호출과 같음),
+ASGI 서버에서는 하나의 프로세스가 대기 중인 OpenAI 호출을 많이 동시에 처리할 수 있습니다.
+(캐시/DB 접근은 sync_to_async로 감싸 이벤트 루프를 막지 않도록 합니다)
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .client import achat_completion
+from .cache import (
+    get_cached_summary, store_summary, get_cached_rating, store_rating, get_cached_keywords, store_keywords,
+    normalize_keyword_query,
+)
+from core.singleflight import AsyncSingleFlight
+from core.tracing import span, record_openai_usage
+from .services import (
+    load_prompt_config, chunk_channel_summaries, build_batch_rating_content, parse_batch_ratings, keyword_emitter,
+    channel_analysis_key,
+)
+
+# 동기 버전(keyword_flight, channel_analysis_flight)과 같은 키로 이벤트 루프 안의 중복 호출을 합침
+async_keyword_flight = AsyncSingleFlight('keyword_extraction_async')
+async_channel_analysis_flight = AsyncSingleFlight('channel_analysis_async')
+
+async def aextract_keywords(user_prompt: str, on_keyword=None) -> list[str]:
+    """
+    [async] 사용자 프롬프트에서 검색에 사용할 검색어 목록을 추출
+    (캐시에 있으면 바로 반환하고, 같은 검색어의 요청이 동시에 들어오면 한 번만 호출하고 결과를 함께 사용)
+    on_keyword를 넘기면 스트리밍으로 받으며 검색어가 완성될 때마다 on_keyword(검색어)를 호출 (동기 함수)
+    """
+    cached_keywords = await sync_to_async(get_cached_keywords)(user_prompt)
+    if cached_keywords is not None:
+        return list(cached_keywords)
+    search_queries, _ = await async_keyword_flight.do(normalize_keyword_query(user_prompt),
+                                                      lambda: _aextract_keywords(user_prompt, on_keyword))
+    return list(search_queries)
+
+
+async def _aextract_keywords(user_prompt: str, on_keyword=None) -> list[str]:
+    api_key = getattr(settings, 'OPENAI_API_KEY', None)
+    if not api_key:
+        return []
+
+    prompt_config = load_prompt_config('keyword_extraction.json')
+    if not prompt_config:
+        return []
+
+    try:
+        with span('openai.request', prompt='keyword_extraction') as request_span:
+            request = dict(
+                model=prompt_config['model'],
+                messages=[
+                    {"role": "system", "content": prompt_config['system_message']},
+                    {"role": "user", "content": user_prompt}
+                ],
+                response_format=prompt_config.get('response_format'),
+                max_tokens=prompt_config['max_tokens'],
+                temperature=prompt_config['temperature'],
+            )
+            if on_keyword is None:
+                response = await achat_completion(api_key, request_span, **request)
+                record_openai_usage(request_span, 'keyword_extraction', response)
+                content = response.choices[0].message.content
+            else:
+                stream = await achat_completion(api_key, request_span, stream=True,
+                                                stream_options={'include_usage': True}, **request)
+                feed, content_so_far = keyword_emitter(on_keyword)
+                async for chunk in stream:
+                    if chunk.choices:
+                        feed(chunk.choices[0].delta.content)
+                    if chunk.usage:
+                        record_openai_usage(request_span, 'keyword_extraction', chunk)
+                content = content_so_far()
+
+        response_data = json.loads(content)
+        search_queries = response_data.get('search_queries', [])
+        await sync_to_async(store_keywords)(user_prompt, search_queries)
+        return search_queries
+
+    except Exception as e:
+        print(f"An error occurred during OpenAI API call: {e}")
+        return []
+
+
+async def asummarize_comments(comments: list[str]) -> str:
+    """[async] 댓글 리스트를 GPT를 이용해 요약"""
+    api_key = getattr(settings, 'OPENAI_API_KEY', None)
+    if not api_key:
+        print("Error: OpenAI API key is not configured.")
+        return ""
+
+    prompt_config = load_prompt_config('comment_summarization.json')
+    if not prompt_config:
+        return ""
+
+    comment_text = "\n".join(comments)
+    user_content = f"Please summarize the following comments:\n\n{comment_text}"
+
+    try:
+        with span('openai.request', prompt='comment_summarization') as request_span:
+            response = await achat_completion(
+                api_key, request_span,
+                model=prompt_config['model'],
+                messages=[
+                    {"role": "system", "content": prompt_config['system_message']},
+                    {"role": "user", "content": user_content}
+                ],
+                max_tokens=prompt_config['max_tokens'],
+                temperature=prompt_config['temperature'],
+            )
+            record_openai_usage(request_span, 'comment_summarization', response)
+        return response.choices[0].message.content.strip()
+
+    except Exception as e:
+        print(f"An error occurred during OpenAI API call: {e}")
+        return ""
+
+
+async def aanalyze_channel_texts(channel_texts: str, channel_id: str = None, video_ids: list[str] = None) -> str:
+    """
+    [async] 채널의 모든 텍스트 데이터를 종합하여 분석 및 요약
+    (저장된 분석 결과가 있으면 재사용하고, 같은 채널의 분석이 진행 중이면 그 결과를 함께 사용)
+    """
+    cached_summary = await sync_to_async(get_cached_summary)(channel_texts, channel_id, video_ids)
+    if cached_summary:
+        return cached_summary
+
+    # 같은 채널(영상 구성)의 분석이 이미 진행 중이면 그 결과를 기다림
+    summary, _ = await async_channel_analysis_flight.do(
+        channel_analysis_key(channel_texts, channel_id, video_ids),
+        lambda: _aanalyze_channel_texts(channel_texts, channel_id, video_ids))
+    return summary
+
+
+async def _aanalyze_channel_texts(channel_texts: str, channel_id: str = None, video_ids: list[str] = None) -> str:
+    api_key = getattr(settings, 'OPENAI_API_KEY', None)
+    if not api_key:
+        return ""
+
+    prompt_config = load_prompt_config('channel_analyzer.json')
+    if not prompt_config:
+        return ""
+
+    try:
+        with span('openai.request', prompt='channel_analyzer') as request_span:
+            response = await achat_completion(
+                api_key, request_span,
+                model=prompt_config['model'],
+                messages=[
+                    {"role": "system", "content": prompt_config['system_message']},
+                    {"role": "user", "content": channel_texts}
+                ],
+                max_tokens=prompt_config['max_tokens'],
+                temperature=prompt_config['temperature'],
+            )
+            record_openai_usage(request_span, 'channel_analyzer', response)
+        summary = response.choices[0].message.content.strip()
+        if summary:
+            await sync_to_async(store_summary)(channel_texts, summary, channel_id, video_ids)
+        return summary
+
+    except Exception as e:
+        print(f"An error occurred during OpenAI API call: {e}")
+        return ""
+
+
+async def arate_channel_relevance(user_query: str, channel_summary: str) -> dict:
+    """[async] 사용자 쿼리와 채널 요약본을 비교하여 관련도 점수 및 이유 반환 (캐시 재사용)"""
+    cached_rating = await sync_to_async(get_cached_rating)(user_query, channel_summary)
+    if cached_rating is not None:
+        return cached_rating
+
+    api_key = getattr(settings, 'OPENAI_API_KEY', None)
+    if not api_key:
+        return {}
+
+    prompt_config = load_prompt_config('relevance_rater.json')
+    if not prompt_config:
+        return {}
+
+    user_content = f"A: {user_query}\n\nB: {channel_summary}"
+
+    try:
+        with span('openai.request', prompt='relevance_rater') as request_span:
+            response = await achat_completion(
+                api_key, request_span,
+                model=prompt_config['model'],
+                messages=[
+                    {"role": "system", "content": prompt_config['system_message']},
+                    {"role": "user", "content": user_content}
+                ],
+                response_format=prompt_config.get('response_format'), # JSON 모드 활성화
+                max_tokens=prompt_config['max_tokens'],
+                temperature=prompt_config['temperature'],
+            )
+            record_openai_usage(request_span, 'relevance_rater', response)
+        result = json.loads(response.choices[0].message.content)
+        if result:
+            await sync_to_async(store_rating)(user_query, channel_summary, result)
+        return result
+
+    except Exception as e:
+        print(f"An error occurred during OpenAI API call: {e}")
+        return {}
+
+
+async def arate_channels_relevance(user_query: str, channel_summaries: dict) -> dict:
+    """
+    [async] 여러 채널의 요약본을 묶어서 평가하여 {channel_id: {"score", "reason"}} 반환
+    (나뉜 요청끼리는 동시에 보내며, 해석하지 못한 채널은 arate_channel_relevance로 하나씩 다시 평가)
+    """
+    results = {}
+    pending = {}
+    for channel_id, summary in channel_summaries.items():
+        cached_rating = await sync_to_async(get_cached_rating)(user_query, summary)
+        if cached_rating is not None:
+            results[channel_id] = cached_rating
+        else:
+            pending[channel_id] = summary
+    if not pending:
+        return results
+
+    api_key = getattr(settings, 'OPENAI_API_KEY', None)
+    if not api_key:
+        return results
+
+    prompt_config = load_prompt_config('relevance_batch_rater.json')
+    if not prompt_config:
+        return results
+
+    async def rate_chunk(chunk: dict) -> dict:
+        try:
+            with span('openai.request', prompt='relevance_batch_rater') as request_span:
+                response = await achat_completion(
+                    api_key, request_span,
+                    model=prompt_config['model'],
+                    messages=[
+                        {"role": "system", "content": prompt_config['system_message']},
+                        {"role": "user", "content": build_batch_rating_content(user_query, chunk)}
+                    ],
+                    response_format=prompt_config.get('response_format'), # JSON 모드 활성화
+                    max_tokens=prompt_config['max_tokens_per_channel'] * len(chunk),
+                    temperature=prompt_config['temperature'],
+                )
+                record_openai_usage(request_span, 'relevance_batch_rater', response)
+            ratings = parse_batch_ratings(response.choices[0].message.content, chunk)
+        except Exception as e:
+            print(f"An error occurred during batch relevance rating: {e}")
+            ratings = {}
+
+        chunk_results = {}
+        for channel_id, summary in chunk.items():
+            if channel_id in ratings:
+                await sync_to_async(store_rating)(user_query, summary, ratings[channel_id])
+                chunk_results[channel_id] = ratings[channel_id]
+            else:
+                chunk_results[channel_id] = await arate_channel_relevance(user_query, summary)
+        return chunk_results
+
+    token_budget = getattr(settings, 'RELEVANCE_BATCH_TOKEN_BUDGET', prompt_config['input_token_budget'])
+    chunks = chunk_channel_summaries(pending, token_budget, prompt_config['max_channels_per_request'])
+    for chunk_results in await asyncio.gather(*[rate_chunk(chunk) for chunk in chunks]):
+        results.update(chunk_results)
+    return results
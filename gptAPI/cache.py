@@ -0,0 +1,168 @@
+# gptAPI/cache.py
+"""
+LLM 호출 결과 캐시.
+- 채널 분석(analyze_channel_texts) : DB(ChannelSummary)에 저장, TTL 및 최신 영상 구성 변경 시 무효화
+- 관련도 평가(rate_channel_relevance, rate_channels_relevance) : Django 캐시에 (정규화된 쿼리, 요약 해시) 키로 짧게 저장
+- 키워드 추출(extract_keywords) : 프로세스 내부 LRU + DB(KeywordExtraction)에 정규화된 검색어 키로 저장
+  (조사/문장부호/요청 표현만 다른 검색어는 같은 결과를 사용)
+"""
+import hashlib
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.utils import timezone
+
+from core.tracing import record_cache_lookup
+from youtube_api.cache import MemoryCacheBackend
+from .models import ChannelSummary, KeywordExtraction
+
+DEFAULT_CHANNEL_SUMMARY_TTL = 7 * 24 * 60 * 60
+DEFAULT_RELEVANCE_CACHE_TTL = 60 * 60
+DEFAULT_KEYWORD_CACHE_TTL = 30 * 24 * 60 * 60
+DEFAULT_KEYWORD_CACHE_MAX_ENTRIES = 1024
+
+# 검색어 정규화 시 단어 끝에서 떼어낼 조사 (긴 것부터 검사)
+# 이/가/의/도/로 등 명사 끝 글자와 겹치기 쉬운 조사는 제외 (고양이, 요가, 포도...)
+_PARTICLE_SUFFIXES = ('에서는', '에서', '으로', '에게', '한테', '이랑', '까지', '부터', '처럼', '은', '는', '을', '를')
+# 검색 의도와 무관한 요청 표현
+_REQUEST_WORDS = {'좀', '알려줘', '알려주세요', '추천해줘', '추천해주세요', '찾아줘', '찾아주세요', 'please'}
+_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+# 키워드 추출 결과의 프로세스 내부 LRU (DB 조회 전 단계)
+keyword_memory_cache = MemoryCacheBackend(
+    getattr(settings, 'KEYWORD_CACHE_MAX_ENTRIES', DEFAULT_KEYWORD_CACHE_MAX_ENTRIES))
+
+
+def normalize_query(query: str) -> str:
+    """검색어를 캐시 키로 쓰기 위해 정규화 (앞뒤 공백 제거, 연속 공백 축소, 소문자화)"""
+    return re.sub(r'\s+', ' ', query or '').strip().lower()
+
+
+def normalize_keyword_query(query: str) -> str:
+    """
+    키워드 추출 캐시 키용 정규화.
+    normalize_query에 더해 문장부호, 단어 끝 조사(을/를/은/는/에서...), 요청 표현(알려줘, 추천해줘...)을 제거합니다.
+    (조사를 떼면 한 글자만 남는 단어는 그대로 두고, 모두 지워지면 normalize_query 결과를 사용)
+    """
+    normalized = normalize_query(query)
+    words = []
+    for word in _PUNCTUATION_PATTERN.sub(' ', normalized).split():
+        if word in _REQUEST_WORDS:
+            continue
+        for suffix in _PARTICLE_SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+                word = word[:-len(suffix)]
+                break
+        words.append(word)
+    return ' '.join(words) or normalized
+
+
+def content_hash(text: str) -> str:
+    """텍스트의 SHA-256 해시"""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def video_set_hash(video_ids) -> str:
+    """영상 ID 목록의 해시 (순서와 무관)"""
+    return content_hash(','.join(sorted(video_ids)))
+
+
+def get_cached_summary(channel_texts: str, channel_id: str = None, video_ids=None):
+    """
+    저장된 채널 분석 결과를 반환합니다. (없거나 만료되었으면 None)
+    1) 입력 텍스트가 완전히 같으면 그대로 재사용
+    2) 같은 채널이고 최신 영상 구성이 같으면 재사용 (조회수 등 사소한 변화는 무시)
+    """
+    ttl = getattr(settings, 'CHANNEL_SUMMARY_TTL', DEFAULT_CHANNEL_SUMMARY_TTL)
+    fresh = ChannelSummary.objects.filter(analyzed_at__gte=timezone.now() - timedelta(seconds=ttl))
+    try:
+        row = fresh.filter(content_hash=content_hash(channel_texts)).first()
+        if row is None and channel_id and video_ids is not None:
+            row = fresh.filter(channel_id=channel_id, video_set_hash=video_set_hash(video_ids)).first()
+    except DatabaseError as e:
+        print(f"Error reading channel summary cache: {e}")
+        return None
+    record_cache_lookup('channel_summary', row is not None)
+    return row.summary if row else None
+
+
+def store_summary(channel_texts: str, summary: str, channel_id: str = None, video_ids=None):
+    """채널 분석 결과를 저장하고, 같은 채널의 이전 영상 구성으로 만든 결과는 삭제합니다."""
+    set_hash = video_set_hash(video_ids) if video_ids is not None else ''
+    try:
+        if channel_id:
+            ChannelSummary.objects.filter(channel_id=channel_id).exclude(video_set_hash=set_hash).delete()
+        ChannelSummary.objects.update_or_create(
+            content_hash=content_hash(channel_texts),
+            defaults={
+                'channel_id': channel_id or '',
+                'video_set_hash': set_hash,
+                'summary': summary,
+                'analyzed_at': timezone.now(),
+            },
+        )
+    except DatabaseError as e:
+        print(f"Error writing channel summary cache: {e}")
+
+
+def _rating_key(user_query: str, channel_summary: str) -> str:
+    return 'relevance:' + content_hash(normalize_query(user_query) + '\n' + content_hash(channel_summary))
+
+
+def get_cached_rating(user_query: str, channel_summary: str):
+    """(정규화된 쿼리, 요약 해시)에 대한 관련도 평가 결과를 반환합니다. (없으면 None)"""
+    rating = cache.get(_rating_key(user_query, channel_summary))
+    record_cache_lookup('relevance_rating', rating is not None)
+    return rating
+
+
+def store_rating(user_query: str, channel_summary: str, rating: dict):
+    """관련도 평가 결과를 짧은 TTL로 저장합니다."""
+    ttl = getattr(settings, 'RELEVANCE_CACHE_TTL', DEFAULT_RELEVANCE_CACHE_TTL)
+    cache.set(_rating_key(user_query, channel_summary), rating, ttl)
+
+
+def _keyword_cache_ttl() -> int:
+    return getattr(settings, 'KEYWORD_CACHE_TTL', DEFAULT_KEYWORD_CACHE_TTL)
+
+
+def get_cached_keywords(user_prompt: str):
+    """정규화한 검색어가 같은 키워드 추출 결과를 반환합니다. (메모리 -> DB 순서, 없거나 만료되었으면 None)"""
+    query_key = normalize_keyword_query(user_prompt)
+    search_queries = keyword_memory_cache.get(query_key)
+    if search_queries is None:
+        ttl = _keyword_cache_ttl()
+        try:
+            row = KeywordExtraction.objects.filter(
+                query_key=query_key[:500], extracted_at__gte=timezone.now() - timedelta(seconds=ttl)).first()
+        except DatabaseError as e:
+            print(f"Error reading keyword cache: {e}")
+            row = None
+        if row is not None:
+            search_queries = row.search_queries
+            remaining = ttl - (timezone.now() - row.extracted_at).total_seconds()
+            keyword_memory_cache.set(query_key, search_queries, max(1, int(remaining)))
+    record_cache_lookup('keywords', search_queries is not None)
+    return search_queries
+
+
+def store_keywords(user_prompt: str, search_queries: list, extracted_at=None):
+    """키워드 추출 결과를 저장합니다. (빈 결과는 일시적 오류일 수 있으므로 저장하지 않음)"""
+    if not search_queries:
+        return
+    query_key = normalize_keyword_query(user_prompt)
+    extracted_at = extracted_at or timezone.now()
+    remaining = _keyword_cache_ttl() - (timezone.now() - extracted_at).total_seconds()
+    if remaining <= 0:
+        return
+    keyword_memory_cache.set(query_key, list(search_queries), int(remaining))
+    try:
+        KeywordExtraction.objects.update_or_create(
+            query_key=query_key[:500],
+            defaults={'query': user_prompt[:500], 'search_queries': list(search_queries), 'extracted_at': extracted_at},
+        )
+    except DatabaseError as e:
+        print(f"Error writing keyword cache: {e}")
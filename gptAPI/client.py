@@ -0,0 +1,381 @@
+# gptAPI/client.py
+"""
+OpenAI Chat Completions 호출을 담당하는 공용 클라이언트.
+
+    response = chat_completion(api_key, request_span, model=..., messages=[...], max_tokens=...)
+    response = await achat_completion(api_key, request_span, model=..., messages=[...], max_tokens=...)
+
+- 연결 재사용: 동기 호출은 API 키마다 하나의 openai.OpenAI(httpx 연결 풀)를 모든 스레드가 함께 쓰고,
+  비동기 호출은 이벤트 루프마다 하나의 AsyncOpenAI를 씁니다.
+- 재시도: 429(요청/토큰 한도), 5xx, 연결 오류·시간 초과는 OPENAI_MAX_RETRIES번까지 다시 시도합니다.
+  대기 시간은 지수 백오프에 지터(full jitter)를 적용하고, 서버가 Retry-After를 보내면 그 값을 따릅니다.
+  (SDK 자체 재시도는 끄고 여기서만 재시도하므로, 재시도도 아래 한도에 포함됩니다)
+- 한도: 분당 토큰 수(OPENAI_TOKENS_PER_MINUTE)를 넘지 않도록 요청 전에 예상 토큰만큼 예약하고,
+  동시에 보내는 요청 수는 OPENAI_MAX_CONCURRENCY로 제한합니다.
+- 요청마다 OPENAI_REQUEST_TIMEOUT(초) 제한 시간을 적용합니다.
+"""
+import asyncio
+import random
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+
+import httpx
+import openai
+from django.conf import settings
+
+from core.tracing import metrics, OPENAI_RETRIES
+
+DEFAULT_REQUEST_TIMEOUT = 30
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BASE_DELAY = 0.5
+DEFAULT_RETRY_MAX_DELAY = 20
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TOKENS_PER_MINUTE = 0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수를 대략 추정 (tokenizer 없이 사용하기 위한 보수적인 근사치)
+    ASCII는 약 4글자당 1토큰, 한글 등 그 외 문자는 글자당 1토큰으로 계산
+    """
+    text = text or ''
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def estimate_request_tokens(request: dict) -> int:
+    """요청 하나가 사용할 토큰 수 추정 (메시지 입력 + 최대 출력)"""
+    prompt_tokens = sum(estimate_tokens(message.get('content')) for message in request.get('messages', []))
+    return prompt_tokens + (request.get('max_tokens') or 0)
+
+
+class TokenRateLimiter:
+    """
+    분당 토큰 한도를 지키기 위한 토큰 버킷 (스레드 세이프).
+    reserve()는 토큰을 먼저 예약하고, 예약분을 쓸 수 있을 때까지 기다려야 하는 시간(초)을 반환하므로
+    동기/비동기 호출이 같은 버킷을 함께 쓸 수 있습니다. (tokens_per_minute가 0이면 제한 없음)
+    """
+
+    def __init__(self, tokens_per_minute: int, clock=time.monotonic):
+        self.tokens_per_minute = tokens_per_minute
+        self.clock = clock
+        self.available = float(tokens_per_minute)
+        self.updated_at = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.available = min(self.tokens_per_minute,
+                             self.available + (now - self.updated_at) * self.tokens_per_minute / 60)
+        self.updated_at = now
+
+    def reserve(self, tokens: int) -> float:
+        if self.tokens_per_minute <= 0:
+            return 0.0
+        with self.lock:
+            self._refill()
+            # 한도보다 큰 요청도 한 번에는 보낼 수 있도록 한도만큼만 예약
+            self.available -= min(tokens, self.tokens_per_minute)
+            if self.available >= 0:
+                return 0.0
+            return -self.available * 60 / self.tokens_per_minute
+
+    def adjust(self, tokens: int):
+        """예약량과 실제 사용량의 차이를 반영합니다. (양수면 반환, 음수면 추가 차감)"""
+        if self.tokens_per_minute <= 0 or not tokens:
+            return
+        with self.lock:
+            self._refill()
+            self.available = min(self.tokens_per_minute, self.available + tokens)
+
+
+def _retry_after(error) -> float:
+    """응답의 Retry-After(-ms) 헤더 값(초). 없거나 해석할 수 없으면 None"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers['retry-after-ms']) / 1000
+    except (KeyError, ValueError):
+        pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        # HTTP 날짜 형식
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(error) -> bool:
+    if isinstance(error, openai.RateLimitError):
+        # 결제 한도 초과(insufficient_quota)는 기다려도 풀리지 않음
+        return getattr(error, 'code', None) != 'insufficient_quota'
+    # 스트리밍 응답을 읽는 중 끊긴 연결은 SDK가 감싸지 않고 httpx 오류 그대로 전달됨
+    return isinstance(error, (openai.InternalServerError, openai.APIConnectionError, httpx.TransportError))
+
+
+class OpenAIClient:
+    """
+    OpenAI 클라이언트와 호출 한도(토큰 버킷, 동시 요청 수)를 프로세스 전체에서 공유하는 싱글톤 클래스.
+    (클라이언트는 첫 호출 때 만들어지고, configure()로 전송 계층을 바꾸면 새로 만들어집니다)
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.lock = threading.Lock()
+            self.clients = {}  # API 키 -> openai.OpenAI
+            self.async_clients = weakref.WeakKeyDictionary()  # 이벤트 루프 -> (API 키, AsyncOpenAI, 세마포어)
+            self.transport = None
+            self.async_transport = None
+            self.limiter = None
+            self.semaphore = None
+            self.random = random.Random()
+            self.initialized = True
+
+    # --- 설정 ---
+
+    @staticmethod
+    def _setting(name: str, default):
+        return getattr(settings, name, default)
+
+    def configure(self, transport=None, async_transport=None):
+        """
+        httpx 전송 계층을 교체합니다. (None이면 실제 네트워크 사용)
+        벤치마크/테스트에서 gptAPI/fakes.py의 가짜 서버로 요청을 보낼 때 사용하며,
+        이미 만들어 둔 클라이언트와 호출 한도는 다음 요청 때 새로 만들어집니다.
+        """
+        with self.lock:
+            self.transport = transport
+            self.async_transport = async_transport
+            self.clients = {}
+            self.async_clients = weakref.WeakKeyDictionary()
+            self.limiter = None
+            self.semaphore = None
+
+    def _limits(self):
+        with self.lock:
+            if self.limiter is None:
+                self.limiter = TokenRateLimiter(self._setting('OPENAI_TOKENS_PER_MINUTE', DEFAULT_TOKENS_PER_MINUTE))
+                self.semaphore = threading.BoundedSemaphore(
+                    self._setting('OPENAI_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+            return self.limiter, self.semaphore
+
+    def _http_limits(self) -> httpx.Limits:
+        max_concurrency = self._setting('OPENAI_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)
+        return httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+
+    def get_client(self, api_key: str) -> openai.OpenAI:
+        """API 키에 해당하는 동기 클라이언트를 반환합니다. (키마다 하나의 연결 풀을 모든 스레드가 공유)"""
+        with self.lock:
+            client = self.clients.get(api_key)
+            if client is None:
+                client = openai.OpenAI(
+                    api_key=api_key, max_retries=0,
+                    http_client=httpx.Client(transport=self.transport, limits=self._http_limits()),
+                )
+                self.clients[api_key] = client
+            return client
+
+    def get_async_client(self, api_key: str):
+        """현재 이벤트 루프에서 재사용할 (AsyncOpenAI, 동시 요청 세마포어)를 반환합니다."""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            entry = self.async_clients.get(loop)
+            if entry is None or entry[0] != api_key:
+                client = openai.AsyncOpenAI(
+                    api_key=api_key, max_retries=0,
+                    http_client=httpx.AsyncClient(transport=self.async_transport, limits=self._http_limits()),
+                )
+                entry = (api_key, client,
+                         asyncio.Semaphore(self._setting('OPENAI_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)))
+                self.async_clients[loop] = entry
+            return entry[1], entry[2]
+
+    # --- 재시도 ---
+
+    def _retry_delay(self, error, attempt: int) -> float:
+        """다음 시도까지 기다릴 시간(초). 재시도하지 않을 오류이거나 재시도 횟수를 다 썼으면 None"""
+        if not _is_retryable(error) or attempt >= self._setting('OPENAI_MAX_RETRIES', DEFAULT_MAX_RETRIES):
+            return None
+        max_delay = self._setting('OPENAI_RETRY_MAX_DELAY', DEFAULT_RETRY_MAX_DELAY)
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            # 서버가 요청한 대기 시간이 너무 길면 기다리지 않고 실패 처리
+            return retry_after if retry_after <= max_delay else None
+        base_delay = self._setting('OPENAI_RETRY_BASE_DELAY', DEFAULT_RETRY_BASE_DELAY)
+        return self.random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+    @staticmethod
+    def _record_retry(error, request_span):
+        status = getattr(error, 'status_code', None)
+        metrics.inc(OPENAI_RETRIES, {'reason': str(status) if status else type(error).__name__})
+        if request_span is not None:
+            request_span.set(retries=request_span.attributes.get('retries', 0) + 1)
+
+    @staticmethod
+    def _reserve(limiter, reserved: int, request_span) -> float:
+        """토큰을 한 번만 예약하고 기다릴 시간(초)을 반환 (실패한 시도는 토큰을 쓰지 않으므로 재시도마다 다시 예약하지 않음)"""
+        wait = limiter.reserve(reserved)
+        if wait and request_span is not None:
+            request_span.set(throttled_seconds=round(wait, 3))
+        return wait
+
+    @staticmethod
+    def _used_tokens(response, reserved: int) -> int:
+        total_tokens = getattr(getattr(response, 'usage', None), 'total_tokens', None)
+        return total_tokens if isinstance(total_tokens, int) else reserved
+
+    def chat_completion(self, api_key: str, request_span=None, **request):
+        """
+        chat.completions.create를 한도 안에서 호출하고, 일시적인 오류는 재시도합니다.
+        stream=True이면 조각(chunk) 이터레이터를 반환합니다. (_stream_completion 참고)
+        """
+        if request.get('stream'):
+            return self._stream_completion(api_key, request_span, request)
+        client = self.get_client(api_key)
+        limiter, semaphore = self._limits()
+        reserved = estimate_request_tokens(request)
+        wait = self._reserve(limiter, reserved, request_span)
+        if wait:
+            time.sleep(wait)
+        attempt = 0
+        while True:
+            try:
+                with semaphore:
+                    response = client.chat.completions.create(
+                        timeout=self._setting('OPENAI_REQUEST_TIMEOUT', DEFAULT_REQUEST_TIMEOUT), **request)
+            except openai.OpenAIError as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    # 최종 실패: 쓰지 않은 예약분을 돌려줌
+                    limiter.adjust(reserved)
+                    raise
+                self._record_retry(e, request_span)
+                attempt += 1
+                time.sleep(delay)
+                continue
+            limiter.adjust(reserved - self._used_tokens(response, reserved))
+            return response
+
+    def _stream_completion(self, api_key: str, request_span, request: dict):
+        """
+        stream=True 호출. 응답을 끝까지 읽거나 닫을 때까지 동시 요청 자리를 유지하고,
+        읽는 중에 난 오류도 요청 오류와 같이 재시도/예약 반환 처리합니다.
+        (이미 조각을 내보낸 뒤의 오류는 내용이 중복되지 않도록 재시도하지 않음)
+        """
+        client = self.get_client(api_key)
+        limiter, semaphore = self._limits()
+        reserved = estimate_request_tokens(request)
+        wait = self._reserve(limiter, reserved, request_span)
+        if wait:
+            time.sleep(wait)
+        attempt, used = 0, reserved
+        while True:
+            emitted = False
+            try:
+                with semaphore:
+                    with client.chat.completions.create(
+                            timeout=self._setting('OPENAI_REQUEST_TIMEOUT', DEFAULT_REQUEST_TIMEOUT), **request) as stream:
+                        for chunk in stream:
+                            used = self._used_tokens(chunk, used)
+                            emitted = True
+                            yield chunk
+            except (openai.OpenAIError, httpx.TransportError) as e:
+                delay = None if emitted else self._retry_delay(e, attempt)
+                if delay is None:
+                    limiter.adjust(reserved)
+                    raise
+                self._record_retry(e, request_span)
+                attempt += 1
+                time.sleep(delay)
+                continue
+            limiter.adjust(reserved - used)
+            return
+
+    async def achat_completion(self, api_key: str, request_span=None, **request):
+        """[async] chat_completion과 같은 재시도/한도를 적용하여 호출합니다. (stream=True이면 async 이터레이터)"""
+        if request.get('stream'):
+            return self._astream_completion(api_key, request_span, request)
+        client, semaphore = self.get_async_client(api_key)
+        limiter, _ = self._limits()
+        reserved = estimate_request_tokens(request)
+        wait = self._reserve(limiter, reserved, request_span)
+        if wait:
+            await asyncio.sleep(wait)
+        attempt = 0
+        while True:
+            try:
+                async with semaphore:
+                    response = await client.chat.completions.create(
+                        timeout=self._setting('OPENAI_REQUEST_TIMEOUT', DEFAULT_REQUEST_TIMEOUT), **request)
+            except openai.OpenAIError as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    # 최종 실패: 쓰지 않은 예약분을 돌려줌
+                    limiter.adjust(reserved)
+                    raise
+                self._record_retry(e, request_span)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            limiter.adjust(reserved - self._used_tokens(response, reserved))
+            return response
+
+    async def _astream_completion(self, api_key: str, request_span, request: dict):
+        """[async] _stream_completion의 비동기 버전"""
+        client, semaphore = self.get_async_client(api_key)
+        limiter, _ = self._limits()
+        reserved = estimate_request_tokens(request)
+        wait = self._reserve(limiter, reserved, request_span)
+        if wait:
+            await asyncio.sleep(wait)
+        attempt, used = 0, reserved
+        while True:
+            emitted = False
+            try:
+                async with semaphore:
+                    stream = await client.chat.completions.create(
+                        timeout=self._setting('OPENAI_REQUEST_TIMEOUT', DEFAULT_REQUEST_TIMEOUT), **request)
+                    async with stream:
+                        async for chunk in stream:
+                            used = self._used_tokens(chunk, used)
+                            emitted = True
+                            yield chunk
+            except (openai.OpenAIError, httpx.TransportError) as e:
+                delay = None if emitted else self._retry_delay(e, attempt)
+                if delay is None:
+                    limiter.adjust(reserved)
+                    raise
+                self._record_retry(e, request_span)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            limiter.adjust(reserved - used)
+            return
+
+
+# Create a single, global instance of the client for the application to use.
+openai_client = OpenAIClient()
+
+
+def chat_completion(api_key: str, request_span=None, **request):
+    return openai_client.chat_completion(api_key, request_span=request_span, **request)
+
+
+async def achat_completion(api_key: str, request_span=None, **request):
+    return await openai_client.achat_completion(api_key, request_span=request_span, **request)
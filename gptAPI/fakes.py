@@ -0,0 +1,200 @@
+# gptAPI/fakes.py
+"""
+OpenAI Chat Completions API의 오프라인 대역(fake).
+공용 클라이언트(gptAPI/client.py)의 HTTP 전송 계층(httpx)만 바꿔 끼우므로,
+services.py / async_services.py의 코드(프롬프트 로드, SDK 호출, 응답 파싱, 캐시)는 실제와 똑같이 실행됩니다.
+
+    server = FakeOpenAIServer(latency=0.5, error_rate=0.01)
+    server.install()
+    ...
+    server.uninstall()
+
+- 어떤 프롬프트(keyword_extraction, channel_analyzer, ...)로 호출했는지는 system 메시지로 구분합니다.
+- 응답은 입력에서 결정적으로 만들어지므로 같은 입력은 항상 같은 결과를 받습니다.
+- stream=True 요청에는 응답을 여러 조각으로 나눈 SSE로 응답합니다.
+- latency/jitter(초) 만큼 응답을 지연하고, error_rate 확률로 500을 돌려줍니다.
+  (gptAPI/client.py의 재시도 동작도 그대로 실행됩니다)
+"""
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+
+import httpx
+
+from .client import openai_client, estimate_tokens
+from .services import load_prompt_config
+
+# 프롬프트 파일 -> 호출 종류 이름
+PROMPT_KINDS = {
+    'keyword_extraction.json': 'keyword_extraction',
+    'comment_summarization.json': 'comment_summarization',
+    'channel_analyzer.json': 'channel_analyzer',
+    'relevance_rater.json': 'relevance_rater',
+    'relevance_batch_rater.json': 'relevance_batch_rater',
+}
+
+
+def _stable_int(text: str) -> int:
+    return int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:12], 16)
+
+
+class FakeOpenAIServer:
+    """/chat/completions 요청을 처리하는 스레드 세이프한 가짜 서버 (httpx.MockTransport 핸들러)"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.kinds_by_system_message = {}
+        for filename, kind in PROMPT_KINDS.items():
+            config = load_prompt_config(filename)
+            if config:
+                self.kinds_by_system_message[config['system_message']] = kind
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.calls = Counter()   # 호출 종류 -> 호출 수 (오류 포함)
+            self.errors = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'calls': dict(self.calls),
+                'total_calls': sum(self.calls.values()),
+                'errors': self.errors,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+            }
+
+    def install(self):
+        """공용 OpenAI 클라이언트가 이 가짜 서버로 요청을 보내도록 설정합니다. (동기/비동기 모두)"""
+        openai_client.configure(transport=httpx.MockTransport(self.handle),
+                                async_transport=httpx.MockTransport(self.ahandle))
+
+    def uninstall(self):
+        openai_client.configure()
+
+    # --- 요청 처리 ---
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if not request.url.path.endswith('/chat/completions'):
+            return self._not_found()
+        body, delay, failed = self._receive(request)
+        if delay:
+            time.sleep(delay)
+        return self._respond(body, failed)
+
+    async def ahandle(self, request: httpx.Request) -> httpx.Response:
+        """handle의 비동기 버전 (응답 지연 중에 이벤트 루프를 막지 않음)"""
+        if not request.url.path.endswith('/chat/completions'):
+            return self._not_found()
+        body, delay, failed = self._receive(request)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(body, failed)
+
+    @staticmethod
+    def _not_found() -> httpx.Response:
+        return httpx.Response(404, json={'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+
+    def _kind(self, messages: list) -> str:
+        system_message = next((m['content'] for m in messages if m['role'] == 'system'), '')
+        return self.kinds_by_system_message.get(system_message, 'unknown')
+
+    def _receive(self, request: httpx.Request):
+        """요청 본문, 응답 지연(초), 실패 여부를 정합니다."""
+        body = json.loads(request.content)
+        with self.lock:
+            self.calls[self._kind(body.get('messages', []))] += 1
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self.error_rate and self.random.random() < self.error_rate
+        return body, delay, failed
+
+    def _respond(self, body: dict, failed: bool) -> httpx.Response:
+        messages = body.get('messages', [])
+        user_message = next((m['content'] for m in messages if m['role'] == 'user'), '')
+        kind = self._kind(messages)
+        if failed:
+            with self.lock:
+                self.errors += 1
+            return httpx.Response(500, json={'error': {'message': 'The server had an error.', 'type': 'server_error'}})
+
+        content = getattr(self, f"_{kind}", self._unknown)(user_message)
+        prompt_tokens = sum(estimate_tokens(m['content']) for m in messages)
+        completion_tokens = estimate_tokens(content)
+        with self.lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        response = {
+            'id': f"chatcmpl-fake{_stable_int(user_message)}",
+            'created': int(time.time()),
+            'model': body.get('model', 'fake'),
+        }
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                 'total_tokens': prompt_tokens + completion_tokens}
+        if body.get('stream'):
+            include_usage = (body.get('stream_options') or {}).get('include_usage')
+            return self._stream_response(response, content, usage if include_usage else None)
+        return httpx.Response(200, json={
+            **response,
+            'object': 'chat.completion',
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': usage,
+        })
+
+    @staticmethod
+    def _stream_response(response: dict, content: str, usage: dict = None, chunk_size: int = 8) -> httpx.Response:
+        """stream=True 요청의 응답 (content를 chunk_size 글자씩 나눈 SSE 이벤트)"""
+        chunk = {**response, 'object': 'chat.completion.chunk'}
+        events = [
+            {**chunk, 'choices': [{'index': 0, 'delta': {'content': content[i:i + chunk_size]}, 'finish_reason': None}]}
+            for i in range(0, len(content), chunk_size)
+        ]
+        events.append({**chunk, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})
+        if usage is not None:
+            events.append({**chunk, 'choices': [], 'usage': usage})
+        body = ''.join(f"data: {json.dumps(event, ensure_ascii=False)}\n\n" for event in events) + "data: [DONE]\n\n"
+        return httpx.Response(200, headers={'content-type': 'text/event-stream'}, content=body.encode('utf-8'))
+
+    @staticmethod
+    def _keyword_extraction(user_message: str) -> str:
+        topic = user_message.strip()[:20]
+        return json.dumps({'search_queries': [f"{topic} 강의", f"{topic} 입문", f"{topic} 추천"]}, ensure_ascii=False)
+
+    @staticmethod
+    def _comment_summarization(user_message: str) -> str:
+        return "시청자들은 대체로 영상의 설명이 이해하기 쉽다고 평가합니다."
+
+    @staticmethod
+    def _channel_analyzer(user_message: str) -> str:
+        first_line = user_message.strip().split('\n', 1)[0]
+        return f"'{first_line}' 채널은 관련 주제의 영상을 꾸준히 올리는 채널입니다."
+
+    @staticmethod
+    def _rating(user_query: str, summary: str) -> dict:
+        return {'score': _stable_int(user_query + summary) % 101, 'reason': "가짜 서버가 계산한 점수입니다."}
+
+    def _relevance_rater(self, user_message: str) -> str:
+        query, _, summary = user_message.partition('\n\nB: ')
+        return json.dumps(self._rating(query, summary), ensure_ascii=False)
+
+    def _relevance_batch_rater(self, user_message: str) -> str:
+        query, _, channels = user_message.partition('\n\nB: ')
+        ratings = [
+            {'channel_id': channel['channel_id'], **self._rating(query, channel['summary'])}
+            for channel in json.loads(channels or '[]')
+        ]
+        return json.dumps({'ratings': ratings}, ensure_ascii=False)
+
+    @staticmethod
+    def _unknown(user_message: str) -> str:
+        return ""
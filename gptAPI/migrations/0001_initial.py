@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(help_text='분석 입력 텍스트의 해시', max_length=64, unique=True)),
+                ('channel_id', models.CharField(blank=True, db_index=True, help_text='YouTube 채널 ID', max_length=64)),
+                ('video_set_hash', models.CharField(blank=True, help_text='최신 영상 ID 목록의 해시', max_length=64)),
+                ('summary', models.TextField(help_text='채널 종합 분석 결과')),
+                ('analyzed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='분석 시간')),
+            ],
+            options={
+                'verbose_name': '채널 분석 캐시',
+                'verbose_name_plural': '채널 분석 캐시',
+                'ordering': ['-analyzed_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gptAPI', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KeywordExtraction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query_key', models.CharField(help_text='정규화한 검색어', max_length=500, unique=True)),
+                ('query', models.CharField(help_text='결과를 만들 때 사용한 원본 검색어', max_length=500)),
+                ('search_queries', models.JSONField(default=list, help_text='추출한 검색어 목록')),
+                ('extracted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='추출 시간')),
+            ],
+            options={
+                'verbose_name': '키워드 추출 캐시',
+                'verbose_name_plural': '키워드 추출 캐시',
+                'ordering': ['-extracted_at'],
+            },
+        ),
+    ]
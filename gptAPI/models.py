@@ -1,3 +1,44 @@
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
+
+
+class ChannelSummary(models.Model):
+    """
+    채널 분석(analyze_channel_texts) 결과를 저장하는 캐시 모델
+    - content_hash   : 분석에 사용된 입력 텍스트의 SHA-256 해시
+    - video_set_hash : 분석 당시 채널 최신 영상 ID 목록의 해시 (영상 구성이 바뀌면 무효화)
+    """
+    content_hash = models.CharField(max_length=64, unique=True, help_text="분석 입력 텍스트의 해시")
+    channel_id = models.CharField(max_length=64, blank=True, db_index=True, help_text="YouTube 채널 ID")
+    video_set_hash = models.CharField(max_length=64, blank=True, help_text="최신 영상 ID 목록의 해시")
+    summary = models.TextField(help_text="채널 종합 분석 결과")
+    analyzed_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="분석 시간")
+
+    class Meta:
+        ordering = ['-analyzed_at']
+        verbose_name = "채널 분석 캐시"
+        verbose_name_plural = "채널 분석 캐시"
+
+    def __str__(self):
+        return f"[{self.analyzed_at.strftime('%Y-%m-%d %H:%M')}] {self.channel_id or self.content_hash[:12]}"
+
+
+class KeywordExtraction(models.Model):
+    """
+    키워드 추출(extract_keywords) 결과를 저장하는 캐시 모델
+    - query_key : 조사/문장부호/요청 표현을 제거하여 정규화한 검색어 (normalize_keyword_query)
+    """
+    query_key = models.CharField(max_length=500, unique=True, help_text="정규화한 검색어")
+    query = models.CharField(max_length=500, help_text="결과를 만들 때 사용한 원본 검색어")
+    search_queries = models.JSONField(default=list, help_text="추출한 검색어 목록")
+    extracted_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="추출 시간")
+
+    class Meta:
+        ordering = ['-extracted_at']
+        verbose_name = "키워드 추출 캐시"
+        verbose_name_plural = "키워드 추출 캐시"
+
+    def __str__(self):
+        return f"[{self.extracted_at.strftime('%Y-%m-%d %H:%M')}] {self.query_key}"
@@ -1,9 +1,21 @@
 # gptAPI/services.py
-import openai
 import json
 import os
+import re
 from django.conf import settings
 
+from .cache import (
+    get_cached_summary, store_summary, get_cached_rating, store_rating, get_cached_keywords, store_keywords,
+    normalize_keyword_query, content_hash, video_set_hash,
+)
+from .client import chat_completion, estimate_tokens
+from core.singleflight import SingleFlight
+from core.tracing import span, record_openai_usage
+
+# 같은 검색어의 키워드 추출 / 같은 채널(영상 구성)의 분석이 동시에 요청되면 한 번만 호출
+keyword_flight = SingleFlight('keyword_extraction')
+channel_analysis_flight = SingleFlight('channel_analysis')
+
 def load_prompt_config(filename: str):
     """prompts 폴더에서 지정된 JSON 파일의 프롬프트 설정을 로드"""
     config_path = os.path.join(settings.BASE_DIR, 'gptAPI', 'prompts', filename)
@@ -14,8 +26,60 @@ def load_prompt_config(filename: str):
         print(f"Error loading prompt config: {e}")
         return None
 
-def extract_keywords(user_prompt: str) -> list[str]:
-    """사용자 프롬프트에서 검색에 사용할 검색어 목록을 추출"""
+# 키워드 추출 응답(JSON)에서 search_queries 배열의 시작과, 뒤에 , 또는 ]가 붙어 완성된 문자열 항목
+_SEARCH_QUERIES_START = re.compile(r'"search_queries"\s*:\s*\[')
+_COMPLETE_JSON_STRING = re.compile(r'\s*("(?:[^"\\]|\\.)*")\s*([,\]])')
+
+def parse_partial_search_queries(text: str) -> list[str]:
+    """
+    스트리밍으로 받는 중인 키워드 추출 응답(JSON 앞부분)에서 이미 완성된 search_queries 항목들을 반환
+    (예: '{"search_queries": ["파이썬 강의", "파이' -> ["파이썬 강의"])
+    """
+    match = _SEARCH_QUERIES_START.search(text)
+    if not match:
+        return []
+    queries, position = [], match.end()
+    while True:
+        item = _COMPLETE_JSON_STRING.match(text, position)
+        if not item:
+            break
+        queries.append(json.loads(item.group(1)))
+        if item.group(2) == ']':
+            break
+        position = item.end()
+    return queries
+
+def keyword_emitter(on_keyword):
+    """
+    스트리밍 응답 조각을 받을 때마다 새로 완성된 검색어를 on_keyword로 넘기는 함수와,
+    지금까지 받은 전체 텍스트를 반환하는 함수를 만듦 (services/async_services 공용)
+    """
+    parts, emitted = [], []
+
+    def feed(piece: str):
+        parts.append(piece or '')
+        for query in parse_partial_search_queries(''.join(parts))[len(emitted):]:
+            emitted.append(query)
+            on_keyword(query)
+
+    return feed, lambda: ''.join(parts)
+
+def extract_keywords(user_prompt: str, on_keyword=None) -> list[str]:
+    """
+    사용자 프롬프트에서 검색에 사용할 검색어 목록을 추출
+    (정규화한 검색어의 추출 결과가 캐시에 있으면 바로 반환하고,
+     같은 검색어의 요청이 동시에 들어오면 한 번만 호출하고 결과를 함께 사용)
+    on_keyword를 넘기면 응답을 스트리밍으로 받으며 검색어가 하나씩 완성될 때마다 on_keyword(검색어)를 호출하므로,
+    호출한 쪽은 추출이 모두 끝나기 전에 검색을 시작할 수 있음 (캐시 적중/함께 사용한 결과일 때는 호출하지 않음)
+    """
+    cached_keywords = get_cached_keywords(user_prompt)
+    if cached_keywords is not None:
+        return list(cached_keywords)
+    search_queries, _ = keyword_flight.do(normalize_keyword_query(user_prompt),
+                                          lambda: _extract_keywords(user_prompt, on_keyword))
+    return list(search_queries)
+
+def _extract_keywords(user_prompt: str, on_keyword=None) -> list[str]:
     api_key = getattr(settings, 'OPENAI_API_KEY', None)
     if not api_key:
         return []
@@ -24,26 +88,42 @@ def extract_keywords(user_prompt: str) -> list[str]:
     if not prompt_config:
         return []
 
-    openai.api_key = api_key
-
     try:
-        response = openai.chat.completions.create(
-            model=prompt_config['model'],
-            messages=[
-                {"role": "system", "content": prompt_config['system_message']},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format=prompt_config.get('response_format'),
-            max_tokens=prompt_config['max_tokens'],
-            temperature=prompt_config['temperature'],
-        )
-        
-        response_data = json.loads(response.choices[0].message.content)
-        return response_data.get('search_queries', [])
+        with span('openai.request', prompt='keyword_extraction') as request_span:
+            request = dict(
+                model=prompt_config['model'],
+                messages=[
+                    {"role": "system", "content": prompt_config['system_message']},
+                    {"role": "user", "content": user_prompt}
+                ],
+                response_format=prompt_config.get('response_format'),
+                max_tokens=prompt_config['max_tokens'],
+                temperature=prompt_config['temperature'],
+            )
+            if on_keyword is None:
+                response = chat_completion(api_key, request_span, **request)
+                record_openai_usage(request_span, 'keyword_extraction', response)
+                content = response.choices[0].message.content
+            else:
+                stream = chat_completion(api_key, request_span, stream=True, stream_options={'include_usage': True},
+                                         **request)
+                feed, content_so_far = keyword_emitter(on_keyword)
+                for chunk in stream:
+                    if chunk.choices:
+                        feed(chunk.choices[0].delta.content)
+                    if chunk.usage:
+                        record_openai_usage(request_span, 'keyword_extraction', chunk)
+                content = content_so_far()
+
+        response_data = json.loads(content)
+        search_queries = response_data.get('search_queries', [])
+        store_keywords(user_prompt, search_queries)
+        return search_queries
 
     except Exception as e:
         print(f"An error occurred during OpenAI API call: {e}")
         return []
+
 def summarize_comments(comments: list[str]) -> str:
     """댓글 리스트를 GPT를 이용해 요약"""
     api_key = getattr(settings, 'OPENAI_API_KEY', None)
@@ -55,30 +135,50 @@ def summarize_comments(comments: list[str]) -> str:
     if not prompt_config:
         return ""
 
-    openai.api_key = api_key
-
     # 요약할 댓글들을 하나의 문자열로 합침
     comment_text = "\n".join(comments)
     user_content = f"Please summarize the following comments:\n\n{comment_text}"
 
     try:
-        response = openai.chat.completions.create(
-            model=prompt_config['model'],
-            messages=[
-                {"role": "system", "content": prompt_config['system_message']},
-                {"role": "user", "content": user_content}
-            ],
-            max_tokens=prompt_config['max_tokens'],
-            temperature=prompt_config['temperature'],
-        )
+        with span('openai.request', prompt='comment_summarization') as request_span:
+            response = chat_completion(
+                api_key, request_span,
+                model=prompt_config['model'],
+                messages=[
+                    {"role": "system", "content": prompt_config['system_message']},
+                    {"role": "user", "content": user_content}
+                ],
+                max_tokens=prompt_config['max_tokens'],
+                temperature=prompt_config['temperature'],
+            )
+            record_openai_usage(request_span, 'comment_summarization', response)
         return response.choices[0].message.content.strip()
 
     except Exception as e:
         print(f"An error occurred during OpenAI API call: {e}")
         return ""
 
-def analyze_channel_texts(channel_texts: str) -> str:
-    """채널의 모든 텍스트 데이터를 종합하여 분석 및 요약"""
+def analyze_channel_texts(channel_texts: str, channel_id: str = None, video_ids: list[str] = None) -> str:
+    """
+    채널의 모든 텍스트 데이터를 종합하여 분석 및 요약
+    (같은 입력이거나, 같은 채널의 최신 영상 구성이 그대로면 저장된 분석 결과를 재사용)
+    """
+    cached_summary = get_cached_summary(channel_texts, channel_id, video_ids)
+    if cached_summary:
+        return cached_summary
+
+    # 같은 채널(영상 구성)의 분석이 이미 진행 중이면 그 결과를 기다림
+    summary, _ = channel_analysis_flight.do(channel_analysis_key(channel_texts, channel_id, video_ids),
+                                            lambda: _analyze_channel_texts(channel_texts, channel_id, video_ids))
+    return summary
+
+def channel_analysis_key(channel_texts: str, channel_id: str = None, video_ids: list[str] = None) -> str:
+    """채널 분석 합치기 키 (같은 채널의 같은 영상 구성이면 같은 키, 채널 정보가 없으면 입력 내용 기준)"""
+    if channel_id and video_ids is not None:
+        return f"{channel_id}:{video_set_hash(video_ids)}"
+    return content_hash(channel_texts)
+
+def _analyze_channel_texts(channel_texts: str, channel_id: str = None, video_ids: list[str] = None) -> str:
     api_key = getattr(settings, 'OPENAI_API_KEY', None)
     if not api_key:
         return ""
@@ -87,26 +187,37 @@ def analyze_channel_texts(channel_texts: str) -> str:
     if not prompt_config:
         return ""
 
-    openai.api_key = api_key
-
     try:
-        response = openai.chat.completions.create(
-            model=prompt_config['model'],
-            messages=[
-                {"role": "system", "content": prompt_config['system_message']},
-                {"role": "user", "content": channel_texts}
-            ],
-            max_tokens=prompt_config['max_tokens'],
-            temperature=prompt_config['temperature'],
-        )
-        return response.choices[0].message.content.strip()
+        with span('openai.request', prompt='channel_analyzer') as request_span:
+            response = chat_completion(
+                api_key, request_span,
+                model=prompt_config['model'],
+                messages=[
+                    {"role": "system", "content": prompt_config['system_message']},
+                    {"role": "user", "content": channel_texts}
+                ],
+                max_tokens=prompt_config['max_tokens'],
+                temperature=prompt_config['temperature'],
+            )
+            record_openai_usage(request_span, 'channel_analyzer', response)
+        summary = response.choices[0].message.content.strip()
+        if summary:
+            store_summary(channel_texts, summary, channel_id, video_ids)
+        return summary
 
     except Exception as e:
         print(f"An error occurred during OpenAI API call: {e}")
         return ""
 
 def rate_channel_relevance(user_query: str, channel_summary: str) -> dict:
-    """사용자 쿼리와 채널 요약본을 비교하여 관련도 점수 및 이유 반환"""
+    """
+    사용자 쿼리와 채널 요약본을 비교하여 관련도 점수 및 이유 반환
+    (같은 쿼리/요약에 대한 평가는 짧은 기간 동안 캐시에서 재사용)
+    """
+    cached_rating = get_cached_rating(user_query, channel_summary)
+    if cached_rating is not None:
+        return cached_rating
+
     api_key = getattr(settings, 'OPENAI_API_KEY', None)
     if not api_key:
         return {}
@@ -115,24 +226,123 @@ def rate_channel_relevance(user_query: str, channel_summary: str) -> dict:
     if not prompt_config:
         return {}
 
-    openai.api_key = api_key
-
     user_content = f"A: {user_query}\n\nB: {channel_summary}"
 
     try:
-        response = openai.chat.completions.create(
-            model=prompt_config['model'],
-            messages=[
-                {"role": "system", "content": prompt_config['system_message']},
-                {"role": "user", "content": user_content}
-            ],
-            response_format=prompt_config.get('response_format'), # JSON 모드 활성화
-            max_tokens=prompt_config['max_tokens'],
-            temperature=prompt_config['temperature'],
-        )
+        with span('openai.request', prompt='relevance_rater') as request_span:
+            response = chat_completion(
+                api_key, request_span,
+                model=prompt_config['model'],
+                messages=[
+                    {"role": "system", "content": prompt_config['system_message']},
+                    {"role": "user", "content": user_content}
+                ],
+                response_format=prompt_config.get('response_format'), # JSON 모드 활성화
+                max_tokens=prompt_config['max_tokens'],
+                temperature=prompt_config['temperature'],
+            )
+            record_openai_usage(request_span, 'relevance_rater', response)
         result = json.loads(response.choices[0].message.content)
+        if result:
+            store_rating(user_query, channel_summary, result)
         return result
 
     except Exception as e:
         print(f"An error occurred during OpenAI API call: {e}")
         return {}
+
+def chunk_channel_summaries(channel_summaries: dict, token_budget: int, max_channels: int) -> list[dict]:
+    """{channel_id: 요약} 을 요청 하나의 입력 토큰 예산/채널 수 제한에 맞게 여러 묶음으로 나눔"""
+    chunks, current, current_tokens = [], {}, 0
+    for channel_id, summary in channel_summaries.items():
+        tokens = estimate_tokens(channel_id) + estimate_tokens(summary)
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_channels):
+            chunks.append(current)
+            current, current_tokens = {}, 0
+        current[channel_id] = summary
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+def build_batch_rating_content(user_query: str, channel_summaries: dict) -> str:
+    """배치 평가 요청의 사용자 메시지 (쿼리는 한 번만, 채널 요약은 JSON 배열로)"""
+    channels = [{"channel_id": channel_id, "summary": summary} for channel_id, summary in channel_summaries.items()]
+    return f"A: {user_query}\n\nB: {json.dumps(channels, ensure_ascii=False)}"
+
+def parse_batch_ratings(content: str, channel_ids) -> dict:
+    """
+    배치 평가 응답을 {channel_id: {"score", "reason"}} 로 변환
+    (요청하지 않은 채널 ID나 형식이 잘못된 항목은 버림. JSON 자체가 깨졌으면 ValueError)
+    """
+    data = json.loads(content)
+    ratings = data.get('ratings', []) if isinstance(data, dict) else data
+    if not isinstance(ratings, list):
+        raise ValueError("ratings must be a JSON array")
+
+    results = {}
+    for rating in ratings:
+        if not isinstance(rating, dict) or rating.get('channel_id') not in channel_ids:
+            continue
+        try:
+            score = max(0, min(100, int(rating.get('score'))))
+        except (TypeError, ValueError):
+            continue
+        results[rating['channel_id']] = {'score': score, 'reason': str(rating.get('reason', ''))}
+    return results
+
+def rate_channels_relevance(user_query: str, channel_summaries: dict) -> dict:
+    """
+    여러 채널의 요약본을 한 번의 요청으로 평가하여 {channel_id: {"score", "reason"}} 반환
+    - 쿼리는 한 번만 보내고, 요약은 입력 토큰 예산에 맞춰 여러 요청으로 나눔
+    - 캐시에 있는 평가는 재사용하고, 새로 받은 평가는 rate_channel_relevance와 같은 캐시에 저장
+    - 응답을 해석하지 못했거나 빠진 채널은 rate_channel_relevance로 하나씩 다시 평가
+    """
+    results = {}
+    pending = {}
+    for channel_id, summary in channel_summaries.items():
+        cached_rating = get_cached_rating(user_query, summary)
+        if cached_rating is not None:
+            results[channel_id] = cached_rating
+        else:
+            pending[channel_id] = summary
+    if not pending:
+        return results
+
+    api_key = getattr(settings, 'OPENAI_API_KEY', None)
+    if not api_key:
+        return results
+
+    prompt_config = load_prompt_config('relevance_batch_rater.json')
+    if not prompt_config:
+        return results
+
+    token_budget = getattr(settings, 'RELEVANCE_BATCH_TOKEN_BUDGET', prompt_config['input_token_budget'])
+    for chunk in chunk_channel_summaries(pending, token_budget, prompt_config['max_channels_per_request']):
+        try:
+            with span('openai.request', prompt='relevance_batch_rater') as request_span:
+                response = chat_completion(
+                    api_key, request_span,
+                    model=prompt_config['model'],
+                    messages=[
+                        {"role": "system", "content": prompt_config['system_message']},
+                        {"role": "user", "content": build_batch_rating_content(user_query, chunk)}
+                    ],
+                    response_format=prompt_config.get('response_format'), # JSON 모드 활성화
+                    max_tokens=prompt_config['max_tokens_per_channel'] * len(chunk),
+                    temperature=prompt_config['temperature'],
+                )
+                record_openai_usage(request_span, 'relevance_batch_rater', response)
+            ratings = parse_batch_ratings(response.choices[0].message.content, chunk)
+        except Exception as e:
+            print(f"An error occurred during batch relevance rating: {e}")
+            ratings = {}
+
+        for channel_id, summary in chunk.items():
+            if channel_id in ratings:
+                store_rating(user_query, summary, ratings[channel_id])
+                results[channel_id] = ratings[channel_id]
+            else:
+                # 배치 응답에서 빠졌거나 해석하지 못한 채널은 개별 호출로 대체
+                results[channel_id] = rate_channel_relevance(user_query, summary)
+    return results
@@ -1,7 +1,34 @@
-from unittest.mock import patch
-from django.test import TestCase, Client
+import asyncio
+import threading
+from unittest.mock import patch, MagicMock
+
+from asgiref.sync import async_to_sync
+
+import httpx
+import openai
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, Client, override_settings
 from django.contrib.auth.models import User
 
+from .cache import normalize_keyword_query, keyword_memory_cache
+from .client import openai_client, chat_completion, TokenRateLimiter
+from .fakes import FakeOpenAIServer
+from .models import ChannelSummary, KeywordExtraction
+from .async_services import aextract_keywords, aanalyze_channel_texts
+from .services import (
+    extract_keywords, analyze_channel_texts, rate_channel_relevance, rate_channels_relevance,
+    parse_partial_search_queries,
+)
+from .text_assembly import assemble_channel_text, clean_lines
+
+
+def _completion(content: str):
+    """chat.completions.create의 응답 형태를 흉내 낸 객체"""
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+
 class RecommendationViewTests(TestCase):
     def setUp(self):
         self.client = Client()
@@ -29,8 +56,12 @@ class RecommendationViewTests(TestCase):
                 }
             }
         ]
-        mock_collector_instance.get_channel_details.return_value = {
-            'statistics': {'videoCount': '10', 'subscriberCount': '1000', 'viewCount': '100000'}
+        mock_collector_instance.get_channels_details.return_value = {
+            'test_channel_1': {
+                'id': 'test_channel_1',
+                'statistics': {'videoCount': '10', 'subscriberCount': '1000', 'viewCount': '100000'},
+                'contentDetails': {'relatedPlaylists': {'uploads': 'UUtest_channel_1'}}
+            }
         }
         mock_collector_instance.get_latest_videos.return_value = [
             {
@@ -47,9 +78,11 @@ class RecommendationViewTests(TestCase):
         ]
 
         # AI 분석/평가 함수 모킹 (단순 점수 반환)
-        with patch('frontend.views.analyze_channel_texts') as mock_analyze, patch('frontend.views.rate_channel_relevance') as mock_rate:
+        with patch('frontend.views.analyze_channel_texts') as mock_analyze, patch('frontend.views.rate_channels_relevance') as mock_rate:
             mock_analyze.return_value = "A great channel for beginners."
-            mock_rate.return_value = {'score': 85, 'reason': 'Matches user query well.'}
+            mock_rate.side_effect = lambda query, summaries: {
+                channel_id: {'score': 85, 'reason': 'Matches user query well.'} for channel_id in summaries
+            }
 
             # 2. 테스트 요청
             response = self.client.post('/run-recommendation/', {'query': '파이썬 알려줘'})
@@ -67,4 +100,299 @@ class RecommendationViewTests(TestCase):
         response = self.client.post('/run-recommendation/', {'query': ''})
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'frontend/partials/_error.html')
-        self.assertContains(response, "검색어를 입력해주세요.")
\ No newline at end of file
+        self.assertContains(response, "검색어를 입력해주세요.")
+
+
+@override_settings(OPENAI_API_KEY='test-key')
+class LLMResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        keyword_memory_cache.clear()
+
+    @patch('gptAPI.services.chat_completion')
+    def test_channel_summary_is_reused_until_video_set_changes(self, mock_create):
+        """같은 채널의 최신 영상 구성이 같으면 LLM을 다시 호출하지 않는지 테스트"""
+        mock_create.return_value = _completion("요약 1")
+        self.assertEqual(analyze_channel_texts("채널 텍스트", channel_id='UC1', video_ids=['v1', 'v2']), "요약 1")
+        # 텍스트가 조금 달라도 영상 구성이 같으면 재사용
+        self.assertEqual(analyze_channel_texts("채널 텍스트 (수정)", channel_id='UC1', video_ids=['v2', 'v1']), "요약 1")
+        self.assertEqual(mock_create.call_count, 1)
+
+        # 새 영상이 올라오면 다시 분석하고, 이전 분석 결과는 무효화
+        mock_create.return_value = _completion("요약 2")
+        self.assertEqual(analyze_channel_texts("새 텍스트", channel_id='UC1', video_ids=['v3', 'v1']), "요약 2")
+        self.assertEqual(mock_create.call_count, 2)
+        self.assertEqual(list(ChannelSummary.objects.values_list('summary', flat=True)), ["요약 2"])
+
+    @patch('gptAPI.services.chat_completion')
+    def test_relevance_rating_is_cached_per_normalized_query(self, mock_create):
+        """정규화된 쿼리와 요약이 같으면 관련도 평가를 재사용하는지 테스트"""
+        mock_create.return_value = _completion('{"score": 80, "reason": "잘 맞습니다."}')
+        first = rate_channel_relevance("파이썬  강의", "요약")
+        second = rate_channel_relevance(" 파이썬 강의 ", "요약")
+        self.assertEqual(first, second)
+        self.assertEqual(mock_create.call_count, 1)
+
+    @patch('gptAPI.services.chat_completion')
+    def test_batch_rating_uses_one_call_for_all_channels(self, mock_create):
+        """여러 채널을 한 번의 요청으로 평가하고, 결과를 채널별 캐시에 저장하는지 테스트"""
+        mock_create.return_value = _completion(
+            '{"ratings": [{"channel_id": "UC1", "score": 90, "reason": "적합"},'
+            ' {"channel_id": "UC2", "score": 130, "reason": "매우 적합"}]}')
+        ratings = rate_channels_relevance("파이썬 강의", {'UC1': "요약 1", 'UC2': "요약 2"})
+        self.assertEqual(ratings, {'UC1': {'score': 90, 'reason': '적합'}, 'UC2': {'score': 100, 'reason': '매우 적합'}})
+        self.assertEqual(mock_create.call_count, 1)
+        # 개별 평가와 같은 캐시를 사용
+        self.assertEqual(rate_channel_relevance("파이썬 강의", "요약 1"), {'score': 90, 'reason': '적합'})
+        self.assertEqual(mock_create.call_count, 1)
+
+    @patch('gptAPI.services.chat_completion')
+    def test_batch_rating_falls_back_to_single_calls(self, mock_create):
+        """응답에서 빠진 채널은 개별 평가로 다시 요청하는지 테스트"""
+        mock_create.side_effect = [
+            _completion('{"ratings": [{"channel_id": "UC1", "score": 70, "reason": "보통"}]}'),
+            _completion('{"score": 40, "reason": "관련 적음"}'),
+        ]
+        ratings = rate_channels_relevance("파이썬 강의", {'UC1': "요약 1", 'UC2': "요약 2"})
+        self.assertEqual(ratings['UC2'], {'score': 40, 'reason': '관련 적음'})
+        self.assertEqual(mock_create.call_count, 2)
+
+    def test_keyword_query_normalization(self):
+        """공백/문장부호/조사/요청 표현만 다른 검색어는 같은 키로, 명사 끝 글자는 그대로 정규화되는지 테스트"""
+        self.assertEqual(normalize_keyword_query("파이썬을  알려줘!"), "파이썬")
+        self.assertEqual(normalize_keyword_query("Python 강의를 추천해주세요?"), "python 강의")
+        self.assertEqual(normalize_keyword_query("고양이 요가"), "고양이 요가")
+        self.assertEqual(normalize_keyword_query("알려줘"), "알려줘")
+
+    @patch('gptAPI.services.chat_completion')
+    def test_extracted_keywords_are_cached_in_memory_and_db(self, mock_create):
+        """정규화한 검색어가 같으면 키워드를 다시 추출하지 않고, /api/call/도 같은 캐시를 쓰는지 테스트"""
+        mock_create.return_value = _completion('{"search_queries": ["파이썬 강의", "파이썬 입문"]}')
+        self.assertEqual(extract_keywords("파이썬 강의를 알려줘"), ["파이썬 강의", "파이썬 입문"])
+        self.assertEqual(extract_keywords(" 파이썬 강의 알려주세요. "), ["파이썬 강의", "파이썬 입문"])
+        self.assertEqual(mock_create.call_count, 1)
+        self.assertEqual(KeywordExtraction.objects.get().query_key, "파이썬 강의")
+
+        # 프로세스 내부 캐시가 비어도(다른 워커) DB에서 재사용
+        keyword_memory_cache.clear()
+        response = self.client.post('/api/call/', {'prompt': "파이썬 강의"}, content_type='application/json')
+        self.assertEqual(response.json(), {'keywords': ["파이썬 강의", "파이썬 입문"]})
+        self.assertEqual(mock_create.call_count, 1)
+
+        # 추출에 실패한 빈 결과는 저장하지 않음
+        mock_create.return_value = _completion('{"search_queries": []}')
+        self.assertEqual(extract_keywords("자바 강의"), [])
+        self.assertEqual(KeywordExtraction.objects.count(), 1)
+
+    @override_settings(OPENAI_API_KEY='test-key')
+    @patch('gptAPI.async_services.achat_completion')
+    def test_async_duplicates_share_one_call(self, mock_create):
+        """[async] 동시에 들어온 같은 키워드 추출/채널 분석은 동기 버전과 같은 키로 한 번만 호출하는지 테스트"""
+        async def create(api_key, request_span, **request):
+            await asyncio.sleep(0.05)
+            if request['messages'][1]['content'].startswith('파이썬'):
+                return _completion('{"search_queries": ["파이썬 강의"]}')
+            return _completion("요약")
+        mock_create.side_effect = create
+
+        async def main():
+            return await asyncio.gather(
+                aextract_keywords("파이썬 강의를 알려줘"), aextract_keywords(" 파이썬 강의 알려주세요. "),
+                aanalyze_channel_texts("채널 텍스트", channel_id='UC1', video_ids=['v1', 'v2']),
+                aanalyze_channel_texts("채널 텍스트 (수정)", channel_id='UC1', video_ids=['v2', 'v1']),
+            )
+
+        self.assertEqual(async_to_sync(main)(), [["파이썬 강의"], ["파이썬 강의"], "요약", "요약"])
+        self.assertEqual(mock_create.call_count, 2)
+
+    @override_settings(RELEVANCE_BATCH_TOKEN_BUDGET=10)
+    @patch('gptAPI.services.chat_completion')
+    def test_batch_rating_splits_by_token_budget(self, mock_create):
+        """요약이 토큰 예산을 넘으면 요청을 나누어 보내는지 테스트"""
+        mock_create.side_effect = [
+            _completion('{"ratings": [{"channel_id": "UC1", "score": 10, "reason": ""}]}'),
+            _completion('{"ratings": [{"channel_id": "UC2", "score": 20, "reason": ""}]}'),
+        ]
+        ratings = rate_channels_relevance("쿼리", {'UC1': "가" * 8, 'UC2': "나" * 8})
+        self.assertEqual({channel_id: rating['score'] for channel_id, rating in ratings.items()}, {'UC1': 10, 'UC2': 20})
+        self.assertEqual(mock_create.call_count, 2)
+
+
+@override_settings(OPENAI_API_KEY='test-key')
+class FakeOpenAIServerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        keyword_memory_cache.clear()
+        self.server = FakeOpenAIServer()
+        self.server.install()
+        self.addCleanup(self.server.uninstall)
+
+    def test_services_run_against_fake_server(self):
+        """가짜 서버로 SDK 호출/응답 파싱이 실제와 같이 동작하고 호출 종류별로 집계되는지 테스트"""
+        self.assertEqual(len(extract_keywords("파이썬 강의")), 3)
+        ratings = rate_channels_relevance("파이썬 강의", {'UC1': "요약 1", 'UC2': "요약 2"})
+        self.assertEqual(set(ratings), {'UC1', 'UC2'})
+        self.assertEqual(self.server.stats()['calls'], {'keyword_extraction': 1, 'relevance_batch_rater': 1})
+
+    def test_streamed_keywords_are_emitted_as_they_complete(self):
+        """스트리밍 응답에서 검색어가 완성될 때마다 on_keyword가 호출되고, 결과는 일반 호출과 같은지 테스트"""
+        emitted = []
+        search_queries = extract_keywords("파이썬 강의", on_keyword=emitted.append)
+        self.assertEqual(emitted, search_queries)
+        self.assertEqual(len(search_queries), 3)
+        self.assertGreater(self.server.stats()['prompt_tokens'], 0)
+
+    def test_parse_partial_search_queries(self):
+        """아직 끝나지 않은 JSON에서도 완성된 검색어만 골라내는지 테스트"""
+        self.assertEqual(parse_partial_search_queries('{"search_'), [])
+        self.assertEqual(parse_partial_search_queries('{"search_queries": ["파이썬 강의", "파이'), ["파이썬 강의"])
+        self.assertEqual(parse_partial_search_queries('{"search_queries": ["a \\"b\\"", "c"]}'), ['a "b"', 'c'])
+
+
+@override_settings(OPENAI_RETRY_BASE_DELAY=0, OPENAI_TOKENS_PER_MINUTE=0)
+class OpenAIClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = FakeOpenAIServer()
+        self.responses = []
+        self.addCleanup(openai_client.configure)
+
+    def _install(self, *statuses):
+        """statuses 순서대로 오류를 돌려준 뒤 가짜 서버의 정상 응답을 돌려주도록 설정"""
+        self.responses = list(statuses)
+
+        def handle(request):
+            if self.responses:
+                status, headers = self.responses.pop(0)
+                return httpx.Response(status, headers=headers, json={'error': {'message': 'error', 'type': 'error'}})
+            return self.server.handle(request)
+        openai_client.configure(transport=httpx.MockTransport(handle))
+
+    def _request(self):
+        return {'model': 'gpt-test', 'messages': [{'role': 'user', 'content': '안녕하세요'}], 'max_tokens': 10}
+
+    @patch('gptAPI.client.time.sleep')
+    def test_retries_rate_limit_using_retry_after(self, mock_sleep):
+        """429/5xx는 재시도하고, Retry-After가 있으면 그 시간만큼 기다리는지 테스트"""
+        self._install((429, {'retry-after': '2'}), (503, {}))
+        response = chat_completion('test-key', **self._request())
+        self.assertTrue(response.choices[0].message.content is not None)
+        self.assertEqual(mock_sleep.call_args_list[0].args, (2.0,))
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertEqual(self.responses, [])
+
+    @override_settings(OPENAI_MAX_RETRIES=2)
+    @patch('gptAPI.client.time.sleep')
+    def test_gives_up_after_max_retries_and_on_client_errors(self, mock_sleep):
+        """재시도 횟수를 다 쓰면 오류를 그대로 올리고, 4xx 오류는 재시도하지 않는지 테스트"""
+        self._install((500, {}), (500, {}), (500, {}))
+        with self.assertRaises(openai.InternalServerError):
+            chat_completion('test-key', **self._request())
+        self.assertEqual(mock_sleep.call_count, 2)
+
+        self._install((400, {}))
+        with self.assertRaises(openai.BadRequestError):
+            chat_completion('test-key', **self._request())
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    @override_settings(OPENAI_MAX_RETRIES=3)
+    @patch('gptAPI.client.time.sleep')
+    def test_retries_reserve_tokens_once_and_refund_on_failure(self, mock_sleep):
+        """재시도해도 토큰은 한 번만 예약하고, 최종 실패하면 예약분을 돌려주는지 테스트"""
+        now = [0.0]
+        limiter = TokenRateLimiter(1000, clock=lambda: now[0])
+        self._install((500, {}), (500, {}), (500, {}))
+        with patch.object(openai_client, '_limits', return_value=(limiter, threading.BoundedSemaphore(1))):
+            chat_completion('test-key', **self._request())
+            self.assertEqual(mock_sleep.call_count, 3)  # 재시도 대기만, 토큰 한도 대기는 없음
+            self.assertGreater(limiter.available, 1000 - 100)
+
+            self._install((500, {}), (500, {}), (500, {}), (500, {}))
+            with self.assertRaises(openai.InternalServerError):
+                chat_completion('test-key', **self._request())
+        self.assertEqual(mock_sleep.call_count, 6)
+        self.assertGreater(limiter.available, 1000 - 100)
+
+    @patch('gptAPI.client.time.sleep')
+    def test_stream_holds_concurrency_slot_and_retries_read_errors(self, mock_sleep):
+        """스트리밍 응답은 다 읽을 때까지 동시 요청 자리를 차지하고, 읽는 중 끊긴 연결도 재시도하는지 테스트"""
+        class BrokenStream(httpx.SyncByteStream):
+            def __iter__(self):
+                raise httpx.ReadError('connection reset')
+
+        attempts = []
+
+        def handle(request):
+            attempts.append(1)
+            if len(attempts) == 1:
+                return httpx.Response(200, headers={'content-type': 'text/event-stream'}, stream=BrokenStream())
+            return self.server.handle(request)
+        openai_client.configure(transport=httpx.MockTransport(handle))
+
+        semaphore = threading.BoundedSemaphore(1)
+        with patch.object(openai_client, '_limits', return_value=(TokenRateLimiter(0), semaphore)):
+            stream = chat_completion('test-key', stream=True, stream_options={'include_usage': True}, **self._request())
+            first = next(stream)
+            self.assertFalse(semaphore.acquire(blocking=False))
+            chunks = [first, *stream]
+        self.assertTrue(semaphore.acquire(blocking=False))
+        self.assertIsNotNone(chunks[-1].usage)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    def test_token_rate_limiter_waits_for_refill(self):
+        """분당 토큰 한도를 넘는 예약은 다시 채워질 때까지 기다려야 하는 시간을 반환하는지 테스트"""
+        now = [0.0]
+        limiter = TokenRateLimiter(600, clock=lambda: now[0])
+        self.assertEqual(limiter.reserve(500), 0.0)
+        self.assertAlmostEqual(limiter.reserve(200), 10.0)  # 100토큰 부족, 초당 10토큰씩 채워짐
+        now[0] = 10.0
+        limiter.adjust(300)  # 실제 사용량이 예약보다 적으면 반환
+        self.assertEqual(limiter.reserve(300), 0.0)
+
+
+class TextAssemblyTests(SimpleTestCase):
+    def _videos(self):
+        footer = "인스타그램: https://instagram.com/abc\n비즈니스 문의: abc@example.com\n#파이썬 #코딩"
+        return [
+            {'title': f'파이썬 강의 {i}', 'description': f'{i}강에서는 반복문을 배웁니다.\n{footer}',
+             'tags': ['파이썬', 'Python', 'python']}
+            for i in range(1, 4)
+        ]
+
+    def test_removes_boilerplate_and_deduplicates_across_videos(self):
+        """링크/SNS/문의 안내를 지우고 반복되는 줄과 태그·해시태그를 한 번만 남기는지 테스트"""
+        assembled = assemble_channel_text('코딩 채널', '매주 파이썬 강의를 올립니다. https://example.com', self._videos(),
+                                          token_budget=1000)
+        lines = assembled.text.splitlines()
+        self.assertEqual(lines[:2], ['코딩 채널', '매주 파이썬 강의를 올립니다.'])
+        self.assertNotIn('instagram', assembled.text)
+        self.assertNotIn('example.com', assembled.text)
+        self.assertIn('파이썬, Python, 코딩', lines)
+        self.assertEqual(len(lines), len(set(lines)))
+        self.assertLess(assembled.tokens, assembled.original_tokens)
+        self.assertEqual(assembled.saved_tokens, assembled.original_tokens - assembled.tokens)
+
+    def test_truncates_to_token_budget_keeping_titles_first(self):
+        """토큰 예산을 넘으면 영상 설명부터 (예산을 넘는 줄은 남은 만큼만 남기고) 잘라내는지 테스트"""
+        assembled = assemble_channel_text('코딩 채널', '', self._videos(), token_budget=40)
+        self.assertLessEqual(assembled.tokens, 40)
+        self.assertIn('파이썬 강의 3', assembled.text)
+        self.assertNotIn('배웁니다', assembled.text)
+        self.assertNotIn('2강에서는', assembled.text)
+
+    def test_long_line_is_cut_to_remaining_budget(self):
+        """예산을 넘는 긴 한 줄 설명은 통째로 버리지 않고 남은 예산만큼 잘라 넣는지 테스트"""
+        assembled = assemble_channel_text('Ch', '설명 ' * 2000, [{'title': 't1', 'description': '', 'tags': []}],
+                                          token_budget=300)
+        lines = assembled.text.splitlines()
+        self.assertEqual(lines[0], 'Ch')
+        self.assertTrue(lines[1].startswith('설명 설명'))
+        self.assertLessEqual(assembled.tokens, 300)
+        self.assertGreater(assembled.tokens, 250)
+
+    def test_keeps_lines_where_promo_words_are_the_topic(self):
+        """안내 단어가 채널 주제로 쓰인 줄은 남기고, 링크/계정/머리말과 함께 있는 안내 줄만 제거하는지 테스트"""
+        self.assertEqual(clean_lines('비즈니스 영어 회화를 매주 가르칩니다\nStartup business strategy lessons', {}),
+                         ['비즈니스 영어 회화를 매주 가르칩니다', 'Startup business strategy lessons'])
+        promo = '비즈니스 문의: abc@example.com\nContact: hello\n인스타 @coding_ch\n구독과 좋아요 부탁드려요'
+        self.assertEqual(clean_lines(promo, {}), [])
@@ -0,0 +1,164 @@
+# gptAPI/text_assembly.py
+"""
+채널 분석(analyze_channel_texts)에 보낼 입력 텍스트 조립.
+
+채널 이름/설명과 최신 영상들의 제목·설명·태그를 그대로 이어 붙이면, 영상마다 반복되는
+SNS 링크·협찬 문구·해시태그 때문에 프롬프트 토큰과 응답 지연이 크게 늘어납니다.
+assemble_channel_text는
+  1) 링크를 지우고 SNS/협찬/문의 안내 줄(링크·계정이나 "문의:" 머리말과 함께 있는 줄)을 제거하고
+  2) 여러 영상에 반복되는 줄, 태그, 해시태그를 한 번만 남긴 뒤
+  3) 채널 이름 -> 채널 설명 -> 영상 제목 -> 태그 -> 영상 설명 순서로 토큰 예산 안에서 잘라 (예산을 넘는 줄은 남은 만큼만)
+분석용 텍스트를 만들고, 줄어든 토큰 수를 text_assembly_tokens_total에 집계합니다.
+"""
+import re
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from core.tracing import metrics, TEXT_ASSEMBLY_TOKENS
+from .services import load_prompt_config, estimate_tokens
+
+DEFAULT_TOKEN_BUDGET = 1500
+
+_URL_PATTERN = re.compile(r'(https?://|www\.)\S+', re.IGNORECASE)
+_HASHTAG_PATTERN = re.compile(r'#[^\s#]+')
+_EMAIL_PATTERN = re.compile(r'\S+@\S+\.\w+')
+_HANDLE_PATTERN = re.compile(r'(^|\s)@\w+')
+# 안내 문구에 자주 나오는 단어 (SNS, 협찬/광고, 비즈니스 문의, 구독 요청)
+# 채널 주제일 수도 있으므로("비즈니스 영어 회화"), 링크/이메일/계정이나 "문의:" 같은 머리말과 함께 있을 때만 제거
+_BOILERPLATE_PATTERN = re.compile(
+    r'instagram|facebook|twitter|tiktok|discord|kakao|인스타|페이스북|트위터|틱톡|디스코드|카카오|오픈채팅'
+    r'|sponsor|협찬|광고|제휴|affiliate|파트너스'
+    r'|business|비즈니스|문의|contact|e-?mail|이메일'
+    r'|구독|subscribe',
+    re.IGNORECASE,
+)
+_LABEL_PATTERN = re.compile(r'^[^:：]{0,30}[:：]')
+# 단어만으로도 안내 문구임이 분명한 표현 (항상 제거)
+_PROMO_PHRASE_PATTERN = re.compile(
+    r'유료\s*광고|광고\s*포함|쿠팡\s*파트너스|구독과\s*좋아요|좋아요와\s*구독|좋아요\s*(,|와|및)?\s*구독',
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class AssembledText:
+    """조립된 분석용 텍스트와 토큰 추정치"""
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.original_tokens - self.tokens)
+
+
+def channel_text_token_budget() -> int:
+    """채널 하나의 분석 입력 토큰 예산 (settings 값이 없으면 프롬프트 설정의 input_token_budget)"""
+    budget = getattr(settings, 'CHANNEL_ANALYSIS_TOKEN_BUDGET', None)
+    if budget is None:
+        budget = (load_prompt_config('channel_analyzer.json') or {}).get('input_token_budget', DEFAULT_TOKEN_BUDGET)
+    return budget
+
+
+def _line_key(line: str) -> str:
+    return re.sub(r'\s+', ' ', line).strip().lower()
+
+
+def is_boilerplate(line: str) -> bool:
+    """SNS/협찬/문의/구독 안내 줄인지 (안내 단어가 링크·이메일·계정이나 "문의:" 같은 머리말과 함께 있는 경우)"""
+    if _PROMO_PHRASE_PATTERN.search(line):
+        return True
+    keyword = _BOILERPLATE_PATTERN.search(line)
+    if keyword is None:
+        return False
+    if _URL_PATTERN.search(line) or _EMAIL_PATTERN.search(line) or _HANDLE_PATTERN.search(line):
+        return True
+    label = _LABEL_PATTERN.match(line)
+    return label is not None and keyword.start() < label.end()
+
+
+def clean_lines(text: str, hashtags: dict) -> list:
+    """링크/이메일을 지우고 안내 문구 줄을 제거한 줄 목록 (해시태그는 hashtags에 모으고 본문에서 제거)"""
+    lines = []
+    for line in (text or '').splitlines():
+        if is_boilerplate(line):
+            continue
+        for hashtag in _HASHTAG_PATTERN.findall(line):
+            hashtags.setdefault(hashtag.lower(), hashtag)
+        line = _HASHTAG_PATTERN.sub('', _EMAIL_PATTERN.sub('', _URL_PATTERN.sub('', line)))
+        line = re.sub(r'\s+', ' ', line).strip(' -|:·')
+        if line:
+            lines.append(line)
+    return lines
+
+
+def truncate_to_tokens(line: str, token_budget: int) -> str:
+    """line을 token_budget(추정 토큰) 안에 들어가도록 뒤에서부터 잘라냄 (가능하면 단어 경계에서)"""
+    if estimate_tokens(line) <= token_budget:
+        return line
+    low, high = 0, len(line)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(line[:middle]) <= token_budget:
+            low = middle
+        else:
+            high = middle - 1
+    cut = line[:low]
+    if ' ' in cut and low < len(line) and line[low] != ' ':
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip()
+
+
+def assemble_channel_text(channel_title: str, channel_description: str, videos: list,
+                          token_budget: int = None) -> AssembledText:
+    """
+    videos는 [{'title': ..., 'description': ..., 'tags': [...]}, ...] (최신순)
+    token_budget(추정 토큰)을 넘는 뒷부분은 잘라냅니다. (채널 이름은 항상 포함, 예산을 넘는 줄은 남은 예산만큼 잘라 넣음)
+    """
+    token_budget = token_budget if token_budget is not None else channel_text_token_budget()
+    original_parts = [channel_title or '', channel_description or '']
+    for video in videos:
+        original_parts.extend([video.get('title', ''), video.get('description', ''), *video.get('tags', [])])
+    original_tokens = estimate_tokens("\n".join(original_parts))
+
+    hashtags = {}
+    seen = set()
+
+    def unique(lines):
+        result = []
+        for line in lines:
+            key = _line_key(line)
+            if key and key not in seen:
+                seen.add(key)
+                result.append(line)
+        return result
+
+    title_lines = unique([channel_title or ''])
+    description_lines = unique(clean_lines(channel_description, hashtags))
+    video_titles = unique([video.get('title', '') for video in videos])
+    video_descriptions = unique([line for video in videos for line in clean_lines(video.get('description', ''), hashtags)])
+    tags = {}
+    for video in videos:
+        for tag in video.get('tags', []):
+            tags.setdefault(tag.strip().lower(), tag.strip())
+    for hashtag_key, hashtag in hashtags.items():
+        tags.setdefault(hashtag_key.lstrip('#'), hashtag.lstrip('#'))
+    tag_lines = [', '.join(tag for tag in tags.values() if tag)] if any(tags.values()) else []
+
+    lines, used_tokens = [], 0
+    for line in title_lines + description_lines + video_titles + tag_lines + video_descriptions:
+        line_tokens = estimate_tokens(line)
+        if lines and used_tokens + line_tokens > token_budget:
+            line = truncate_to_tokens(line, token_budget - used_tokens)
+            if line:
+                lines.append(line)
+            break
+        lines.append(line)
+        used_tokens += line_tokens
+
+    assembled = AssembledText(text="\n".join(lines), original_tokens=original_tokens,
+                              tokens=estimate_tokens("\n".join(lines)))
+    metrics.inc(TEXT_ASSEMBLY_TOKENS, {'type': 'original'}, assembled.original_tokens)
+    metrics.inc(TEXT_ASSEMBLY_TOKENS, {'type': 'assembled'}, assembled.tokens)
+    return assembled
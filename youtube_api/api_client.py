@@ -1,15 +1,71 @@
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from typing import List, Callable, Any
+from typing import List, Callable, Any, Iterator, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import copy
+import threading
 import time
 
+from django.conf import settings
+from django.db import connections
+
 # [수정] ApiKeyManager의 전역 인스턴스를 임포트합니다.
 from .api_key_manager import api_key_manager 
+from .service_factory import youtube_service_factory
+from .cache import MemoryCacheBackend, response_cache, request_signature
+from .quota import quota_cost, is_key_error, is_rate_limit_error, rate_limit_delay
+from .search_planner import search_params
+from core.singleflight import SingleFlight
+from core.tracing import span, metrics, YOUTUBE_QUOTA_UNITS
+
+# 같은 (메서드, 파라미터) 호출이 동시에 들어오면 한 번만 요청
+youtube_request_flight = SingleFlight('youtube_request')
+
+# 채널 ID -> 재생목록 조회에 성공하여 확인된 업로드 재생목록 ID (프로세스 내부, 동기/비동기 collector 공용)
+UPLOADS_PLAYLIST_TTL = 30 * 24 * 60 * 60
+uploads_playlist_ids = MemoryCacheBackend(max_entries=10000)
+
+
+def derive_uploads_playlist_id(channel_id: str):
+    """일반 채널의 업로드 재생목록 ID는 채널 ID의 접두어 UC를 UU로 바꾼 값 (규칙이 맞지 않는 ID면 None)"""
+    if channel_id and channel_id.startswith('UC') and len(channel_id) > 2:
+        return 'UU' + channel_id[2:]
+    return None
+
+
+def remember_uploads_playlist_id(channel_id: str, uploads_playlist_id: str):
+    uploads_playlist_ids.set(channel_id, uploads_playlist_id, UPLOADS_PLAYLIST_TTL)
+
+# 여러 요청으로 나눠 보내는 조회(50개 단위 배칭)가 함께 쓰는 작업 스레드 풀
+# (스레드를 재사용해야 스레드별 HTTP 객체의 연결도 재사용됨, 호출 하나의 동시 요청 수는 YOUTUBE_CHUNK_MAX_IN_FLIGHT)
+CHUNK_POOL_WORKERS = 16
+DEFAULT_CHUNK_MAX_IN_FLIGHT = 4
+_chunk_pool = None
+_chunk_pool_lock = threading.Lock()
+
+
+def _get_chunk_pool() -> ThreadPoolExecutor:
+    global _chunk_pool
+    if _chunk_pool is None:
+        with _chunk_pool_lock:
+            if _chunk_pool is None:
+                _chunk_pool = ThreadPoolExecutor(max_workers=CHUNK_POOL_WORKERS, thread_name_prefix='youtube-chunk')
+    return _chunk_pool
+
+
+def _run_chunk(fn, *args):
+    """작업 스레드에서 청크 요청을 실행합니다. (사용량 기록 등으로 연 DB 연결은 닫아줌)"""
+    try:
+        return fn(*args)
+    finally:
+        connections.close_all()
+
 
 class YouTubeDataCollector:
     """
     YouTube Data API v3를 사용한 채널 및 비디오 데이터 수집
-    (ApiKeyManager에서 키를 받아와 순차적으로 로테이션)
+    (ApiKeyManager가 남은 할당량이 가장 많은 키를 골라주고, 소진 시 다음으로 여유 있는 키로 전환)
     """
     
     def __init__(self):
@@ -32,64 +88,185 @@ class YouTubeDataCollector:
              # 이 경우는 get_all_keys() 내부에서 이미 오류를 발생시키지만, 추가 방어 코드
              raise ValueError("API keys must be a non-empty list of strings.")
             
-        self.current_key_index = 0
+        # 2. 남은 할당량이 가장 많은 키로 시작합니다.
+        #    (모든 키가 소진된 것으로 기록되어 있으면 첫 번째 키로 시도)
+        start_key = api_key_manager.pick_key()
+        self.current_key_index = self.api_keys.index(start_key) if start_key in self.api_keys else 0
+        # 여러 스레드가 하나의 collector를 공유하므로 키 전환은 잠금으로 보호합니다.
+        self._key_lock = threading.Lock()
         
-        # [수정] 첫 번째 키로 YouTube 서비스 객체 빌드
+        # [수정] 선택한 키로 YouTube 서비스 객체 빌드
         self.youtube = self._build_service(self.api_keys[self.current_key_index])
         print(f"YouTubeDataCollector: ApiKeyManager로부터 {len(self.api_keys)}개의 키를 로드했습니다. Key #{self.current_key_index + 1}로 시작합니다.")
 
     def _build_service(self, api_key: str):
-        """[기존과 동일] 현재 API 키로 YouTube 서비스 객체를 빌드합니다."""
-        return build('youtube', 'v3', developerKey=api_key)
+        """
+        현재 API 키의 YouTube 서비스 객체를 반환합니다.
+        (프로세스 전역 팩토리에서 키마다 한 번만 빌드된 객체를 재사용)
+        """
+        return youtube_service_factory.get_service(api_key)
 
     def _switch_key(self):
-        """[기존과 동일] 다음 API 키로 순차적으로 전환합니다."""
-        self.current_key_index += 1
-        if self.current_key_index >= len(self.api_keys):
+        """
+        현재 키를 소진 처리하고, 남은 할당량이 가장 많은 키로 전환합니다.
+        (소진 기록은 ApiKeyManager를 통해 다른 요청/프로세스와 공유되어, 같은 키로 다시 403을 받지 않습니다)
+        """
+        failed_key = self.api_keys[self.current_key_index]
+        api_key_manager.mark_exhausted(failed_key)
+        next_key = api_key_manager.pick_key(exclude={failed_key})
+        if next_key is None:
             # 모든 키가 소진됨
             raise RuntimeError("모든 YouTube API 키의 할당량이 소진되었습니다.")
         
+        self.current_key_index = self.api_keys.index(next_key)
         print(f"알림: API 키 할당량 문제 발생. Key #{self.current_key_index + 1}로 전환합니다...")
-        # 새 키로 서비스 객체를 다시 빌드
-        self.youtube = self._build_service(self.api_keys[self.current_key_index])
+        # 새 키의 서비스 객체로 교체
+        self.youtube = self._build_service(next_key)
 
     def _execute_request(self, request_builder: Callable[..., Any]):
         """
-        [기존과 동일] 요청을 실행하고, 403(할당량) 오류 시 키를 전환하며 재시도합니다.
+        요청을 실행하고, 403(할당량) 오류 시 키를 전환하며 재시도합니다.
+        (여러 스레드에서 동시에 호출해도 안전합니다)
+        같은 (메서드, 파라미터) 호출의 응답이 캐시에 있으면 네트워크 호출 없이 반환하고,
+        같은 호출이 이미 진행 중이면 새로 요청하지 않고 그 응답을 함께 사용합니다.
         """
+        with span('youtube.request') as request_span:
+            # 1. 응답 캐시 확인 (API 키는 캐시 키에서 제외되므로 현재 키로 만든 요청으로 확인)
+            with self._key_lock:
+                youtube = self.youtube
+            signature = request_signature(request_builder(youtube))
+            request_span.labels['endpoint'] = signature[0]
+            cached = response_cache.get(*signature)
+            if cached is not None:
+                request_span.labels['cache'] = 'hit'
+                return cached
+
+            # 2. 같은 호출이 다른 스레드에서 진행 중이면 그 응답을 기다림 (할당량을 한 번만 사용)
+            response, shared = youtube_request_flight.do(
+                response_cache.make_key(*signature),
+                lambda: self._execute_with_key_rotation(request_builder, signature, request_span),
+            )
+            request_span.labels['cache'] = 'coalesced' if shared else 'miss'
+            # 응답을 함께 받은 호출자끼리 서로의 수정에 영향받지 않도록 사본을 반환
+            return copy.deepcopy(response) if shared else response
+
+    def _execute_with_key_rotation(self, request_builder: Callable[..., Any], signature, request_span):
+        """_execute_request의 실제 네트워크 호출 (키 순번/할당량/키 전환 횟수를 span에 기록)"""
+        attempt = 0
         while True:
+            with self._key_lock:
+                key_index, youtube = self.current_key_index, self.youtube
             try:
-                # 1. 현재 youtube 서비스 객체로 요청(request)을 생성하고 실행
-                request = request_builder(self.youtube)
-                return request.execute()
+                # 3. 현재 youtube 서비스 객체로 요청(request)을 생성하여 실행하고,
+                #    사용량을 기록한 뒤 성공한 응답만 캐시에 저장
+                request = request_builder(youtube)
+                response = request.execute(http=youtube_service_factory.get_http())
+                units = quota_cost(signature[0])
+                api_key_manager.record_usage(self.api_keys[key_index], units)
+                metrics.inc(YOUTUBE_QUOTA_UNITS, {'endpoint': signature[0]}, units)
+                request_span.set(key_index=key_index + 1, units=units)
+                response_cache.set(*signature, response)
+                return response
             
             except HttpError as e:
-                # 2. 403 오류는 일반적으로 할당량 문제 또는 권한 문제
-                if e.resp.status == 403:
-                    print(f"API Key #{self.current_key_index + 1} (403 Error: {e}).")
+                # 4. 일시적인 빈도 제한은 키를 소진 처리하지 않고 같은 키로 잠시 후 재시도
+                if is_rate_limit_error(e):
+                    delay = rate_limit_delay(attempt)
+                    if delay is None:
+                        print(f"API Error (Rate limit): {e}")
+                        raise e
+                    request_span.set(rate_limited=request_span.attributes.get('rate_limited', 0) + 1)
+                    attempt += 1
+                    time.sleep(delay)
+                    continue
+                # 403 오류 중 할당량/키 권한 문제일 때만 키를 전환
+                #    (commentsDisabled 등 키와 무관한 403은 다른 키로 재시도하지 않음)
+                if e.resp.status == 403 and is_key_error(e):
+                    print(f"API Key #{key_index + 1} (403 Error: {e}).")
+                    request_span.set(key_switches=request_span.attributes.get('key_switches', 0) + 1)
                     try:
-                        # 3. 다음 키로 순차적 전환 시도
-                        self._switch_key()
-                        # 4. 키 전환 성공 시, 루프의 처음으로 돌아가 요청 재시도
+                        # 5. 남은 할당량이 가장 많은 키로 전환 시도
+                        #    (다른 스레드가 이미 전환했다면 바로 재시도만 합니다)
+                        with self._key_lock:
+                            if self.current_key_index == key_index:
+                                self._switch_key()
+                        # 6. 키 전환 성공 시, 루프의 처음으로 돌아가 요청 재시도
                         continue 
                     except RuntimeError as re:
-                        # 5. _switch_key()에서 오류 발생 (모든 키 소진)
+                        # 7. _switch_key()에서 오류 발생 (모든 키 소진)
                         print(re) # "모든... 키가... 소진되었습니다."
                         raise e # 마지막 HttpError를 다시 발생시킴
                 else:
-                    # 6. 403이 아닌 다른 오류 (예: 404, 400)는 재시도하지 않음
-                    print(f"API Error (Non-403): {e}")
+                    # 8. 키와 무관한 오류 (예: 404, 400, commentsDisabled)는 재시도하지 않음
+                    print(f"API Error (Non-quota): {e}")
                     raise e
 
+    def iter_chunks(self, request_builder: Callable[[Any, List[str]], Any], ids: List[str],
+                    chunk_size: int = 50, max_in_flight: Optional[int] = None) -> Iterator[dict]:
+        """
+        ids를 chunk_size개씩 나눠 요청하고, 응답 항목을 청크 순서대로 내보내는 생성기
+        request_builder(youtube_service, chunk)는 청크 하나의 요청을 만듭니다.
+        - 청크가 여러 개면 작업 스레드에서 최대 max_in_flight개까지 동시에 요청하고,
+          앞 청크의 항목을 내보내는 동안 다음 청크를 미리 요청합니다. (호출한 쪽이 멈추면 남은 청크는 요청하지 않음)
+        - 실패한 청크는 건너뛰고 나머지 청크의 항목은 그대로 내보냅니다.
+        """
+        chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+        if max_in_flight is None:
+            max_in_flight = getattr(settings, 'YOUTUBE_CHUNK_MAX_IN_FLIGHT', DEFAULT_CHUNK_MAX_IN_FLIGHT)
+
+        def fetch(chunk):
+            return self._execute_request(lambda youtube_service: request_builder(youtube_service, chunk))
+
+        def chunk_items(chunk, result):
+            try:
+                return result().get("items", [])
+            except HttpError as e:
+                print(f"API Error (chunk of {len(chunk)} ids) after all retries: {e}")
+                return []
+
+        if len(chunks) <= 1 or max_in_flight <= 1:
+            for chunk in chunks:
+                yield from chunk_items(chunk, lambda: fetch(chunk))
+            return
+
+        pool = _get_chunk_pool()
+        pending = deque()  # (청크, future) 요청한 순서대로
+        next_chunk = 0
+        try:
+            while pending or next_chunk < len(chunks):
+                while next_chunk < len(chunks) and len(pending) < max_in_flight:
+                    chunk = chunks[next_chunk]
+                    pending.append((chunk, pool.submit(contextvars.copy_context().run, _run_chunk, fetch, chunk)))
+                    next_chunk += 1
+                chunk, future = pending.popleft()
+                yield from chunk_items(chunk, future.result)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def iter_pages(self, request_builder: Callable[[Any, Optional[str]], Any], max_pages: Optional[int] = None) -> Iterator[dict]:
+        """
+        nextPageToken을 따라가며 응답 항목을 내보내는 생성기 (다음 페이지는 앞 페이지를 다 내보낸 뒤에 요청)
+        request_builder(youtube_service, page_token)는 페이지 하나의 요청을 만듭니다. (첫 페이지는 page_token=None)
+        요청이 실패하면 HttpError가 그대로 전달되므로, 호출한 쪽은 그때까지 받은 항목을 그대로 쓸 수 있습니다.
+        """
+        page_token = None
+        pages = 0
+        while True:
+            response = self._execute_request(lambda youtube_service: request_builder(youtube_service, page_token))
+            pages += 1
+            yield from response.get("items", [])
+            page_token = response.get("nextPageToken")
+            if not page_token or (max_pages and pages >= max_pages):
+                return
+
     # --- (이하 모든 메서드는 수정할 필요 없이 기존과 동일) ---
 
     def search_channels(self, keyword, max_results=5):
         """키워드로 채널 검색"""
         try:
             def builder(youtube_service):
-                return youtube_service.search().list(
-                    part="snippet", q=keyword, type="channel", maxResults=max_results
-                )
+                return youtube_service.search().list(**search_params(keyword, max_results))
             
             response = self._execute_request(builder)
             return response.get("items", [])
@@ -114,80 +291,131 @@ class YouTubeDataCollector:
             print(f"API Error (get_channel_details) after all retries: {e}")
             return None
     
-    def get_latest_videos(self, channel_id, max_results=5):
-        """채널 ID로 최신 비디오 목록 조회 (할당량 최적화)"""
+    def get_channels_details(self, channel_ids: List[str]) -> dict:
+        """
+        채널 ID 목록으로 상세 정보를 한 번에 조회 (배칭 처리, 요청당 최대 50개, 배치끼리는 동시에 요청)
+        반환값: {channel_id: channel_item} (통계와 업로드 재생목록 ID 포함)
+        """
+        def builder(youtube_service, chunk):
+            return youtube_service.channels().list(
+                part="snippet,statistics,brandingSettings,contentDetails",
+                id=",".join(chunk),
+                maxResults=50
+            )
+
+        return {item["id"]: item for item in self.iter_chunks(builder, list(dict.fromkeys(channel_ids)))}
+
+    @staticmethod
+    def get_uploads_playlist_id(channel_details: dict):
+        """채널 상세 정보에서 업로드 재생목록 ID를 추출 (없으면 None)"""
+        return (channel_details or {}).get("contentDetails", {}) \
+                                      .get("relatedPlaylists", {}) \
+                                      .get("uploads")
+
+    def _lookup_uploads_playlist_id(self, channel_id):
+        """채널 조회(channels.list)로 업로드 재생목록 ID를 확인 (없으면 None)"""
+        def channel_builder(youtube_service):
+            return youtube_service.channels().list(
+                part="contentDetails",
+                id=channel_id
+            )
+        channels_response = self._execute_request(channel_builder)
+        return self.get_uploads_playlist_id((channels_response.get("items") or [{}])[0])
+
+    def _playlist_items(self, uploads_playlist_id, max_results):
+        """재생목록 아이템을 max_results개까지 조회 (페이지당 최대 50개, 두 번째 페이지부터 실패하면 받은 만큼 반환)"""
+        def items_builder(youtube_service, page_token):
+            return youtube_service.playlistItems().list(
+                part="snippet",
+                playlistId=uploads_playlist_id,
+                maxResults=min(max_results, 50),
+                pageToken=page_token
+            )
+
+        items = []
         try:
-            # 첫 번째 API 호출 (채널 정보 조회)
-            def channel_builder(youtube_service):
-                return youtube_service.channels().list(
-                    part="contentDetails", 
-                    id=channel_id
-                )
-            channels_response = self._execute_request(channel_builder)
-            
-            uploads_playlist_id = channels_response.get("items", [{}])[0] \
-                                                .get("contentDetails", {}) \
-                                                .get("relatedPlaylists", {}) \
-                                                .get("uploads")
-            
+            for item in self.iter_pages(items_builder):
+                items.append(item)
+                if len(items) >= max_results:
+                    break
+        except HttpError:
+            if not items:
+                raise
+        return items
+
+    def get_latest_videos(self, channel_id, max_results=5, uploads_playlist_id=None):
+        """
+        채널 ID로 최신 비디오 목록 조회 (할당량 최적화)
+        uploads_playlist_id를 미리 알고 있다면(get_channels_details 결과 등) 그대로 사용하고,
+        모르면 이전에 확인한 ID나 채널 ID로 만든 ID(UC -> UU)로 채널 조회 없이 재생목록 아이템만 조회합니다.
+        만든 ID의 재생목록이 없을 때(404)만 채널 조회로 실제 ID를 확인합니다.
+        """
+        try:
+            derived = False
+            if not uploads_playlist_id:
+                uploads_playlist_id = uploads_playlist_ids.get(channel_id)
+            if not uploads_playlist_id:
+                uploads_playlist_id = derive_uploads_playlist_id(channel_id)
+                derived = uploads_playlist_id is not None
+            if not uploads_playlist_id:
+                uploads_playlist_id = self._lookup_uploads_playlist_id(channel_id)
+
             if not uploads_playlist_id:
                 print(f"Error: '{channel_id}'의 업로드 재생목록을 찾을 수 없습니다.")
                 return []
 
-            # 두 번째 API 호출 (재생목록 아이템 조회)
-            def items_builder(youtube_service):
-                return youtube_service.playlistItems().list(
-                    part="snippet",
-                    playlistId=uploads_playlist_id,
-                    maxResults=max_results
-                )
-            
-            response = self._execute_request(items_builder)
-            return response.get("items", [])
+            try:
+                items = self._playlist_items(uploads_playlist_id, max_results)
+            except HttpError as e:
+                if not (derived and e.resp.status == 404):
+                    raise
+                # 업로드 재생목록 ID가 규칙과 다른 채널: 채널 조회로 실제 ID를 확인하여 다시 조회
+                actual_playlist_id = self._lookup_uploads_playlist_id(channel_id)
+                if not actual_playlist_id or actual_playlist_id == uploads_playlist_id:
+                    print(f"Error: '{channel_id}'의 업로드 재생목록을 찾을 수 없습니다.")
+                    return []
+                uploads_playlist_id = actual_playlist_id
+                items = self._playlist_items(uploads_playlist_id, max_results)
+
+            remember_uploads_playlist_id(channel_id, uploads_playlist_id)
+            return items
         
         except HttpError as e:
             print(f"API Error (get_latest_videos) after all retries: {e}")
             return []
 
     def get_video_details(self, video_ids: List[str]):
-        """비디오 ID 목록으로 상세 정보 조회 (배칭 처리)"""
-        all_items = []
-        try:
-            for i in range(0, len(video_ids), 50):
-                chunk = video_ids[i:i+50]
-                
-                def builder(youtube_service):
-                    return youtube_service.videos().list(
-                        part="snippet,statistics,contentDetails,status",
-                        id=",".join(chunk)
-                    )
-                
-                response = self._execute_request(builder)
-                all_items.extend(response.get("items", []))
-            
-            return all_items
-        
-        except HttpError as e:
-            print(f"API Error (get_video_details) after all retries: {e}")
-            return all_items
+        """비디오 ID 목록으로 상세 정보 조회 (배칭 처리, 배치끼리는 동시에 요청, 실패한 배치만 제외)"""
+        def builder(youtube_service, chunk):
+            return youtube_service.videos().list(
+                part="snippet,statistics,contentDetails,status",
+                id=",".join(chunk)
+            )
+
+        return list(self.iter_chunks(builder, video_ids))
 
     def get_video_comments(self, video_id: str, max_results=100):
-        """비디오 ID로 댓글 수집"""
+        """비디오 ID로 댓글 수집 (max_results가 한 페이지(100개)보다 많으면 다음 페이지도 조회)"""
+        def builder(youtube_service, page_token):
+            return youtube_service.commentThreads().list(
+                part="snippet",
+                videoId=video_id,
+                maxResults=min(max_results, 100),
+                order="relevance",
+                pageToken=page_token
+            )
+
+        comments = []
         try:
-            def builder(youtube_service):
-                return youtube_service.commentThreads().list(
-                    part="snippet",
-                    videoId=video_id,
-                    maxResults=max_results,
-                    order="relevance"
-                )
-            
-            response = self._execute_request(builder)
-            return response.get("items", [])
+            for comment in self.iter_pages(builder):
+                comments.append(comment)
+                if len(comments) >= max_results:
+                    break
+            return comments
         
         except HttpError as e:
             if 'commentsDisabled' in str(e):
                 print(f"Info (get_video_comments): 비디오({video_id})의 댓글이 비활성화되었습니다.")
             else:
                  print(f"API Error (get_video_comments) after all retries: {e}")
-            return []
\ No newline at end of file
+            return comments
@@ -1,10 +1,35 @@
+import hashlib
 import random
 import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# YouTube Data API 할당량은 태평양 시간 자정에 초기화됩니다.
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+DEFAULT_DAILY_QUOTA = 10000
+DEFAULT_SYNC_INTERVAL = 5
+
+
+def key_fingerprint(api_key: str) -> str:
+    """DB/로그에 API 키 원문 대신 남길 SHA-256 해시"""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+
+def current_quota_date():
+    """할당량 기준 날짜 (태평양 시간)"""
+    return datetime.now(QUOTA_TIMEZONE).date()
+
 
 class ApiKeyManager:
     """
     Django settings에서 API 키를 로드하고 관리하는 싱글톤 클래스.
-    get_next_key()는 무작위 키를 반환하여 부하를 분산시킵니다.
+    키별 추정 사용량(search=100, list=1 등)과 소진 여부를 기록하여,
+    남은 할당량이 가장 많은 키를 골라줍니다.
+
+    사용량은 ApiKeyUsage 테이블을 통해 여러 워커 프로세스가 공유합니다.
+    (매 호출마다 DB에 쓰지 않고, 프로세스 내부에 모아 두었다가 sync_interval 초마다 반영)
+    소진된 키는 다음 태평양 시간 자정까지 다시 선택되지 않습니다.
     """
     _instance = None
     _lock = threading.Lock()
@@ -21,6 +46,8 @@ class ApiKeyManager:
             # Initialize with None. Keys will be loaded on first use.
             self.api_keys = None
             self.lock = threading.Lock()
+            self.usage_lock = threading.RLock()
+            self.reset_usage()
             self.initialized = True
 
     def _load_keys(self):
@@ -44,12 +71,14 @@ class ApiKeyManager:
 
     def get_next_key(self) -> str:
         """
-        무작위 키를 반환합니다.
+        남은 할당량이 가장 많은 키를 반환합니다.
         (참고: 이 메서드를 호출하면 내부적으로 _load_keys()가 트리거됩니다.)
         """
-        self._load_keys() 
-        return random.choice(self.api_keys)
-    
+        key = self.pick_key()
+        if key is None:
+            raise RuntimeError("모든 YouTube API 키의 할당량이 소진되었습니다.")
+        return key
+
     def get_all_keys(self) -> list:
         """
         [신규 추가] 순차적 키 로테이션을 위해 모든 키 목록을 반환합니다.
@@ -57,5 +86,114 @@ class ApiKeyManager:
         self._load_keys()
         return list(self.api_keys) # 사본 반환
 
+    # --- 할당량 추적 ---
+
+    @property
+    def daily_quota(self) -> int:
+        from django.conf import settings
+        return getattr(settings, 'YOUTUBE_DAILY_QUOTA', DEFAULT_DAILY_QUOTA)
+
+    @property
+    def sync_interval(self) -> float:
+        from django.conf import settings
+        return getattr(settings, 'YOUTUBE_KEY_USAGE_SYNC_INTERVAL', DEFAULT_SYNC_INTERVAL)
+
+    def reset_usage(self):
+        """프로세스 내부의 사용량 상태를 초기화합니다. (DB 기록은 유지)"""
+        with self.usage_lock:
+            self.quota_date = current_quota_date()
+            self.units_used = {}    # fingerprint -> 오늘 사용한 단위 (DB 값 + 미반영분)
+            self.pending_units = {} # fingerprint -> 아직 DB에 반영하지 않은 단위
+            self.exhausted = set()  # 오늘 소진된 키의 fingerprint
+            self.last_sync = 0.0
+
+    def _sync(self, force: bool = False):
+        """
+        미반영 사용량을 DB에 쓰고, 다른 프로세스가 기록한 사용량을 읽어옵니다.
+        (태평양 시간 날짜가 바뀌었으면 모든 상태를 초기화)
+        DB를 사용할 수 없으면 프로세스 내부 상태만으로 동작합니다.
+        """
+        with self.usage_lock:
+            if self.quota_date != current_quota_date():
+                self.reset_usage()
+            if not force and time.monotonic() - self.last_sync < self.sync_interval:
+                return
+            self.last_sync = time.monotonic()
+
+            from django.db import DatabaseError, transaction
+            from django.db.models import F
+            from .models import ApiKeyUsage
+            try:
+                with transaction.atomic():
+                    for fingerprint, units in self.pending_units.items():
+                        usage, _ = ApiKeyUsage.objects.get_or_create(
+                            key_fingerprint=fingerprint, quota_date=self.quota_date)
+                        ApiKeyUsage.objects.filter(pk=usage.pk).update(units_used=F('units_used') + units)
+                    if self.exhausted:
+                        ApiKeyUsage.objects.filter(
+                            key_fingerprint__in=self.exhausted, quota_date=self.quota_date).update(exhausted=True)
+                    rows = list(ApiKeyUsage.objects.filter(quota_date=self.quota_date))
+            except DatabaseError as e:
+                print(f"ApiKeyManager: 사용량을 DB와 동기화하지 못했습니다. (프로세스 내부 값 사용) {e}")
+                return
+
+            self.pending_units = {}
+            for row in rows:
+                self.units_used[row.key_fingerprint] = row.units_used
+                if row.exhausted:
+                    self.exhausted.add(row.key_fingerprint)
+
+    def record_usage(self, api_key: str, units: int):
+        """키로 호출을 한 번 성공했을 때 추정 사용 단위를 기록합니다."""
+        fingerprint = key_fingerprint(api_key)
+        with self.usage_lock:
+            self.units_used[fingerprint] = self.units_used.get(fingerprint, 0) + units
+            self.pending_units[fingerprint] = self.pending_units.get(fingerprint, 0) + units
+        self._sync()
+
+    def mark_exhausted(self, api_key: str):
+        """키를 다음 태평양 시간 자정까지 사용하지 않도록 표시하고, 즉시 다른 프로세스와 공유합니다."""
+        with self.usage_lock:
+            fingerprint = key_fingerprint(api_key)
+            self.exhausted.add(fingerprint)
+            # DB에 행이 없어도 소진 표시가 남도록 0 단위 사용을 함께 기록
+            self.pending_units.setdefault(fingerprint, 0)
+        self._sync(force=True)
+
+    def remaining(self, api_key: str) -> int:
+        """키의 오늘 남은 추정 할당량 (소진된 키는 0)"""
+        fingerprint = key_fingerprint(api_key)
+        with self.usage_lock:
+            if fingerprint in self.exhausted:
+                return 0
+            return max(0, self.daily_quota - self.units_used.get(fingerprint, 0))
+
+    def pick_key(self, exclude=()):
+        """
+        소진되지 않은 키 중 남은 할당량이 가장 많은 키를 반환합니다. (없으면 None)
+        남은 양이 같은 키가 여럿이면 무작위로 골라 부하를 분산합니다.
+        """
+        self._load_keys()
+        self._sync()
+        candidates = [key for key in self.api_keys if key not in exclude and self.remaining(key) > 0]
+        if not candidates:
+            return None
+        best = max(self.remaining(key) for key in candidates)
+        return random.choice([key for key in candidates if self.remaining(key) == best])
+
+    def usage_report(self) -> list:
+        """키별 오늘 사용량 요약 (키 원문 대신 순번과 해시 앞부분만 표시)"""
+        self._load_keys()
+        self._sync()
+        return [
+            {
+                'key': f"#{index + 1} ({key_fingerprint(key)[:8]})",
+                'units_used': self.units_used.get(key_fingerprint(key), 0),
+                'remaining': self.remaining(key),
+                'exhausted': key_fingerprint(key) in self.exhausted,
+            }
+            for index, key in enumerate(self.api_keys)
+        ]
+
 # Create a single, global instance of the manager for the application to use.
-api_key_manager = ApiKeyManager()
\ No newline at end of file
+api_key_manager = ApiKeyManager()
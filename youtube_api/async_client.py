@@ -0,0 +1,245 @@
+# youtube_api/async_client.py
+"""
+YouTubeDataCollector의 비동기(async) 버전.
+googleapiclient 대신 httpx.AsyncClient로 REST 엔드포인트를 직접 호출하며,
+응답 캐시(cache.py), 키별 할당량 관리(api_key_manager.py)는 동기 버전과 그대로 공유합니다.
+"""
+import asyncio
+import copy
+import weakref
+from typing import List
+
+import httplib2
+import httpx
+from asgiref.sync import sync_to_async
+from googleapiclient.errors import HttpError
+
+from .api_client import (
+    YouTubeDataCollector, uploads_playlist_ids, derive_uploads_playlist_id, remember_uploads_playlist_id,
+)
+from .api_key_manager import api_key_manager
+from .cache import response_cache
+from .quota import quota_cost, is_key_error, is_rate_limit_error, rate_limit_delay
+from .search_planner import SEARCH_METHOD, search_params
+from core.singleflight import AsyncSingleFlight
+from core.tracing import span, metrics, YOUTUBE_QUOTA_UNITS
+
+API_BASE_URL = 'https://youtube.googleapis.com/youtube/v3/'
+DEFAULT_TIMEOUT = 30.0
+
+# 같은 (메서드, 파라미터) 호출이 동시에 들어오면 한 번만 요청
+youtube_request_flight = AsyncSingleFlight('youtube_request_async')
+
+# 이벤트 루프 -> httpx.AsyncClient (연결 풀은 루프에 묶여 있으므로 루프마다 하나)
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """현재 이벤트 루프에서 재사용할 HTTP 클라이언트(연결 풀)를 반환합니다."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=API_BASE_URL,
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        _clients[loop] = client
+    return client
+
+
+def _to_http_error(response: httpx.Response) -> HttpError:
+    """httpx 응답을 동기 버전과 같은 HttpError로 변환 (오류 처리 코드를 공유하기 위함)"""
+    resp = httplib2.Response({'status': str(response.status_code)})
+    resp.reason = response.reason_phrase
+    return HttpError(resp, response.content, uri=str(response.url))
+
+
+class AsyncYouTubeDataCollector:
+    """
+    YouTube Data API v3를 사용한 채널 및 비디오 데이터 수집 (async)
+    (ApiKeyManager가 남은 할당량이 가장 많은 키를 골라주고, 소진 시 다음으로 여유 있는 키로 전환)
+    """
+
+    def __init__(self):
+        self.api_keys = api_key_manager.get_all_keys()
+        if not self.api_keys:
+            raise ValueError("API keys must be a non-empty list of strings.")
+        self.current_key = None
+        self._key_lock = asyncio.Lock()
+
+    async def _current_key(self) -> str:
+        if self.current_key is None:
+            async with self._key_lock:
+                if self.current_key is None:
+                    self.current_key = await sync_to_async(api_key_manager.pick_key)() or self.api_keys[0]
+        return self.current_key
+
+    async def _switch_key(self, failed_key: str):
+        """실패한 키를 소진 처리하고 남은 할당량이 가장 많은 키로 전환합니다."""
+        async with self._key_lock:
+            if self.current_key != failed_key:
+                return  # 다른 작업이 이미 전환함
+            await sync_to_async(api_key_manager.mark_exhausted)(failed_key)
+            next_key = await sync_to_async(api_key_manager.pick_key)(exclude={failed_key})
+            if next_key is None:
+                raise RuntimeError("모든 YouTube API 키의 할당량이 소진되었습니다.")
+            print(f"알림: API 키 할당량 문제 발생. Key #{self.api_keys.index(next_key) + 1}로 전환합니다...")
+            self.current_key = next_key
+
+    async def _execute_request(self, method_id: str, params: dict) -> dict:
+        """
+        요청을 실행하고, 할당량 403 오류 시 키를 전환하며 재시도합니다.
+        method_id 예: 'youtube.channels.list' -> GET /youtube/v3/channels
+        """
+        with span('youtube.request', endpoint=method_id) as request_span:
+            cached = await sync_to_async(response_cache.get)(method_id, params)
+            if cached is not None:
+                request_span.labels['cache'] = 'hit'
+                return cached
+
+            # 같은 호출이 이미 진행 중이면 그 응답을 기다림 (할당량을 한 번만 사용)
+            data, shared = await youtube_request_flight.do(
+                response_cache.make_key(method_id, params),
+                lambda: self._execute_with_key_rotation(method_id, params, request_span),
+            )
+            request_span.labels['cache'] = 'coalesced' if shared else 'miss'
+            return copy.deepcopy(data) if shared else data
+
+    async def _execute_with_key_rotation(self, method_id: str, params: dict, request_span) -> dict:
+        """_execute_request의 실제 네트워크 호출"""
+        resource = method_id.split('.')[1]
+        attempt = 0
+        while True:
+            api_key = await self._current_key()
+            response = await get_http_client().get(resource, params={**params, 'key': api_key})
+            if response.status_code < 400:
+                data = response.json()
+                units = quota_cost(method_id)
+                await sync_to_async(api_key_manager.record_usage)(api_key, units)
+                metrics.inc(YOUTUBE_QUOTA_UNITS, {'endpoint': method_id}, units)
+                request_span.set(key_index=self.api_keys.index(api_key) + 1, units=units)
+                await sync_to_async(response_cache.set)(method_id, params, data)
+                return data
+
+            error = _to_http_error(response)
+            # 일시적인 빈도 제한은 키를 소진 처리하지 않고 같은 키로 잠시 후 재시도
+            if is_rate_limit_error(error):
+                delay = rate_limit_delay(attempt)
+                if delay is not None:
+                    request_span.set(rate_limited=request_span.attributes.get('rate_limited', 0) + 1)
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+                print(f"API Error (Rate limit): {error}")
+                raise error
+            if response.status_code == 403 and is_key_error(error):
+                print(f"API Key #{self.api_keys.index(api_key) + 1} (403 Error: {error}).")
+                request_span.set(key_switches=request_span.attributes.get('key_switches', 0) + 1)
+                try:
+                    await self._switch_key(api_key)
+                    continue
+                except RuntimeError as re:
+                    print(re)
+                    raise error
+            print(f"API Error (Non-quota): {error}")
+            raise error
+
+    async def search_channels(self, keyword, max_results=5):
+        """키워드로 채널 검색"""
+        try:
+            response = await self._execute_request(SEARCH_METHOD, search_params(keyword, max_results))
+            return response.get("items", [])
+        except (HttpError, httpx.HTTPError) as e:
+            print(f"API Error (search_channels) after all retries: {e}")
+            return []
+
+    async def get_channels_details(self, channel_ids: List[str]) -> dict:
+        """채널 ID 목록으로 상세 정보를 조회 (50개 단위 배칭, 배치끼리는 동시에 요청)"""
+        unique_ids = list(dict.fromkeys(channel_ids))
+        chunks = [unique_ids[i:i+50] for i in range(0, len(unique_ids), 50)]
+        responses = await asyncio.gather(*[
+            self._execute_request('youtube.channels.list', {
+                'part': 'snippet,statistics,brandingSettings,contentDetails',
+                'id': ",".join(chunk),
+                'maxResults': 50,
+            })
+            for chunk in chunks
+        ], return_exceptions=True)
+
+        details = {}
+        for response in responses:
+            if isinstance(response, Exception):
+                print(f"API Error (get_channels_details) after all retries: {response}")
+                continue
+            for item in response.get("items", []):
+                details[item["id"]] = item
+        return details
+
+    async def _lookup_uploads_playlist_id(self, channel_id):
+        """채널 조회(channels.list)로 업로드 재생목록 ID를 확인 (없으면 None)"""
+        channels_response = await self._execute_request('youtube.channels.list', {
+            'part': 'contentDetails', 'id': channel_id,
+        })
+        return YouTubeDataCollector.get_uploads_playlist_id((channels_response.get("items") or [{}])[0])
+
+    async def _playlist_items(self, uploads_playlist_id, max_results):
+        response = await self._execute_request('youtube.playlistItems.list', {
+            'part': 'snippet', 'playlistId': uploads_playlist_id, 'maxResults': max_results,
+        })
+        return response.get("items", [])
+
+    async def get_latest_videos(self, channel_id, max_results=5, uploads_playlist_id=None):
+        """
+        채널 ID로 최신 비디오 목록 조회
+        (uploads_playlist_id를 모르면 확인된 ID나 UC -> UU로 만든 ID를 쓰고, 만든 ID가 404일 때만 채널 조회)
+        """
+        try:
+            derived = False
+            if not uploads_playlist_id:
+                uploads_playlist_id = uploads_playlist_ids.get(channel_id)
+            if not uploads_playlist_id:
+                uploads_playlist_id = derive_uploads_playlist_id(channel_id)
+                derived = uploads_playlist_id is not None
+            if not uploads_playlist_id:
+                uploads_playlist_id = await self._lookup_uploads_playlist_id(channel_id)
+
+            if not uploads_playlist_id:
+                print(f"Error: '{channel_id}'의 업로드 재생목록을 찾을 수 없습니다.")
+                return []
+
+            try:
+                items = await self._playlist_items(uploads_playlist_id, max_results)
+            except HttpError as e:
+                if not (derived and e.resp.status == 404):
+                    raise
+                actual_playlist_id = await self._lookup_uploads_playlist_id(channel_id)
+                if not actual_playlist_id or actual_playlist_id == uploads_playlist_id:
+                    print(f"Error: '{channel_id}'의 업로드 재생목록을 찾을 수 없습니다.")
+                    return []
+                uploads_playlist_id = actual_playlist_id
+                items = await self._playlist_items(uploads_playlist_id, max_results)
+
+            remember_uploads_playlist_id(channel_id, uploads_playlist_id)
+            return items
+        except (HttpError, httpx.HTTPError) as e:
+            print(f"API Error (get_latest_videos) after all retries: {e}")
+            return []
+
+    async def get_video_details(self, video_ids: List[str]):
+        """비디오 ID 목록으로 상세 정보 조회 (50개 단위 배칭, 배치끼리는 동시에 요청)"""
+        chunks = [video_ids[i:i+50] for i in range(0, len(video_ids), 50)]
+        responses = await asyncio.gather(*[
+            self._execute_request('youtube.videos.list', {
+                'part': 'snippet,statistics,contentDetails,status', 'id': ",".join(chunk),
+            })
+            for chunk in chunks
+        ], return_exceptions=True)
+
+        all_items = []
+        for response in responses:
+            if isinstance(response, Exception):
+                print(f"API Error (get_video_details) after all retries: {response}")
+                continue
+            all_items.extend(response.get("items", []))
+        return all_items
@@ -0,0 +1,211 @@
+# youtube_api/cache.py
+"""
+YouTube Data API 응답 캐시.
+
+_execute_request 앞단에서 (메서드 ID, 정규화된 파라미터)를 키로 응답을 저장하여
+같은 호출이 반복될 때 네트워크와 할당량을 쓰지 않도록 합니다.
+
+백엔드
+  - 'memory' : 프로세스 내부 LRU 캐시 (YOUTUBE_CACHE_MAX_ENTRIES 개로 크기 제한)
+  - 'django' : Django 캐시 프레임워크 (CACHES 설정에 따라 여러 워커가 공유)
+  - 'none'   : 캐시 사용 안 함
+"""
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl
+
+from core.tracing import record_cache_lookup
+
+from .quota import quota_cost
+
+# 캐시 키에서 제외할 파라미터 (API 키는 응답에 영향을 주지 않음)
+IGNORED_PARAMS = {'key', 'alt'}
+
+DEFAULT_TTLS = {
+    'youtube.channels.list': 6 * 60 * 60,
+    'youtube.search.list': 60 * 60,
+    'youtube.videos.list': 60 * 60,
+    'youtube.commentThreads.list': 30 * 60,
+    'youtube.playlistItems.list': 10 * 60,
+}
+DEFAULT_TTL = 10 * 60
+
+
+def request_signature(request):
+    """
+    googleapiclient의 HttpRequest에서 (메서드 ID, 정규화된 파라미터)를 추출합니다.
+    파라미터는 API 키를 제외하고 이름순으로 정렬합니다.
+    """
+    query = parse_qsl(urlsplit(request.uri).query, keep_blank_values=True)
+    params = sorted((name, value) for name, value in query if name not in IGNORED_PARAMS)
+    return request.methodId, params
+
+
+class MemoryCacheBackend:
+    """TTL과 최대 항목 수(LRU)를 지원하는 프로세스 내부 캐시"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+        # 호출자가 응답을 수정해도 캐시가 오염되지 않도록 사본을 반환
+        return copy.deepcopy(value)
+
+    def set(self, key, value, ttl: int):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class DjangoCacheBackend:
+    """Django 캐시 프레임워크를 사용하는 공유 캐시 (예: 파일/DB/Redis 캐시)"""
+
+    def __init__(self, alias: str = 'default'):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, ttl: int):
+        self.cache.set(key, value, ttl)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class ResponseCache:
+    """
+    엔드포인트별 TTL이 적용되는 응답 캐시.
+    엔드포인트별 적중(hit)/미스(miss) 횟수와 절약된 할당량을 집계합니다.
+    """
+
+    def __init__(self, backend=None, ttls: dict = None):
+        self.backend = backend
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.counters = {}  # method_id -> {'hits': int, 'misses': int}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "ResponseCache":
+        """Django settings 값으로 캐시를 구성합니다."""
+        from django.conf import settings
+        backend_name = getattr(settings, 'YOUTUBE_CACHE_BACKEND', 'memory')
+        if backend_name == 'django':
+            backend = DjangoCacheBackend(getattr(settings, 'YOUTUBE_CACHE_ALIAS', 'default'))
+        elif backend_name == 'memory':
+            backend = MemoryCacheBackend(getattr(settings, 'YOUTUBE_CACHE_MAX_ENTRIES', 2048))
+        else:
+            backend = None
+        return cls(backend, getattr(settings, 'YOUTUBE_CACHE_TTLS', None))
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def make_key(method_id: str, params) -> str:
+        """(메서드 ID, 파라미터)로 캐시 키를 만듭니다. params는 dict 또는 (이름, 값) 목록"""
+        if isinstance(params, dict):
+            params = params.items()
+        normalized = sorted((str(name), str(value)) for name, value in params if name not in IGNORED_PARAMS)
+        raw = json.dumps([method_id, normalized], ensure_ascii=False)
+        return 'youtube:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, method_id: str) -> int:
+        return self.ttls.get(method_id, DEFAULT_TTL)
+
+    def _count(self, method_id: str, field: str):
+        with self.lock:
+            counter = self.counters.setdefault(method_id, {'hits': 0, 'misses': 0})
+            counter[field] += 1
+
+    def get(self, method_id: str, params):
+        """캐시된 응답을 반환합니다. (없거나 만료되었으면 None)"""
+        if not self.enabled:
+            return None
+        value = self.backend.get(self.make_key(method_id, params))
+        self._count(method_id, 'misses' if value is None else 'hits')
+        record_cache_lookup('youtube_response', value is not None)
+        return value
+
+    def peek(self, method_id: str, params):
+        """적중/미스 집계 없이 캐시된 응답을 반환합니다. (호출 계획용, 없거나 만료되었으면 None)"""
+        if not self.enabled:
+            return None
+        return self.backend.get(self.make_key(method_id, params))
+
+    def set(self, method_id: str, params, response):
+        """응답을 엔드포인트별 TTL로 저장합니다."""
+        if not self.enabled:
+            return
+        ttl = self.ttl_for(method_id)
+        if ttl > 0:
+            self.backend.set(self.make_key(method_id, params), response, ttl)
+
+    def stats(self) -> dict:
+        """엔드포인트별 적중/미스 횟수와 절약된 할당량 단위를 반환합니다."""
+        with self.lock:
+            endpoints = {method_id: dict(counter) for method_id, counter in self.counters.items()}
+        for method_id, counter in endpoints.items():
+            counter['quota_units_saved'] = counter['hits'] * quota_cost(method_id)
+        return {
+            'enabled': self.enabled,
+            'hits': sum(c['hits'] for c in endpoints.values()),
+            'misses': sum(c['misses'] for c in endpoints.values()),
+            'quota_units_saved': sum(c['quota_units_saved'] for c in endpoints.values()),
+            'endpoints': endpoints,
+        }
+
+    def reset_stats(self):
+        with self.lock:
+            self.counters.clear()
+
+
+class _LazyResponseCache:
+    """settings가 로드된 뒤 첫 사용 시점에 ResponseCache를 구성하는 전역 프록시"""
+
+    def __init__(self):
+        self._cache = None
+        self._lock = threading.Lock()
+
+    def configure(self, cache: ResponseCache = None):
+        """캐시를 (재)구성합니다. 인자가 없으면 settings 값을 다시 읽습니다."""
+        with self._lock:
+            self._cache = cache or ResponseCache.from_settings()
+        return self._cache
+
+    def __getattr__(self, name):
+        if self._cache is None:
+            with self._lock:
+                if self._cache is None:
+                    self._cache = ResponseCache.from_settings()
+        return getattr(self._cache, name)
+
+# Create a single, global instance of the cache for the application to use.
+response_cache = _LazyResponseCache()
@@ -0,0 +1,99 @@
+# youtube_api/catalog.py
+"""
+채널 카탈로그(CatalogChannel) 조회/저장.
+- 검색 결과로 채널을 평가할 때마다 조회한 채널 통계·최신 영상을 저장해 두고,
+  CHANNEL_CATALOG_TTL(초) 안에 같은 채널이 다시 나오면 YouTube를 호출하지 않고 그대로 사용합니다.
+- 만료된 채널은 통계와 최신 영상 목록만 다시 조회하고, 이미 알고 있는 영상의 상세 정보는 재사용합니다.
+  (새로 올라온 영상만 videos.list로 조회)
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+from core.tracing import record_cache_lookup
+from .models import CatalogChannel
+
+DEFAULT_CHANNEL_CATALOG_TTL = 24 * 60 * 60
+
+
+def _catalog_ttl() -> int:
+    return getattr(settings, 'CHANNEL_CATALOG_TTL', DEFAULT_CHANNEL_CATALOG_TTL)
+
+
+def is_fresh(entry: CatalogChannel) -> bool:
+    return entry.fetched_at >= timezone.now() - timedelta(seconds=_catalog_ttl())
+
+
+def load_catalog(channel_ids) -> dict:
+    """저장된 채널을 {채널 ID: CatalogChannel}로 반환합니다. (만료된 채널 포함, is_fresh로 구분)"""
+    channel_ids = list(channel_ids)
+    try:
+        entries = {entry.channel_id: entry for entry in CatalogChannel.objects.filter(channel_id__in=channel_ids)}
+    except DatabaseError as e:
+        print(f"Error reading channel catalog: {e}")
+        return {}
+    for channel_id in channel_ids:
+        entry = entries.get(channel_id)
+        record_cache_lookup('channel_catalog', entry is not None and is_fresh(entry))
+    return entries
+
+
+def _trim_channel_details(channel_details: dict) -> dict:
+    channel_details = channel_details or {}
+    return {
+        'statistics': channel_details.get('statistics', {}),
+        'contentDetails': {'relatedPlaylists': channel_details.get('contentDetails', {}).get('relatedPlaylists', {})},
+    }
+
+
+def _trim_playlist_item(item: dict) -> dict:
+    snippet = item.get('snippet', {})
+    return {'snippet': {'publishedAt': snippet.get('publishedAt'),
+                        'resourceId': {'videoId': snippet.get('resourceId', {}).get('videoId')}}}
+
+
+def _trim_video_detail(detail: dict) -> dict:
+    snippet = detail.get('snippet', {})
+    return {
+        'id': detail.get('id'),
+        'snippet': {key: snippet[key] for key in ('title', 'description', 'tags', 'publishedAt') if key in snippet},
+        'statistics': detail.get('statistics', {}),
+        'contentDetails': {'duration': detail.get('contentDetails', {}).get('duration', 'PT0S')},
+        'status': {'embeddable': detail.get('status', {}).get('embeddable')},
+    }
+
+
+def _int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def store_channel(channel_id: str, channel: dict, channel_details: dict, latest_videos: list, video_details: list):
+    """조회한 채널 데이터를 카탈로그에 저장(갱신)하고, 저장된 형태의 데이터를 CatalogChannel로 반환합니다."""
+    snippet = (channel or {}).get('snippet', {})
+    details = _trim_channel_details(channel_details)
+    statistics = details['statistics']
+    try:
+        entry, _ = CatalogChannel.objects.update_or_create(
+            channel_id=channel_id,
+            defaults={
+                'title': (snippet.get('title') or '')[:255],
+                'description': snippet.get('description') or '',
+                'uploads_playlist_id': details['contentDetails']['relatedPlaylists'].get('uploads') or '',
+                'subscriber_count': _int(statistics.get('subscriberCount')),
+                'view_count': _int(statistics.get('viewCount')),
+                'video_count': _int(statistics.get('videoCount')),
+                'channel_details': details,
+                'latest_videos': [_trim_playlist_item(item) for item in latest_videos],
+                'video_details': [_trim_video_detail(detail) for detail in video_details],
+                'fetched_at': timezone.now(),
+            },
+        )
+        return entry
+    except DatabaseError as e:
+        print(f"Error writing channel catalog: {e}")
+        return None
@@ -0,0 +1,250 @@
+# youtube_api/fakes.py
+"""
+YouTube Data API v3의 오프라인 대역(fake).
+실제 할당량을 쓰지 않고 api_client.py의 전체 경로(googleapiclient 요청 생성, 응답 캐시,
+키별 할당량 관리, 403 키 전환)를 그대로 실행하기 위해 httplib2 대신 끼워 넣는 가짜 서버입니다.
+
+    server = FakeYouTubeServer(latency=0.1, error_rate=0.01, quota_per_key=1000)
+    youtube_service_factory.configure(http_factory=server.http)
+
+- 응답은 요청 파라미터에서 결정적으로(deterministic) 만들어지므로 같은 요청은 항상 같은 결과를 받습니다.
+- latency/jitter(초) 만큼 응답을 지연하고, error_rate 확률로 500(backendError)을 돌려줍니다.
+- quota_per_key를 지정하면 키별 사용량이 한도를 넘는 순간부터 403(quotaExceeded)을 돌려줍니다.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit, parse_qs
+
+import httplib2
+
+from .quota import quota_cost
+
+# 가짜 채널 ID 접두어 (UC + 'fake' + 18자리 숫자 = 실제와 같은 24자)
+FAKE_CHANNEL_PREFIX = 'UCfake'
+FAKE_UPLOADS_PREFIX = 'UUfake'
+
+# REST 리소스 이름 -> 메서드 ID
+RESOURCE_METHOD_IDS = {
+    'search': 'youtube.search.list',
+    'channels': 'youtube.channels.list',
+    'playlistItems': 'youtube.playlistItems.list',
+    'videos': 'youtube.videos.list',
+    'commentThreads': 'youtube.commentThreads.list',
+}
+
+TOPICS = ['파이썬', '요리', '여행', '게임', '주식', '영어', '운동', '음악', '그림', '자동차']
+
+
+def _stable_int(*parts) -> int:
+    """입력값이 같으면 프로세스와 무관하게 항상 같은 정수"""
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return int(digest[:12], 16)
+
+
+def fake_channel_id(number: int) -> str:
+    return f"{FAKE_CHANNEL_PREFIX}{number:018d}"
+
+
+def _channel_number(channel_id: str):
+    """가짜 채널/업로드 재생목록 ID에서 채널 번호를 추출 (형식이 다르면 None)"""
+    if channel_id[:6] not in (FAKE_CHANNEL_PREFIX, FAKE_UPLOADS_PREFIX) or not channel_id[6:].isdigit():
+        return None
+    return int(channel_id[6:])
+
+
+def _video_id(channel_number: int, index: int) -> str:
+    return f"fv{channel_number:05d}{index:04d}"
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class FakeYouTubeServer:
+    """YouTube Data API v3 목록(list) 엔드포인트를 흉내 내는 스레드 세이프한 가짜 서버"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 quota_per_key: int = None, channel_pool: int = 200, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.quota_per_key = quota_per_key
+        self.channel_pool = channel_pool
+        self.seed = seed
+        self.now = datetime.now(timezone.utc)
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """호출 수/할당량 집계를 초기화합니다. (키별 할당량 사용량도 초기화)"""
+        with self.lock:
+            self.calls = Counter()       # 메서드 ID -> 호출 수 (오류 포함)
+            self.errors = Counter()      # 'backendError' / 'quotaExceeded' -> 횟수
+            self.units_by_key = Counter()  # API 키 -> 성공한 호출의 할당량 단위
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'calls': dict(self.calls),
+                'total_calls': sum(self.calls.values()),
+                'errors': dict(self.errors),
+                'quota_units': sum(self.units_by_key.values()),
+            }
+
+    def http(self) -> "FakeHttp":
+        """youtube_service_factory.configure(http_factory=...)에 넘길 HTTP 객체 생성 함수"""
+        return FakeHttp(self)
+
+    # --- 요청 처리 ---
+
+    def handle(self, resource: str, params: dict):
+        """REST 리소스 이름과 쿼리 파라미터로 (상태 코드, 응답 본문 dict)를 반환합니다."""
+        method_id = RESOURCE_METHOD_IDS.get(resource)
+        if method_id is None:
+            return 404, self._error_body(404, 'notFound', f"Unknown resource: {resource}")
+
+        with self.lock:
+            self.calls[method_id] += 1
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self.error_rate and self.random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+
+        api_key = params.get('key', '')
+        cost = quota_cost(method_id)
+        with self.lock:
+            if self.quota_per_key is not None and self.units_by_key[api_key] + cost > self.quota_per_key:
+                self.errors['quotaExceeded'] += 1
+                return 403, self._error_body(403, 'quotaExceeded', "The request cannot be completed because you have exceeded your quota.")
+            if failed:
+                self.errors['backendError'] += 1
+                return 500, self._error_body(500, 'backendError', "Backend Error")
+            self.units_by_key[api_key] += cost
+
+        handler = getattr(self, f"_{resource}")
+        return 200, {'kind': f"youtube#{resource}ListResponse", 'items': handler(params)}
+
+    @staticmethod
+    def _error_body(code: int, reason: str, message: str) -> dict:
+        return {'error': {'code': code, 'message': message,
+                          'errors': [{'message': message, 'domain': 'youtube.quota', 'reason': reason}]}}
+
+    def _channel_snippet(self, number: int) -> dict:
+        topic = TOPICS[number % len(TOPICS)]
+        return {
+            'title': f"{topic} 채널 {number}",
+            'description': f"{topic} 관련 영상을 올리는 가짜 채널입니다. ({number})",
+            'publishedAt': _iso(self.now - timedelta(days=300 + number)),
+            'thumbnails': {
+                size: {'url': f"https://example.com/fake/{number}/{size}.jpg"}
+                for size in ('default', 'medium', 'high')
+            },
+        }
+
+    def _search(self, params: dict) -> list:
+        max_results = int(params.get('maxResults', 5))
+        base = _stable_int(self.seed, params.get('q', ''))
+        numbers = [(base + i * 7) % self.channel_pool for i in range(max_results)]
+        return [
+            {
+                'kind': 'youtube#searchResult',
+                'id': {'kind': 'youtube#channel', 'channelId': fake_channel_id(number)},
+                'snippet': {'channelId': fake_channel_id(number), **self._channel_snippet(number)},
+            }
+            for number in dict.fromkeys(numbers)
+        ]
+
+    def _channels(self, params: dict) -> list:
+        items = []
+        for channel_id in params.get('id', '').split(','):
+            number = _channel_number(channel_id)
+            if number is None:
+                continue
+            subscribers = _stable_int(self.seed, 'subs', number) % 2_000_000
+            items.append({
+                'kind': 'youtube#channel',
+                'id': channel_id,
+                'snippet': self._channel_snippet(number),
+                'statistics': {
+                    'subscriberCount': str(subscribers),
+                    'viewCount': str(subscribers * 40),
+                    'videoCount': str(20 + number % 300),
+                    'hiddenSubscriberCount': False,
+                },
+                'brandingSettings': {'channel': {'title': self._channel_snippet(number)['title'],
+                                                 'keywords': TOPICS[number % len(TOPICS)]}},
+                'contentDetails': {'relatedPlaylists': {'likes': '', 'uploads': FAKE_UPLOADS_PREFIX + channel_id[6:]}},
+            })
+        return items
+
+    def _playlistItems(self, params: dict) -> list:
+        number = _channel_number(params.get('playlistId', ''))
+        if number is None:
+            return []
+        max_results = int(params.get('maxResults', 5))
+        return [
+            {
+                'kind': 'youtube#playlistItem',
+                'snippet': {
+                    'publishedAt': _iso(self.now - timedelta(days=number % 30 + index * 3)),
+                    'channelId': fake_channel_id(number),
+                    'title': f"{TOPICS[number % len(TOPICS)]} 영상 {index + 1}",
+                    'resourceId': {'kind': 'youtube#video', 'videoId': _video_id(number, index)},
+                },
+            }
+            for index in range(max_results)
+        ]
+
+    def _videos(self, params: dict) -> list:
+        items = []
+        for video_id in params.get('id', '').split(','):
+            if not (video_id.startswith('fv') and video_id[2:].isdigit()):
+                continue
+            number, index = int(video_id[2:7]), int(video_id[7:])
+            topic = TOPICS[number % len(TOPICS)]
+            views = _stable_int(self.seed, 'views', video_id) % 500_000
+            items.append({
+                'kind': 'youtube#video',
+                'id': video_id,
+                'snippet': {
+                    'title': f"{topic} 영상 {index + 1}",
+                    'description': f"{topic}에 대한 설명입니다. " * 5,
+                    'tags': [topic, f"{topic} 기초", f"{topic} 강의"],
+                    'publishedAt': _iso(self.now - timedelta(days=number % 30 + index * 3)),
+                },
+                'statistics': {'viewCount': str(views), 'likeCount': str(views // 30), 'commentCount': str(views // 500)},
+                'contentDetails': {'duration': f"PT{3 + views % 20}M{views % 60}S"},
+                'status': {'embeddable': (number + index) % 5 != 0},
+            })
+        return items
+
+    def _commentThreads(self, params: dict) -> list:
+        max_results = min(int(params.get('maxResults', 20)), 20)
+        video_id = params.get('videoId', '')
+        return [
+            {'snippet': {'videoId': video_id,
+                         'topLevelComment': {'snippet': {'textDisplay': f"좋은 영상 감사합니다 {index + 1}"}}}}
+            for index in range(max_results)
+        ]
+
+
+class FakeHttp:
+    """googleapiclient가 사용하는 httplib2.Http의 request()만 흉내 내는 객체"""
+
+    def __init__(self, server: FakeYouTubeServer):
+        self.server = server
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=1, connection_type=None):
+        parts = urlsplit(uri)
+        resource = parts.path.rstrip('/').rsplit('/', 1)[-1]
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        status, payload = self.server.handle(resource, params)
+        response = httplib2.Response({'status': str(status), 'content-type': 'application/json; charset=UTF-8'})
+        response.reason = 'OK' if status < 400 else 'Error'
+        return response, json.dumps(payload, ensure_ascii=False).encode('utf-8')
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiKeyUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key_fingerprint', models.CharField(help_text='API 키의 SHA-256 해시', max_length=64)),
+                ('quota_date', models.DateField(help_text='할당량 기준 날짜 (태평양 시간)')),
+                ('units_used', models.PositiveIntegerField(default=0, help_text='추정 사용 할당량 단위')),
+                ('exhausted', models.BooleanField(default=False, help_text='할당량 소진 여부 (다음 태평양 자정까지 유지)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='갱신 시간')),
+            ],
+            options={
+                'verbose_name': 'API 키 사용량',
+                'verbose_name_plural': 'API 키 사용량',
+                'constraints': [models.UniqueConstraint(fields=('key_fingerprint', 'quota_date'), name='unique_key_usage_per_day')],
+            },
+        ),
+    ]
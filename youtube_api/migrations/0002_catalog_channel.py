@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('youtube_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogChannel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_id', models.CharField(help_text='YouTube 채널 ID', max_length=64, unique=True)),
+                ('title', models.CharField(blank=True, help_text='채널 이름', max_length=255)),
+                ('description', models.TextField(blank=True, help_text='채널 설명')),
+                ('uploads_playlist_id', models.CharField(blank=True, help_text='업로드 재생목록 ID', max_length=64)),
+                ('subscriber_count', models.BigIntegerField(default=0, help_text='구독자 수')),
+                ('view_count', models.BigIntegerField(default=0, help_text='총 조회수')),
+                ('video_count', models.PositiveIntegerField(default=0, help_text='영상 수')),
+                ('channel_details', models.JSONField(default=dict, help_text='channels.list 결과 (statistics, contentDetails)')),
+                ('latest_videos', models.JSONField(default=list, help_text='최신 업로드 재생목록 아이템 (업로드 일자, 영상 ID)')),
+                ('video_details', models.JSONField(default=list, help_text='최신 영상 상세 (제목/설명/태그, 통계, 길이, 퍼가기 허용 여부)')),
+                ('fetched_at', models.DateTimeField(db_index=True, verbose_name='조회 시간')),
+            ],
+            options={
+                'verbose_name': '채널 카탈로그',
+                'verbose_name_plural': '채널 카탈로그',
+                'ordering': ['-fetched_at'],
+                'indexes': [models.Index(fields=['-subscriber_count'], name='catalog_channel_subscribers')],
+            },
+        ),
+    ]
@@ -1,3 +1,59 @@
 from django.db import models
 
 # Create your models here.
+
+
+class ApiKeyUsage(models.Model):
+    """
+    YouTube API 키별 일일 할당량 사용 기록 (여러 워커 프로세스가 공유)
+    - 할당량은 태평양 시간 자정에 초기화되므로 quota_date도 태평양 시간 기준 날짜입니다.
+    - API 키 원문 대신 해시(key_fingerprint)만 저장합니다.
+    """
+    key_fingerprint = models.CharField(max_length=64, help_text="API 키의 SHA-256 해시")
+    quota_date = models.DateField(help_text="할당량 기준 날짜 (태평양 시간)")
+    units_used = models.PositiveIntegerField(default=0, help_text="추정 사용 할당량 단위")
+    exhausted = models.BooleanField(default=False, help_text="할당량 소진 여부 (다음 태평양 자정까지 유지)")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="갱신 시간")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['key_fingerprint', 'quota_date'], name='unique_key_usage_per_day'),
+        ]
+        verbose_name = "API 키 사용량"
+        verbose_name_plural = "API 키 사용량"
+
+    def __str__(self):
+        return f"[{self.quota_date}] {self.key_fingerprint[:12]}: {self.units_used} units"
+
+
+class CatalogChannel(models.Model):
+    """
+    검색 과정에서 조회한 채널 메타데이터 카탈로그
+    - 같은 채널이 다시 검색되면 fetched_at 기준으로 CHANNEL_CATALOG_TTL 동안 YouTube를 다시 호출하지 않습니다.
+    - channel_details / latest_videos / video_details는 점수 계산에 쓰는 필드만 남긴 API 응답입니다.
+    """
+    channel_id = models.CharField(max_length=64, unique=True, help_text="YouTube 채널 ID")
+    title = models.CharField(max_length=255, blank=True, help_text="채널 이름")
+    description = models.TextField(blank=True, help_text="채널 설명")
+    uploads_playlist_id = models.CharField(max_length=64, blank=True, help_text="업로드 재생목록 ID")
+    subscriber_count = models.BigIntegerField(default=0, help_text="구독자 수")
+    view_count = models.BigIntegerField(default=0, help_text="총 조회수")
+    video_count = models.PositiveIntegerField(default=0, help_text="영상 수")
+    channel_details = models.JSONField(default=dict, help_text="channels.list 결과 (statistics, contentDetails)")
+    latest_videos = models.JSONField(default=list, help_text="최신 업로드 재생목록 아이템 (업로드 일자, 영상 ID)")
+    video_details = models.JSONField(default=list, help_text="최신 영상 상세 (제목/설명/태그, 통계, 길이, 퍼가기 허용 여부)")
+    fetched_at = models.DateTimeField(db_index=True, verbose_name="조회 시간")
+
+    class Meta:
+        ordering = ['-fetched_at']
+        indexes = [
+            models.Index(fields=['-subscriber_count'], name='catalog_channel_subscribers'),
+        ]
+        verbose_name = "채널 카탈로그"
+        verbose_name_plural = "채널 카탈로그"
+
+    def video_details_by_id(self) -> dict:
+        return {detail['id']: detail for detail in self.video_details if detail.get('id')}
+
+    def __str__(self):
+        return f"[{self.fetched_at.strftime('%Y-%m-%d %H:%M')}] {self.title or self.channel_id}"
@@ -0,0 +1,73 @@
+# youtube_api/quota.py
+"""
+YouTube Data API v3 호출별 할당량(quota) 비용 표.
+(https://developers.google.com/youtube/v3/determine_quota_cost)
+"""
+import random
+
+from django.conf import settings
+
+# 메서드 ID(googleapiclient의 HttpRequest.methodId) -> 호출 1회당 소모 단위
+QUOTA_COSTS = {
+    'youtube.search.list': 100,
+    'youtube.channels.list': 1,
+    'youtube.playlistItems.list': 1,
+    'youtube.videos.list': 1,
+    'youtube.commentThreads.list': 1,
+}
+
+# 표에 없는 list 계열 호출의 기본 비용
+DEFAULT_QUOTA_COST = 1
+
+
+def quota_cost(method_id: str) -> int:
+    """메서드 ID에 해당하는 호출 1회당 할당량 비용을 반환합니다."""
+    return QUOTA_COSTS.get(method_id, DEFAULT_QUOTA_COST)
+
+
+# 키 자체의 한도/권한 문제로 보고 다른 키로 전환해야 하는 403 사유
+KEY_ERROR_REASONS = {
+    'quotaExceeded', 'dailyLimitExceeded',
+    'accessNotConfigured', 'ipRefererBlocked', 'keyExpired',
+}
+# 짧은 시간에 호출이 몰려 생기는 일시적인 제한 (일일 할당량 소진이 아니므로 키를 소진 처리하지 않고 잠시 후 재시도)
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+DEFAULT_RATE_LIMIT_RETRIES = 3
+DEFAULT_RATE_LIMIT_BASE_DELAY = 1.0
+# 키와 무관한 403 사유 (다른 키로 재시도해도 결과가 같음)
+NON_KEY_ERROR_REASONS = {'commentsDisabled', 'forbidden', 'channelClosed', 'channelSuspended'}
+
+
+def error_reasons(http_error) -> set:
+    """HttpError의 상세 정보에서 오류 사유(reason) 목록을 추출합니다."""
+    details = getattr(http_error, 'error_details', None)
+    if not isinstance(details, list):
+        return set()
+    return {detail.get('reason') for detail in details if isinstance(detail, dict) and detail.get('reason')}
+
+
+def is_key_error(http_error) -> bool:
+    """
+    403 오류가 API 키의 할당량/권한 문제인지 판단합니다.
+    (사유를 알 수 없으면 기존 동작대로 키 문제로 간주)
+    """
+    reasons = error_reasons(http_error)
+    if reasons & KEY_ERROR_REASONS:
+        return True
+    return not (reasons & (NON_KEY_ERROR_REASONS | RATE_LIMIT_REASONS))
+
+
+def is_rate_limit_error(http_error) -> bool:
+    """일시적인 호출 빈도 제한(429, 또는 rateLimitExceeded/userRateLimitExceeded)인지 판단합니다."""
+    if getattr(getattr(http_error, 'resp', None), 'status', None) in (429, '429'):
+        return True
+    return bool(error_reasons(http_error) & RATE_LIMIT_REASONS)
+
+
+def rate_limit_delay(attempt: int):
+    """빈도 제한 후 다음 시도까지 기다릴 시간(초). 재시도 횟수를 다 썼으면 None"""
+    if attempt >= getattr(settings, 'YOUTUBE_RATE_LIMIT_RETRIES', DEFAULT_RATE_LIMIT_RETRIES):
+        return None
+    base_delay = getattr(settings, 'YOUTUBE_RATE_LIMIT_BASE_DELAY', DEFAULT_RATE_LIMIT_BASE_DELAY)
+    return random.uniform(0, base_delay * 2 ** attempt)
@@ -0,0 +1,191 @@
+# youtube_api/search_planner.py
+"""
+채널 검색(search.list) 계획.
+
+search.list는 호출 1회에 100단위로 다른 호출(1단위)보다 훨씬 비싸서, 추출한 검색어마다 한 번씩 검색하면
+키의 일일 할당량이 금방 소진됩니다. SearchPlanner는 검색어가 정해지는 대로(스트리밍으로 하나씩 와도)
+다음 규칙으로 검색할지, 몇 개를 받을지 정합니다.
+
+  - 앞서 계획한 검색어와 단어가 거의 같은 검색어는 합칩니다. (단어 집합의 자카드 유사도 >= merge_similarity)
+  - 응답 캐시(cache.py)에 결과가 남아 있는 검색은 할당량 없이 그대로 사용합니다.
+  - 후보 채널이 target_candidates개가 되도록 검색마다 maxResults를 정하고, 이미 충분하면 남은 검색어는 건너뜁니다.
+    (search.list는 maxResults와 관계없이 비용이 같으므로, 남은 예산으로 할 수 있는 검색 수에 맞춰 나눠 받음)
+  - 요청 하나의 search.list 사용량이 quota_budget(단위)을 넘게 되는 검색어는 건너뜁니다.
+
+    planner = SearchPlanner.from_settings()
+    for query in search_queries:
+        planned = planner.add(query)
+        if planned is not None:
+            collector.search_channels(planned.query, max_results=planned.max_results)
+    planner.report()   # 계획/실제 사용 할당량을 지표와 trace에 기록
+"""
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from django.conf import settings
+
+from core.tracing import metrics, current_trace, YOUTUBE_SEARCH_UNITS, YOUTUBE_SEARCH_KEYWORDS
+from .cache import response_cache
+from .quota import quota_cost
+
+SEARCH_METHOD = 'youtube.search.list'
+# 검색 1회에 받을 채널 수의 단계 (캐시 적중률을 높이기 위해 이 값들 중에서만 고름, 최대 50은 API 한도)
+MAX_RESULTS_STEPS = (5, 10, 25, 50)
+
+DEFAULT_QUOTA_BUDGET = 300
+DEFAULT_TARGET_CANDIDATES = 15
+DEFAULT_MERGE_SIMILARITY = 0.6
+
+_WORD = re.compile(r'\w+')
+
+
+def search_params(keyword: str, max_results: int) -> dict:
+    """채널 검색 요청의 파라미터 (동기/비동기 collector와 응답 캐시 조회가 같은 키를 쓰도록 한 곳에서 만듦)"""
+    return {'part': 'snippet', 'q': keyword, 'type': 'channel', 'maxResults': max_results}
+
+
+def _words(query: str) -> tuple:
+    return tuple(word.lower() for word in _WORD.findall(query or ''))
+
+
+def similarity(a: tuple, b: tuple) -> float:
+    """두 검색어(단어 목록)의 자카드 유사도 (띄어쓰기만 다르면 1.0)"""
+    if not a or not b:
+        return 0.0
+    if ''.join(a) == ''.join(b):
+        return 1.0
+    return len(set(a) & set(b)) / len(set(a) | set(b))
+
+
+@dataclass
+class PlannedSearch:
+    """계획에 들어간 검색 하나"""
+    query: str
+    max_results: int
+    cached: bool = False  # 응답 캐시에 결과가 있어 할당량을 쓰지 않음
+    expected: int = 0  # 기대하는 후보 채널 수 (캐시 적중이면 실제 결과 수)
+    merged: List[str] = field(default_factory=list)  # 이 검색에 합쳐진 검색어
+    words: tuple = field(default=(), repr=False, compare=False)
+
+    @property
+    def units(self) -> int:
+        return 0 if self.cached else quota_cost(SEARCH_METHOD)
+
+
+class SearchPlanner:
+    """요청 하나(사용자 검색 1회)의 채널 검색 계획. 여러 스레드에서 add를 호출해도 안전합니다."""
+
+    def __init__(self, quota_budget: int = DEFAULT_QUOTA_BUDGET, target_candidates: int = DEFAULT_TARGET_CANDIDATES,
+                 merge_similarity: float = DEFAULT_MERGE_SIMILARITY):
+        self.quota_budget = quota_budget  # 0이면 제한 없음
+        self.target_candidates = target_candidates
+        self.merge_similarity = merge_similarity
+        self.searches: List[PlannedSearch] = []
+        self.merged: List[str] = []
+        self.skipped: List[str] = []
+        self.keywords = 0
+        self.trace = current_trace()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "SearchPlanner":
+        """Django settings 값으로 계획을 만듭니다."""
+        return cls(
+            quota_budget=getattr(settings, 'YOUTUBE_SEARCH_QUOTA_BUDGET', DEFAULT_QUOTA_BUDGET),
+            target_candidates=getattr(settings, 'YOUTUBE_SEARCH_TARGET_CANDIDATES', DEFAULT_TARGET_CANDIDATES),
+            merge_similarity=getattr(settings, 'YOUTUBE_SEARCH_MERGE_SIMILARITY', DEFAULT_MERGE_SIMILARITY),
+        )
+
+    @property
+    def planned_units(self) -> int:
+        return sum(planned.units for planned in self.searches)
+
+    @property
+    def expected_candidates(self) -> int:
+        return sum(planned.expected for planned in self.searches)
+
+    def add(self, query: str) -> Optional[PlannedSearch]:
+        """
+        검색어 하나를 계획에 넣고, 검색할 PlannedSearch를 반환합니다.
+        (앞선 검색어와 합쳐졌거나 예산/목표 후보 수 때문에 건너뛰면 None)
+        """
+        words = _words(query)
+        if not words:
+            return None
+        with self.lock:
+            self.keywords += 1
+            for planned in self.searches:
+                if similarity(words, planned.words) >= self.merge_similarity:
+                    planned.merged.append(query)
+                    self.merged.append(query)
+                    return None
+
+            planned = self._cached_search(query, words)
+            if planned is None:
+                remaining = self.target_candidates - self.expected_candidates
+                cost = quota_cost(SEARCH_METHOD)
+                if remaining <= 0 or (self.quota_budget and self.planned_units + cost > self.quota_budget):
+                    self.skipped.append(query)
+                    return None
+                max_results = self._max_results(remaining, cost)
+                planned = PlannedSearch(query, max_results, expected=max_results, words=words)
+            self.searches.append(planned)
+            return planned
+
+    def _cached_search(self, query: str, words: tuple) -> Optional[PlannedSearch]:
+        """응답 캐시에 남아 있는 검색이 있으면 (받는 수가 큰 것부터) 그 검색을 반환합니다."""
+        for max_results in reversed(MAX_RESULTS_STEPS):
+            response = response_cache.peek(SEARCH_METHOD, search_params(query, max_results))
+            if response is not None:
+                return PlannedSearch(query, max_results, cached=True, expected=len(response.get('items', [])),
+                                     words=words)
+        return None
+
+    def _max_results(self, remaining: int, cost: int) -> int:
+        """남은 예산으로 할 수 있는 검색 수에 목표 후보 수를 나눠, 그 이상인 가장 작은 단계를 고릅니다."""
+        if self.quota_budget:
+            searches_left = max(1, (self.quota_budget - self.planned_units) // cost)
+        else:
+            searches_left = remaining
+        needed = math.ceil(remaining / searches_left)
+        return next((step for step in MAX_RESULTS_STEPS if step >= needed), MAX_RESULTS_STEPS[-1])
+
+    def spent_units(self) -> Optional[int]:
+        """
+        이 요청의 trace에 기록된 search.list 호출이 실제로 쓴 할당량 (캐시 적중/함께 받은 응답은 0)
+        (trace 밖에서 만든 계획이면 None)
+        """
+        if self.trace is None:
+            return None
+        with self.trace.lock:
+            spans = list(self.trace.spans)
+        return sum(finished_span.attributes.get('units', 0) for finished_span in spans
+                   if finished_span.name == 'youtube.request' and finished_span.labels.get('endpoint') == SEARCH_METHOD)
+
+    def report(self) -> dict:
+        """
+        검색어를 모두 검색했을 때(naive)와 계획(planned), 실제(spent) search.list 할당량을 지표로 집계하고,
+        같은 내용을 trace 속성(search_plan)으로 남깁니다.
+        """
+        with self.lock:
+            summary = {
+                'keywords': self.keywords,
+                'searches': sum(1 for planned in self.searches if not planned.cached),
+                'cached': sum(1 for planned in self.searches if planned.cached),
+                'merged': len(self.merged),
+                'skipped': len(self.skipped),
+                'naive_units': self.keywords * quota_cost(SEARCH_METHOD),
+                'planned_units': self.planned_units,
+            }
+        summary['spent_units'] = self.spent_units()
+        for kind in ('naive', 'planned', 'spent'):
+            if summary[f'{kind}_units'] is not None:
+                metrics.inc(YOUTUBE_SEARCH_UNITS, {'kind': kind}, summary[f'{kind}_units'])
+        for decision in ('searches', 'cached', 'merged', 'skipped'):
+            metrics.inc(YOUTUBE_SEARCH_KEYWORDS, {'decision': decision}, summary[decision])
+        if self.trace is not None:
+            self.trace.set(search_plan=summary)
+        return summary
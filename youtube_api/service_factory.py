@@ -0,0 +1,93 @@
+import json
+import threading
+
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import build_http
+
+
+class YouTubeServiceFactory:
+    """
+    YouTube 서비스 객체를 프로세스 전체에서 재사용하기 위한 싱글톤 팩토리.
+    - discovery 문서는 패키지에 포함된 정적 JSON을 한 번만 읽고 파싱합니다. (네트워크 불필요)
+    - 서비스 객체는 API 키마다 하나씩만 만들어 캐싱합니다.
+    - HTTP 객체(httplib2)는 스레드 세이프하지 않으므로 스레드마다 하나씩 두고,
+      같은 스레드의 이후 요청에서는 열린 연결을 재사용합니다.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.discovery_document = None
+            self.services = {}
+            self.lock = threading.Lock()
+            self.local = threading.local()
+            self.http_factory = build_http
+            self.http_generation = 0
+            self.initialized = True
+
+    def _load_document(self) -> dict:
+        """
+        정적 discovery 문서를 단 한 번만 로드합니다.
+        (Django settings의 YOUTUBE_DISCOVERY_DOCUMENT 경로가 있으면 그 파일을 우선 사용)
+        """
+        if self.discovery_document is None:
+            with self.lock:
+                if self.discovery_document is None:
+                    content = None
+                    try:
+                        from django.conf import settings
+                        path = getattr(settings, 'YOUTUBE_DISCOVERY_DOCUMENT', None)
+                    except ImportError:
+                        path = None
+                    if path:
+                        with open(path, 'r', encoding='utf-8') as f:
+                            content = f.read()
+                    else:
+                        content = get_static_doc('youtube', 'v3')
+                    if not content:
+                        raise RuntimeError("YouTube v3 discovery 문서를 찾을 수 없습니다.")
+                    self.discovery_document = json.loads(content)
+        return self.discovery_document
+
+    def get_service(self, api_key: str):
+        """API 키에 해당하는 YouTube 서비스 객체를 반환합니다. (키마다 한 번만 빌드)"""
+        service = self.services.get(api_key)
+        if service is None:
+            document = self._load_document()
+            with self.lock:
+                service = self.services.get(api_key)
+                if service is None:
+                    service = build_from_document(document, developerKey=api_key, http=self.get_http())
+                    self.services[api_key] = service
+        return service
+
+    def get_http(self):
+        """현재 스레드 전용 HTTP 객체를 반환합니다. (연결 재사용)"""
+        http = getattr(self.local, 'http', None)
+        if http is None or getattr(self.local, 'generation', None) != self.http_generation:
+            http = self.http_factory()
+            self.local.http = http
+            self.local.generation = self.http_generation
+        return http
+
+    def configure(self, http_factory=None):
+        """
+        HTTP 객체 생성 함수를 교체합니다. (None이면 기본 httplib2 사용)
+        벤치마크/테스트에서 실제 API 대신 youtube_api/fakes.py의 가짜 서버로 요청을 보낼 때 사용하며,
+        각 스레드가 이미 만들어 둔 HTTP 객체는 다음 요청 때 새로 만들어집니다.
+        """
+        with self.lock:
+            self.http_factory = http_factory or build_http
+            self.http_generation += 1
+
+# Create a single, global instance of the factory for the application to use.
+youtube_service_factory = YouTubeServiceFactory()
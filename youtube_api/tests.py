@@ -1,3 +1,423 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from googleapiclient.errors import HttpError
+
+from .api_client import YouTubeDataCollector, uploads_playlist_ids
+from .api_key_manager import api_key_manager, key_fingerprint
+from .models import ApiKeyUsage, CatalogChannel
+from .catalog import load_catalog, store_channel, is_fresh
+from .cache import MemoryCacheBackend, ResponseCache, response_cache
+from .service_factory import youtube_service_factory
+from .fakes import FakeYouTubeServer
+from .search_planner import SearchPlanner, SEARCH_METHOD, search_params
+from .quota import is_key_error, is_rate_limit_error
+from core.tracing import metrics, trace
+
+
+class YouTubeDataCollectorTests(SimpleTestCase):
+    def setUp(self):
+        # 네트워크/DB 없이 테스트하기 위해 키 관리자와 서비스 빌드를 대체합니다.
+        manager_patcher = patch('youtube_api.api_client.api_key_manager')
+        self.mock_manager = manager_patcher.start()
+        self.addCleanup(manager_patcher.stop)
+        self.mock_manager.get_all_keys.return_value = ['test-key']
+        self.mock_manager.pick_key.return_value = 'test-key'
+        with patch.object(YouTubeDataCollector, '_build_service', return_value=MagicMock()):
+            self.collector = YouTubeDataCollector()
+
+    def test_get_channels_details_batches_fifty_ids_per_call(self):
+        """채널 상세 조회가 50개 단위로 묶여 호출되는지 테스트"""
+        channel_ids = [f'UC{i:03d}' for i in range(120)]
+        requested_chunks = []
+
+        def fake_execute(builder):
+            service = MagicMock()
+            builder(service)
+            chunk = service.channels.return_value.list.call_args.kwargs['id'].split(',')
+            requested_chunks.append(chunk)
+            return {'items': [{'id': channel_id} for channel_id in chunk]}
+
+        with patch.object(self.collector, '_execute_request', side_effect=fake_execute):
+            details = self.collector.get_channels_details(channel_ids + channel_ids[:5])
+
+        # 배치끼리는 동시에 요청하므로 요청 순서는 달라질 수 있지만, 결과는 입력 순서를 유지
+        self.assertEqual(sorted(len(chunk) for chunk in requested_chunks), [20, 50, 50])
+        self.assertEqual(list(details), channel_ids)
+
+    def test_get_latest_videos_skips_channel_lookup_with_playlist_id(self):
+        """업로드 재생목록 ID가 주어지면 채널 조회 없이 재생목록만 조회하는지 테스트"""
+        with patch.object(self.collector, '_execute_request', return_value={'items': [{'id': 'v1'}]}) as mock_execute:
+            videos = self.collector.get_latest_videos('UC123', max_results=3, uploads_playlist_id='UU123')
+
+        self.assertEqual(videos, [{'id': 'v1'}])
+        self.assertEqual(mock_execute.call_count, 1)
+
+    def test_get_latest_videos_derives_uploads_playlist_and_falls_back_on_404(self):
+        """UC -> UU로 만든 재생목록 ID를 먼저 쓰고, 404일 때만 채널 조회로 확인한 ID를 기억해 다시 쓰는지 테스트"""
+        uploads_playlist_ids.clear()
+        self.addCleanup(uploads_playlist_ids.clear)
+        requested = []
+
+        def fake_execute(builder):
+            service = MagicMock()
+            builder(service)
+            if service.channels.return_value.list.called:
+                requested.append('channels')
+                return {'items': [{'contentDetails': {'relatedPlaylists': {'uploads': 'PL-uploads'}}}]}
+            playlist_id = service.playlistItems.return_value.list.call_args.kwargs['playlistId']
+            requested.append(playlist_id)
+            if playlist_id != 'PL-uploads' and playlist_id != 'UU123':
+                raise HttpError(MagicMock(status=404), b'playlistNotFound')
+            return {'items': [{'id': playlist_id}]}
+
+        with patch.object(self.collector, '_execute_request', side_effect=fake_execute):
+            self.assertEqual(self.collector.get_latest_videos('UC123'), [{'id': 'UU123'}])
+            self.assertEqual(self.collector.get_latest_videos('UC456'), [{'id': 'PL-uploads'}])
+            self.assertEqual(self.collector.get_latest_videos('UC456'), [{'id': 'PL-uploads'}])
+
+        self.assertEqual(requested, ['UU123', 'UU456', 'channels', 'PL-uploads', 'PL-uploads'])
+
+    def test_iter_chunks_skips_failed_chunks_and_stops_early(self):
+        """실패한 배치만 빼고 결과를 내보내며, 호출한 쪽이 멈추면 남은 배치는 요청하지 않는지 테스트"""
+        ids = [f'v{i:03d}' for i in range(250)]
+        requested = []
+
+        def fake_execute(builder):
+            service = MagicMock()
+            builder(service)
+            chunk = service.videos.return_value.list.call_args.kwargs['id'].split(',')
+            requested.append(chunk[0])
+            if chunk[0] == 'v050':
+                raise HttpError(MagicMock(status=500), b'backendError')
+            return {'items': [{'id': video_id} for video_id in chunk]}
+
+        def builder(youtube_service, chunk):
+            return youtube_service.videos().list(part='id', id=','.join(chunk))
+
+        with patch.object(self.collector, '_execute_request', side_effect=fake_execute):
+            items = list(self.collector.iter_chunks(builder, ids, max_in_flight=3))
+            self.assertEqual([item['id'] for item in items], ids[:50] + ids[100:])
+
+            requested.clear()
+            first = next(self.collector.iter_chunks(builder, ids, max_in_flight=2))
+        self.assertEqual(first['id'], 'v000')
+        self.assertLessEqual(len(requested), 2)
+
+    def test_get_video_comments_follows_next_page_token(self):
+        """댓글이 한 페이지보다 많이 필요하면 nextPageToken으로 다음 페이지를 조회하고 필요한 만큼만 반환하는지 테스트"""
+        pages = {None: {'items': [{'id': i} for i in range(100)], 'nextPageToken': 'p2'},
+                 'p2': {'items': [{'id': i} for i in range(100, 200)], 'nextPageToken': 'p3'}}
+        tokens = []
+
+        def fake_execute(builder):
+            service = MagicMock()
+            builder(service)
+            token = service.commentThreads.return_value.list.call_args.kwargs['pageToken']
+            tokens.append(token)
+            return pages[token]
+
+        with patch.object(self.collector, '_execute_request', side_effect=fake_execute):
+            comments = self.collector.get_video_comments('v1', max_results=150)
+        self.assertEqual(len(comments), 150)
+        self.assertEqual(tokens, [None, 'p2'])
+
+    def test_execute_request_serves_repeated_calls_from_cache(self):
+        """같은 호출은 캐시에서 응답하고, API 키가 달라도 같은 캐시 키를 쓰는지 테스트"""
+        response_cache.configure(ResponseCache(MemoryCacheBackend()))
+        self.addCleanup(response_cache.configure)
+
+        def builder(youtube_service):
+            request = MagicMock()
+            request.methodId = 'youtube.channels.list'
+            request.uri = f'https://youtube.googleapis.com/youtube/v3/channels?id=UC1&key={youtube_service}&alt=json'
+            request.execute.return_value = {'items': [{'id': 'UC1'}]}
+            return request
+
+        self.collector.youtube = 'key-a'
+        first = self.collector._execute_request(builder)
+        self.collector.youtube = 'key-b'
+        second = self.collector._execute_request(builder)
+
+        self.assertEqual(first, second)
+        stats = response_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['quota_units_saved'], 1)
+
+
+class YouTubeServiceFactoryTests(SimpleTestCase):
+    def test_reuses_one_service_per_key_without_network(self):
+        """키마다 서비스 객체를 한 번만 만들고, 정적 discovery 문서로 요청을 구성하는지 테스트"""
+        with patch('httplib2.Http.request', side_effect=AssertionError('network call')):
+            service = youtube_service_factory.get_service('factory-key-1')
+            self.assertIs(youtube_service_factory.get_service('factory-key-1'), service)
+            self.assertIsNot(youtube_service_factory.get_service('factory-key-2'), service)
+
+            request = service.channels().list(part='statistics', id='UC123')
+        self.assertIn('key=factory-key-1', request.uri)
+
+    def test_http_is_reused_within_a_thread(self):
+        """같은 스레드에서는 같은 HTTP 객체(연결)를 재사용하는지 테스트"""
+        self.assertIs(youtube_service_factory.get_http(), youtube_service_factory.get_http())
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def test_memory_backend_evicts_least_recently_used(self):
+        """최대 항목 수를 넘으면 가장 오래 사용하지 않은 항목부터 제거되는지 테스트"""
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set('a', 1, 60)
+        backend.set('b', 2, 60)
+        backend.get('a')
+        backend.set('c', 3, 60)
+        self.assertEqual((backend.get('a'), backend.get('b'), backend.get('c')), (1, None, 3))
+
+    def test_entries_expire_after_endpoint_ttl(self):
+        """엔드포인트별 TTL이 지나면 캐시 미스가 되는지 테스트"""
+        cache = ResponseCache(MemoryCacheBackend(), ttls={'youtube.playlistItems.list': 10})
+        params = {'playlistId': 'UU1', 'maxResults': 3}
+        with patch('youtube_api.cache.time.monotonic', return_value=100):
+            cache.set('youtube.playlistItems.list', params, {'items': []})
+            self.assertEqual(cache.get('youtube.playlistItems.list', [('maxResults', '3'), ('playlistId', 'UU1')]),
+                             {'items': []})
+        with patch('youtube_api.cache.time.monotonic', return_value=111):
+            self.assertIsNone(cache.get('youtube.playlistItems.list', params))
+
+
+def _http_error(status: int, reason: str) -> HttpError:
+    resp = MagicMock(status=status, reason='Forbidden')
+    content = ('{"error": {"message": "%s", "errors": [{"reason": "%s"}]}}' % (reason, reason)).encode()
+    return HttpError(resp, content)
+
+
+@override_settings(YOUTUBE_DAILY_QUOTA=1000, YOUTUBE_KEY_USAGE_SYNC_INTERVAL=0)
+class ApiKeyManagerTests(TestCase):
+    def setUp(self):
+        self.original_keys = api_key_manager.api_keys
+        api_key_manager.api_keys = ['key-a', 'key-b', 'key-c']
+        api_key_manager.reset_usage()
+
+    def tearDown(self):
+        api_key_manager.api_keys = self.original_keys
+        api_key_manager.reset_usage()
+
+    def test_picks_key_with_most_remaining_quota(self):
+        """남은 할당량이 가장 많은 키를 고르는지 테스트"""
+        api_key_manager.record_usage('key-a', 100)
+        api_key_manager.record_usage('key-b', 1)
+        api_key_manager.record_usage('key-c', 300)
+        self.assertEqual(api_key_manager.pick_key(), 'key-b')
+
+    def test_usage_and_exhaustion_are_shared_through_database(self):
+        """사용량/소진 기록이 DB에 남아 다른 프로세스(초기화된 상태)에서도 보이는지 테스트"""
+        api_key_manager.record_usage('key-a', 100)
+        api_key_manager.mark_exhausted('key-b')
+        usage = ApiKeyUsage.objects.get(key_fingerprint=key_fingerprint('key-a'))
+        self.assertEqual(usage.units_used, 100)
+
+        api_key_manager.reset_usage()  # 새 워커 프로세스를 흉내
+        self.assertEqual(api_key_manager.remaining('key-a'), 1000)
+        self.assertEqual(api_key_manager.pick_key(), 'key-c')
+        self.assertEqual(api_key_manager.remaining('key-a'), 900)
+        self.assertEqual(api_key_manager.remaining('key-b'), 0)
+
+    def test_collector_skips_exhausted_key_on_403(self):
+        """할당량 403을 받으면 키를 소진 처리하고 다른 키로 재시도하는지 테스트"""
+        api_key_manager.record_usage('key-b', 500)
+        api_key_manager.record_usage('key-c', 500)
+        with patch.object(YouTubeDataCollector, '_build_service', side_effect=lambda key: key):
+            collector = YouTubeDataCollector()
+        self.assertEqual(collector.api_keys[collector.current_key_index], 'key-a')
+
+        def builder(youtube_service):
+            request = MagicMock(methodId='youtube.search.list', uri=f'https://x/search?q=a&key={youtube_service}')
+            if youtube_service == 'key-a':
+                request.execute.side_effect = _http_error(403, 'quotaExceeded')
+            else:
+                request.execute.return_value = {'items': []}
+            return request
+
+        with patch('youtube_api.api_client.response_cache') as mock_cache:
+            mock_cache.get.return_value = None
+            self.assertEqual(collector._execute_request(builder), {'items': []})
+
+        self.assertEqual(api_key_manager.remaining('key-a'), 0)
+        used_key = collector.api_keys[collector.current_key_index]
+        self.assertIn(used_key, ('key-b', 'key-c'))
+        self.assertEqual(api_key_manager.remaining(used_key), 400)
+
+    def test_error_reason_classes(self):
+        """할당량 소진/키 권한 사유만 키 문제로 보고, 빈도 제한은 재시도 대상으로 구분하는지 테스트"""
+        for reason in ('quotaExceeded', 'dailyLimitExceeded', 'keyExpired'):
+            self.assertTrue(is_key_error(_http_error(403, reason)), reason)
+            self.assertFalse(is_rate_limit_error(_http_error(403, reason)), reason)
+        for reason in ('rateLimitExceeded', 'userRateLimitExceeded'):
+            self.assertFalse(is_key_error(_http_error(403, reason)), reason)
+            self.assertTrue(is_rate_limit_error(_http_error(403, reason)), reason)
+        self.assertFalse(is_key_error(_http_error(403, 'commentsDisabled')))
+        self.assertFalse(is_rate_limit_error(_http_error(403, 'commentsDisabled')))
+        self.assertTrue(is_rate_limit_error(_http_error(429, 'tooManyRequests')))
+
+    @override_settings(YOUTUBE_RATE_LIMIT_BASE_DELAY=0)
+    def test_collector_retries_rate_limit_without_exhausting_key(self):
+        """빈도 제한 403은 키를 소진 처리하지 않고 같은 키로 재시도하는지 테스트"""
+        with patch.object(YouTubeDataCollector, '_build_service', side_effect=lambda key: key):
+            collector = YouTubeDataCollector()
+        start_index = collector.current_key_index
+        request = MagicMock(methodId='youtube.channels.list', uri='https://x/channels?id=UC1')
+        request.execute.side_effect = [
+            _http_error(403, 'rateLimitExceeded'), _http_error(403, 'userRateLimitExceeded'), {'items': []},
+        ]
+
+        with patch('youtube_api.api_client.response_cache') as mock_cache:
+            mock_cache.get.return_value = None
+            self.assertEqual(collector._execute_request(lambda youtube_service: request), {'items': []})
+        self.assertEqual(request.execute.call_count, 3)
+        self.assertEqual(collector.current_key_index, start_index)
+        self.assertFalse(api_key_manager.exhausted)
+
+    def test_collector_does_not_switch_key_for_comments_disabled(self):
+        """commentsDisabled 같은 키와 무관한 403에는 키를 전환하지 않는지 테스트"""
+        with patch.object(YouTubeDataCollector, '_build_service', side_effect=lambda key: key):
+            collector = YouTubeDataCollector()
+
+        def builder(youtube_service):
+            request = MagicMock(methodId='youtube.commentThreads.list', uri='https://x/commentThreads?videoId=v1')
+            request.execute.side_effect = _http_error(403, 'commentsDisabled')
+            return request
+
+        with patch('youtube_api.api_client.response_cache') as mock_cache:
+            mock_cache.get.return_value = None
+            with self.assertRaises(HttpError):
+                collector._execute_request(builder)
+        self.assertFalse(api_key_manager.exhausted)
+
+
+@override_settings(YOUTUBE_DAILY_QUOTA=1000, YOUTUBE_KEY_USAGE_SYNC_INTERVAL=0)
+class FakeYouTubeServerTests(TestCase):
+    def setUp(self):
+        self.original_keys = api_key_manager.api_keys
+        api_key_manager.api_keys = ['key-a', 'key-b']
+        api_key_manager.reset_usage()
+        response_cache.configure(ResponseCache(None))
+        self.server = FakeYouTubeServer(quota_per_key=150)
+        youtube_service_factory.configure(http_factory=self.server.http)
+
+    def tearDown(self):
+        youtube_service_factory.configure()
+        response_cache.configure()
+        api_key_manager.api_keys = self.original_keys
+        api_key_manager.reset_usage()
+
+    def test_collector_runs_against_fake_server(self):
+        """가짜 서버로 실제 요청 경로(googleapiclient, 할당량 기록)가 동작하는지 테스트"""
+        collector = YouTubeDataCollector()
+        channels = collector.search_channels('파이썬', max_results=3)
+        self.assertEqual(len(channels), 3)
+
+        channel_ids = [channel['id']['channelId'] for channel in channels]
+        details = collector.get_channels_details(channel_ids)
+        videos = collector.get_latest_videos(channel_ids[0], max_results=2,
+                                             uploads_playlist_id=collector.get_uploads_playlist_id(details[channel_ids[0]]))
+        self.assertEqual(len(videos), 2)
+        self.assertEqual(self.server.stats()['quota_units'], 102)
+
+    def test_fake_quota_exhaustion_switches_key(self):
+        """가짜 서버의 403 quotaExceeded를 받으면 다른 키로 전환하는지 테스트"""
+        collector = YouTubeDataCollector()
+        first_key = collector.api_keys[collector.current_key_index]
+        collector.search_channels('파이썬')
+        collector.search_channels('요리')  # 첫 키의 한도(150)를 넘으므로 다른 키로 재시도
+        self.assertEqual(api_key_manager.remaining(first_key), 0)
+        self.assertNotEqual(collector.api_keys[collector.current_key_index], first_key)
+        self.assertEqual(self.server.stats()['errors'], {'quotaExceeded': 1})
+
+    def test_concurrent_identical_requests_are_coalesced(self):
+        """같은 호출이 동시에 들어오면 가짜 서버에는 한 번만 요청하는지 테스트"""
+        self.server.latency = 0.2
+        collector = YouTubeDataCollector()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: collector.search_channels('파이썬'), range(4)))
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(self.server.stats()['calls'], {'youtube.search.list': 1})
+
+
+class SearchPlannerTests(TestCase):
+    def setUp(self):
+        self.original_keys = api_key_manager.api_keys
+        api_key_manager.api_keys = ['key-a']
+        api_key_manager.reset_usage()
+        response_cache.configure(ResponseCache(MemoryCacheBackend()))
+        self.server = FakeYouTubeServer()
+        youtube_service_factory.configure(http_factory=self.server.http)
+        metrics.reset()
+
+    def tearDown(self):
+        youtube_service_factory.configure()
+        response_cache.configure()
+        api_key_manager.api_keys = self.original_keys
+        api_key_manager.reset_usage()
+
+    def test_merges_near_duplicates_and_enforces_budget(self):
+        """비슷한 검색어는 합치고, 남은 예산에 맞춰 받을 채널 수를 늘리며, 예산/목표를 넘는 검색어는 건너뛰는지 테스트"""
+        planner = SearchPlanner(quota_budget=200, target_candidates=15)
+        self.assertEqual(planner.add('파이썬 기초').max_results, 10)
+        self.assertIsNone(planner.add('파이썬 기초 강의'))
+        self.assertIsNone(planner.add('파이썬기초'))
+        self.assertEqual(planner.add('코딩 입문').max_results, 5)
+        self.assertIsNone(planner.add('요리 강좌'))
+        self.assertEqual(planner.planned_units, 200)
+        self.assertEqual((planner.merged, planner.skipped), (['파이썬 기초 강의', '파이썬기초'], ['요리 강좌']))
+
+    def test_cached_searches_are_free_and_spent_units_are_reported(self):
+        """응답 캐시에 있는 검색은 할당량 없이 계획되고, 계획/실제 사용량이 보고되는지 테스트"""
+        collector = YouTubeDataCollector()
+
+        def run(queries):
+            with trace('search'):
+                planner = SearchPlanner(quota_budget=300, target_candidates=15)
+                for query in queries:
+                    planned = planner.add(query)
+                    if planned is not None:
+                        collector.search_channels(planned.query, max_results=planned.max_results)
+                return planner.report()
+
+        first = run(['파이썬', '요리'])
+        self.assertEqual((first['planned_units'], first['spent_units']), (200, 200))
+        second = run(['파이썬', '여행'])
+        self.assertEqual((second['cached'], second['planned_units'], second['spent_units'], second['naive_units']),
+                         (1, 100, 100, 200))
+        self.assertIsNotNone(response_cache.peek(SEARCH_METHOD, search_params('여행', 5)))
+        self.assertEqual(self.server.stats()['calls'], {'youtube.search.list': 3})
+        self.assertIn('aicapstone_youtube_search_units_total{kind="naive"} 400', metrics.render())
+
+
+@override_settings(CHANNEL_CATALOG_TTL=60)
+class ChannelCatalogTests(TestCase):
+    def _store(self):
+        return store_channel(
+            'UC1',
+            {'snippet': {'title': '파이썬 채널', 'description': '설명'}},
+            {'statistics': {'subscriberCount': '1200', 'videoCount': '30'},
+             'contentDetails': {'relatedPlaylists': {'uploads': 'UU1'}}, 'etag': 'x'},
+            [{'snippet': {'publishedAt': '2024-01-01T00:00:00Z', 'resourceId': {'videoId': 'v1'}, 'title': '영상'}}],
+            [{'id': 'v1', 'snippet': {'title': '영상', 'tags': ['파이썬']}, 'statistics': {'viewCount': '10'},
+              'contentDetails': {'duration': 'PT5M', 'dimension': '2d'}, 'status': {'embeddable': True}}],
+        )
+
+    def test_stores_trimmed_channel_data_with_indexed_columns(self):
+        """채널 통계/업로드 재생목록이 인덱스 컬럼으로, 응답은 필요한 필드만 저장되는지 테스트"""
+        self._store()
+        entry = load_catalog(['UC1', 'UC2'])['UC1']
+        self.assertEqual((entry.subscriber_count, entry.video_count, entry.uploads_playlist_id), (1200, 30, 'UU1'))
+        self.assertNotIn('etag', entry.channel_details)
+        self.assertEqual(entry.video_details_by_id()['v1']['contentDetails'], {'duration': 'PT5M'})
+        self.assertTrue(is_fresh(entry))
+
+    def test_entries_expire_after_catalog_ttl(self):
+        """CHANNEL_CATALOG_TTL보다 오래된 채널은 만료로 표시되는지 테스트"""
+        self._store()
+        CatalogChannel.objects.filter(channel_id='UC1').update(fetched_at=timezone.now() - timedelta(minutes=5))
+        self.assertFalse(is_fresh(load_catalog(['UC1'])['UC1']))
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'youtube_api'
+
+urlpatterns = [
+    # ex: /youtube/cache-stats/
+    path('cache-stats/', views.cache_stats_view, name='cache_stats'),
+]
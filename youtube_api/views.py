@@ -1,3 +1,8 @@
-from django.shortcuts import render
+from django.http import JsonResponse
 
-# Create your views here.
+from .cache import response_cache
+
+
+def cache_stats_view(request):
+    """YouTube API 응답 캐시의 적중/미스 횟수와 절약된 할당량을 반환하는 API 뷰입니다."""
+    return JsonResponse(response_cache.stats(), json_dumps_params={'ensure_ascii': False})